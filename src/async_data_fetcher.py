@@ -0,0 +1,105 @@
+import logging
+import ssl
+import aiohttp
+import ccxt.async_support as ccxt_async
+from data_fetcher import DataFetcher
+from ohlcv_cache import CACHE_DIR
+
+
+class AsyncDataFetcher(DataFetcher):
+    """
+    A DataFetcher backed by the native ccxt.async_support client.
+
+    All requests share one pooled aiohttp session with keep-alive connections,
+    so hundreds of concurrent requests need neither worker threads nor a new
+    connection each. Call `close()` on shutdown to release the pool.
+    """
+
+    def __init__(self, use_cache=True, cache_dir=CACHE_DIR, candle_source=None, use_read_cache=True,
+                 read_cache=None, indicator_cache=None, pool_size=100, keepalive_timeout=30):
+        """
+        Initializes the AsyncDataFetcher.
+
+        Args:
+            use_cache (bool): Whether to keep OHLCV candles in the on-disk cache (default True).
+            cache_dir (str): Directory of the on-disk OHLCV cache.
+            candle_source (CandleSource, optional): Source of the streaming mode.
+            use_read_cache (bool): Whether to coalesce and cache exchange reads in memory (default True).
+            read_cache (ReadThroughCache, optional): The read cache. Defaults to the process-wide one.
+            indicator_cache (IndicatorCache, optional): Cache of the model features.
+            pool_size (int): Maximum number of open connections in the shared pool.
+            keepalive_timeout (float): Seconds an idle connection is kept open for reuse.
+        """
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.session = None
+        super().__init__(
+            use_cache=use_cache, cache_dir=cache_dir, candle_source=candle_source,
+            use_read_cache=use_read_cache, read_cache=read_cache, indicator_cache=indicator_cache
+        )
+
+    @staticmethod
+    def _initialize_exchange():
+        """
+        Initializes the async exchange instance using ccxt.async_support.
+
+        The session is supplied later by the fetcher, so ccxt does not create its own.
+
+        Returns:
+            ccxt.async_support.Exchange: An instance of the async ccxt exchange.
+        """
+        try:
+            exchange = ccxt_async.bybit({
+                'options': {
+                    'defaultType': 'spot',  # Default to spot markets
+                },
+                'session': None,
+            })
+            logging.info("Async exchange initialized successfully.")
+            return exchange
+        except Exception as init_error:
+            logging.error(f"Error initializing async exchange: {init_error}")
+            raise
+
+    def _ensure_session(self):
+        """
+        Creates the shared pooled aiohttp session on first use.
+
+        The session has to be created inside the running event loop.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+                ssl=ssl.create_default_context(),
+                enable_cleanup_closed=True,
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+            self.exchange.session = self.session
+
+    async def _call_exchange(self, method_name, *args, **kwargs):
+        """
+        Awaits a method of the async ccxt client on the shared session.
+
+        Args:
+            method_name (str): Name of the ccxt method (e.g., 'fetch_ohlcv').
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            The result of the ccxt call.
+        """
+        self._ensure_session()
+        return await getattr(self.exchange, method_name)(*args, **kwargs)
+
+    async def close(self):
+        """
+        Closes the exchange client, the streaming source and the shared connection pool.
+        """
+        await super().close()
+        await self.exchange.close()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        logging.info("Async exchange session closed.")
@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+import pandas as pd
+from data_fetcher import create_data_fetcher
+from feature_builder import FeatureBuilder, FEATURE_COLUMNS, OHLCV_COLUMNS
+from rate_limiter import TokenBucket
+
+# 🔧 Ścieżki
+DATA_DIR = "D:/TitanFlow/data/data/datasets"
+
+# 🔧 Parametry pobierania
+PAGE_LIMIT = 1000  # Maksymalna liczba świec w jednym zapytaniu (Bybit)
+MAX_RETRIES = 3
+
+# Kolumny zbiorów danych w data/data/datasets (zgodne z LSTMTrainer.load_data)
+ONCHAIN_COLUMNS = ["tx_count", "total_supply", "fear_greed_index", "liquidity_depth", "bid_ask_spread"]
+DATASET_COLUMNS = FEATURE_COLUMNS + ONCHAIN_COLUMNS
+
+
+def split_range(since, until, timeframe_ms, page_limit=PAGE_LIMIT):
+    """
+    Splits a time range into `since` values of consecutive pages.
+
+    Args:
+        since (int): Start of the range in milliseconds (inclusive).
+        until (int): End of the range in milliseconds (exclusive).
+        timeframe_ms (int): Duration of one candle in milliseconds.
+        page_limit (int): Number of candles per page.
+
+    Returns:
+        list: Start timestamps of the pages.
+    """
+    page_ms = timeframe_ms * page_limit
+    return list(range(since, until, page_ms))
+
+
+def build_dataset_frame(ohlcv, timeframe_ms):
+    """
+    Builds a dataset frame with all indicator columns from OHLCV candles.
+
+    Args:
+        ohlcv (list): OHLCV candles sorted by timestamp.
+        timeframe_ms (int): Duration of one candle in milliseconds.
+
+    Returns:
+        pd.DataFrame: Data in the dataset schema, without the on-chain columns.
+    """
+    df = FeatureBuilder().build(ohlcv)
+    time_format = '%Y-%m-%d' if timeframe_ms >= 86_400_000 else '%Y-%m-%d %H:%M:%S'
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms').dt.strftime(time_format)
+    return df
+
+
+class HistoricalBackfill:
+    """
+    Downloads arbitrary date ranges of OHLCV data in parallel, paginated chunks.
+    """
+
+    def __init__(self, data_fetcher, output_dir=DATA_DIR, max_concurrency=10, rate_limiter=None,
+                 page_limit=PAGE_LIMIT):
+        """
+        Initializes the HistoricalBackfill.
+
+        Args:
+            data_fetcher (DataFetcher): The fetcher used to download the pages.
+            output_dir (str): Directory of the datasets. Daily data is written directly into it,
+                other timeframes into a subdirectory named after the timeframe.
+            max_concurrency (int): Maximum number of page requests in flight at once.
+            rate_limiter (TokenBucket, optional): Shared limiter. Defaults to one derived
+                from the exchange's `rateLimit`.
+            page_limit (int): Number of candles requested per page.
+        """
+        self.data_fetcher = data_fetcher
+        self.output_dir = output_dir
+        self.rate_limiter = rate_limiter or TokenBucket.from_exchange(data_fetcher.exchange)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.page_limit = page_limit
+
+    async def _fetch_page(self, symbol, timeframe, since, until):
+        """
+        Fetches one page, retrying with a backoff on errors.
+
+        Returns:
+            list: Candles of the page that fall before `until`.
+        """
+        for attempt in range(1, MAX_RETRIES + 1):
+            async with self.semaphore:
+                await self.rate_limiter.acquire()
+                try:
+                    page = await self.data_fetcher.fetch_ohlcv_page(symbol, timeframe, since, self.page_limit)
+                    return [candle for candle in page if since <= candle[0] < until]
+                except Exception as e:
+                    logging.warning(f"Error fetching {symbol} {timeframe} page at {since} "
+                                    f"(attempt {attempt}/{MAX_RETRIES}): {e}")
+            await asyncio.sleep(2 ** attempt)
+
+        raise RuntimeError(f"Failed to fetch {symbol} {timeframe} page at {since}")
+
+    def _dataset_path(self, symbol, timeframe):
+        """
+        Builds the dataset file path for the symbol and timeframe (e.g., 'BTC/USDT' -> 'BTC_USDT.csv').
+        """
+        output_dir = self.output_dir if timeframe == '1d' else os.path.join(self.output_dir, timeframe)
+        return os.path.join(output_dir, f"{symbol.replace('/', '_').replace(':', '_')}.csv")
+
+    @staticmethod
+    def _write_dataset(file_path, ohlcv, timeframe_ms):
+        """
+        Merges the candles with an existing dataset file and writes the result.
+
+        Candles outside the backfilled range are kept, overlapping ones are replaced
+        and on-chain columns already collected for a timestamp are preserved.
+        """
+        onchain = None
+        if os.path.isfile(file_path):
+            existing = pd.read_csv(file_path)
+            existing['timestamp'] = pd.to_datetime(existing['timestamp']).astype('int64') // 1_000_000
+            candles = {int(row[0]): [int(row[0])] + row[1:] for row in existing[OHLCV_COLUMNS].values.tolist()}
+            candles.update({candle[0]: candle for candle in ohlcv})  # Nowe świece mają pierwszeństwo
+            ohlcv = [candles[timestamp] for timestamp in sorted(candles)]
+            onchain = existing.set_index('timestamp').reindex(columns=ONCHAIN_COLUMNS)
+
+        df = build_dataset_frame(ohlcv, timeframe_ms)
+        if onchain is not None:
+            df[ONCHAIN_COLUMNS] = onchain.reindex([candle[0] for candle in ohlcv]).values
+        else:
+            for column in ONCHAIN_COLUMNS:
+                df[column] = None  # Uzupełniane później przez data_colector
+
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        df[DATASET_COLUMNS].to_csv(file_path, index=False)
+
+    async def backfill_symbol(self, symbol, timeframe, since, until):
+        """
+        Downloads the range for one symbol and timeframe and writes the dataset file.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTC/USDT').
+            timeframe (str): The time frame for the data (e.g., '1m').
+            since (int): Start of the range in milliseconds.
+            until (int): End of the range in milliseconds.
+
+        Returns:
+            int: Number of unique candles downloaded.
+        """
+        timeframe_ms = self.data_fetcher.exchange.parse_timeframe(timeframe) * 1000
+        starts = split_range(since, until, timeframe_ms, self.page_limit)
+        pages = await asyncio.gather(*[
+            self._fetch_page(symbol, timeframe, start, min(start + timeframe_ms * self.page_limit, until))
+            for start in starts
+        ])
+
+        # Usuwamy duplikaty na styku stron
+        candles = {}
+        for page in pages:
+            for candle in page:
+                candles[candle[0]] = candle
+        ohlcv = [candles[timestamp] for timestamp in sorted(candles)]
+
+        if not ohlcv:
+            logging.warning(f"No data for {symbol} {timeframe} in the requested range.")
+            return 0
+
+        file_path = self._dataset_path(symbol, timeframe)
+        await asyncio.to_thread(self._write_dataset, file_path, ohlcv, timeframe_ms)
+        logging.info(f"✅ Backfilled {len(ohlcv)} candles for {symbol} {timeframe} in {len(starts)} pages -> {file_path}")
+        return len(ohlcv)
+
+    async def run(self, symbols, timeframes, since, until):
+        """
+        Backfills all combinations of symbols and timeframes concurrently.
+
+        Args:
+            symbols (list): Trading pairs to backfill.
+            timeframes (list): Time frames to backfill.
+            since (int): Start of the range in milliseconds.
+            until (int): End of the range in milliseconds.
+
+        Returns:
+            dict: (symbol, timeframe) -> number of candles, or None when the job failed.
+        """
+        jobs = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        results = await asyncio.gather(
+            *[self.backfill_symbol(symbol, timeframe, since, until) for symbol, timeframe in jobs],
+            return_exceptions=True
+        )
+
+        summary = {}
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logging.error(f"❌ Backfill failed for {job[0]} {job[1]}: {result}")
+                summary[job] = None
+            else:
+                summary[job] = result
+        return summary
+
+
+def parse_date(value):
+    """
+    Parses a 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM' UTC date into milliseconds.
+    """
+    for date_format in ('%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            parsed = datetime.strptime(value, date_format)
+            return int(parsed.replace(tzinfo=timezone.utc).timestamp() * 1000)
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"Invalid date: {value}")
+
+
+async def main(args):
+    data_fetcher = create_data_fetcher(args.backend, use_cache=False)
+    try:
+        backfill = HistoricalBackfill(data_fetcher, args.output_dir, args.concurrency)
+        until = args.end if args.end is not None else data_fetcher.exchange.milliseconds()
+        await backfill.run(args.symbols, args.timeframes, args.start, until)
+    finally:
+        await data_fetcher.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Backfill historical OHLCV datasets.")
+    parser.add_argument("--symbols", nargs="+", required=True, help="Trading pairs, e.g. BTC/USDT ETH/USDT")
+    parser.add_argument("--timeframes", nargs="+", default=["1d"], help="Time frames, e.g. 1d 1h 1m")
+    parser.add_argument("--start", type=parse_date, required=True, help="Start date (UTC), e.g. 2020-01-01")
+    parser.add_argument("--end", type=parse_date, default=None, help="End date (UTC, exclusive). Defaults to now")
+    parser.add_argument("--output-dir", default=DATA_DIR, help="Datasets directory")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum page requests in flight")
+    parser.add_argument("--backend", choices=["thread", "async"], default="async", help="Data fetcher backend")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,500 @@
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import numpy as np
+import polars as pl
+from strategy import TradingStrategy
+from utils import IndicatorExpressions
+
+# 🔧 Ścieżki
+DATA_DIR = "D:/TitanFlow/data/data/datasets"
+RESULTS_DIR = "D:/TitanFlow/data/backtests"
+
+# 🔧 Parametry symulacji
+TP_SL_MULTIPLIER = 2  # Mnożnik ATR dla TP/SL, jak w main.py
+ATR_WINDOW = 14
+FEE_RATE = 0.001  # Prowizja od wartości transakcji (taker Bybit spot)
+SLIPPAGE = 0.0005  # Poślizg ceny przy wejściu i wyjściu
+INITIAL_CAPITAL = 10_000.0
+SEARCH_CHUNK = 32  # Początkowa liczba świec przeszukiwanych naraz przy szukaniu wyjść
+MAX_SEARCH_CELLS = 1 << 22  # Limit komórek (transakcje x świece) sprawdzanych w jednym kroku
+
+DAY_MS = 86_400_000
+
+EXIT_REASONS = ("signal", "stop_loss", "take_profit", "end")
+
+
+def load_dataset(file_path):
+    """
+    Loads the OHLCV columns of a dataset (data/data/datasets/*.csv).
+
+    Args:
+        file_path (str): Path to the dataset.
+
+    Returns:
+        pl.DataFrame: Columns timestamp (ms), open, high, low, close and volume.
+    """
+    df = pl.read_csv(file_path, columns=["timestamp", "open", "high", "low", "close", "volume"])
+    if df.height and df["timestamp"].dtype == pl.Utf8:
+        time_format = '%Y-%m-%d' if len(df["timestamp"][0]) == 10 else '%Y-%m-%d %H:%M:%S'
+        df = df.with_columns([pl.col("timestamp").str.strptime(pl.Datetime, time_format).dt.timestamp("ms")])
+    return df
+
+
+class BacktestResult:
+    """
+    Trades, equity curve and statistics of one backtest.
+    """
+
+    def __init__(self, symbol, trades, equity, stats):
+        """
+        Args:
+            symbol (str): The backtested symbol.
+            trades (pl.DataFrame): One row per trade.
+            equity (pl.DataFrame): Equity (marked to market) after every bar.
+            stats (dict): Summary statistics.
+        """
+        self.symbol = symbol
+        self.trades = trades
+        self.equity = equity
+        self.stats = stats
+
+
+class PreparedSignals:
+    """
+    Price arrays and the potential trades of one signal frame (see Backtester.prepare).
+    """
+
+    def __init__(self, timestamps, open_, high, low, close, candidates):
+        self.timestamps = timestamps
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.candidates = candidates
+
+
+class Backtester:
+    """
+    Simulates long trades from a signal frame of TradingStrategy.
+
+    A BUY signal enters at the next bar's open. The trade exits at the first
+    of these: a SELL signal (at the next bar's open), the ATR-based stop loss
+    or take profit (as in main.py), or the end of the data. When a bar
+    reaches both stop loss and take profit, the stop loss is assumed. Fees
+    and slippage are charged on both sides.
+
+    Exits of all potential entries are found with array searches; only the
+    chaining of trades (the next entry after the previous exit) walks the
+    trades in Python. The equity curve and statistics are computed for all
+    bars at once.
+    """
+
+    def __init__(self, tp_sl_multiplier=TP_SL_MULTIPLIER, atr_window=ATR_WINDOW, fee_rate=FEE_RATE,
+                 slippage=SLIPPAGE, initial_capital=INITIAL_CAPITAL):
+        """
+        Initializes the Backtester.
+
+        Args:
+            tp_sl_multiplier (float): ATR multiplier of the TP/SL distance; None exits on signals only.
+            atr_window (int): Window of the ATR used for TP/SL when the frame has no ATR column.
+            fee_rate (float): Fee as a fraction of the traded value, charged on entry and exit.
+            slippage (float): Price slippage as a fraction, against the trade on entry and exit.
+            initial_capital (float): Starting capital, fully invested in each trade.
+        """
+        self.tp_sl_multiplier = tp_sl_multiplier
+        self.atr_window = atr_window
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.initial_capital = initial_capital
+
+    @staticmethod
+    def _find_exits(entry_index, stop_loss, take_profit, low, high, sell_at_open):
+        """
+        Finds, for every candidate trade at once, the first bar from its entry on where it exits.
+
+        The bars after the entries are checked in windows that double in size
+        for the trades still open, so short trades cost only a few array operations.
+
+        Returns:
+            np.ndarray: Exit bar of each trade, -1 when it stays open until the end of the data.
+        """
+        n = len(low)
+        exits = np.full(len(entry_index), -1, dtype=np.int64)
+        pending = np.arange(len(entry_index))
+        offset = 0
+        chunk = SEARCH_CHUNK
+        while len(pending):
+            start = entry_index[pending] + offset
+            bars = start[:, None] + np.arange(chunk)
+            in_range = bars < n
+            bars = np.minimum(bars, n - 1)
+            hit = in_range & (
+                sell_at_open[bars]
+                | (low[bars] <= stop_loss[pending, None])
+                | (high[bars] >= take_profit[pending, None])
+            )
+            found = hit.any(axis=1)
+            exits[pending[found]] = bars[found, hit[found].argmax(axis=1)]
+            pending = pending[~found & (start + chunk < n)]
+
+            offset += chunk
+            # Okno rośnie, ale liczba sprawdzanych komórek pozostaje ograniczona
+            chunk = max(SEARCH_CHUNK, min(chunk * 2, MAX_SEARCH_CELLS // max(len(pending), 1)))
+        return exits
+
+    def _candidates(self, open_, high, low, close, atr, buy, sell):
+        """
+        Finds every potential trade (one per BUY signal) and its exit in the whole frame.
+
+        Returns:
+            dict: Arrays of signal/entry/exit indexes, entry prices, stop losses and take profits,
+                and the bars with a SELL exit at the open.
+        """
+        n = len(close)
+        sell_at_open = np.zeros(n, dtype=bool)
+        sell_at_open[1:] = sell[:-1]  # SELL na zamknięciu świecy i -> wyjście na otwarciu i + 1
+
+        if self.tp_sl_multiplier is None:
+            distance = np.full(n, np.inf)
+        else:
+            distance = self.tp_sl_multiplier * atr
+        # Wejście wymaga kolejnej świecy i znanego ATR (sygnał na świecy i, wejście na i + 1)
+        signal_index = np.flatnonzero(buy[:-1] & ~np.isnan(distance[:-1]))
+        entry_index = signal_index + 1
+        entry_price = open_[entry_index]
+        stop_loss = entry_price - distance[signal_index]
+        take_profit = entry_price + distance[signal_index]
+
+        return {
+            "signal_index": signal_index,
+            "entry_index": entry_index,
+            "entry_price": entry_price,
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+            "exit_index": self._find_exits(entry_index, stop_loss, take_profit, low, high, sell_at_open),
+            "sell_at_open": sell_at_open,
+        }
+
+    @staticmethod
+    def _simulate(prepared, start, end):
+        """
+        Chains the potential trades of the bars [start, end) into the trades taken.
+
+        Returns:
+            dict: Arrays of entry/exit indexes (relative to start), raw entry/exit prices and exit reasons.
+        """
+        candidates = prepared.candidates
+        open_, high, low, close = prepared.open, prepared.high, prepared.low, prepared.close
+        sell_at_open = candidates["sell_at_open"]
+
+        # Sygnały z zakresu, po których jest jeszcze świeca wejścia
+        first, last = np.searchsorted(candidates["signal_index"], [start, end - 1])
+        signal_index = candidates["signal_index"][first:last]
+        entry_index = candidates["entry_index"][first:last]
+        exit_index = candidates["exit_index"][first:last]
+        # Transakcje otwarte na końcu zakresu zamykamy na ostatniej świecy
+        exit_index = np.where((exit_index < 0) | (exit_index >= end), end - 1, exit_index)
+
+        # Łańcuch transakcji: kolejne wejście to pierwszy sygnał BUY od świecy wyjścia poprzedniej
+        next_trade = np.searchsorted(signal_index, exit_index).tolist()
+        chosen = []
+        position = 0
+        while position < len(next_trade):
+            chosen.append(position)
+            position = next_trade[position]
+        chosen = np.asarray(chosen, dtype=np.int64)
+
+        entry_index, exit_index = entry_index[chosen], exit_index[chosen]
+        entry_price = candidates["entry_price"][first:last][chosen]
+        stop_loss = candidates["stop_loss"][first:last][chosen]
+        take_profit = candidates["take_profit"][first:last][chosen]
+        after_entry = exit_index > entry_index
+        exit_open = open_[exit_index]
+
+        is_signal = sell_at_open[exit_index] & after_entry
+        is_stop = ~is_signal & (low[exit_index] <= stop_loss)
+        is_take = ~is_signal & ~is_stop & (high[exit_index] >= take_profit)
+        is_end = ~is_signal & ~is_stop & ~is_take
+
+        # Luka cenowa za SL/TP realizuje się po cenie otwarcia
+        exit_price = np.select(
+            [is_signal, is_stop, is_take],
+            [
+                exit_open,
+                np.where(after_entry, np.minimum(exit_open, stop_loss), stop_loss),
+                np.where(after_entry, np.maximum(exit_open, take_profit), take_profit),
+            ],
+            default=close[exit_index],
+        )
+        exit_reason = np.select(
+            [is_signal, is_stop, is_take, is_end], list(EXIT_REASONS), default="end"
+        )
+
+        return {
+            "entry_index": entry_index - start,
+            "exit_index": exit_index - start,
+            "entry_price": entry_price,
+            "exit_price": exit_price,
+            "exit_reason": exit_reason,
+        }
+
+    def run(self, signals, symbol="", signal_column="Signal"):
+        """
+        Backtests one signal frame.
+
+        Args:
+            signals (pl.DataFrame): Output of TradingStrategy (timestamp, OHLC and the signal column),
+                sorted by timestamp. An "ATR" column is used when present.
+            symbol (str): Name of the backtested symbol.
+            signal_column (str): Column with the BUY/SELL/HOLD signals.
+
+        Returns:
+            BacktestResult: Trades, equity curve and statistics.
+        """
+        return self.run_range(self.prepare(signals, signal_column), symbol)
+
+    def prepare(self, signals, signal_column="Signal"):
+        """
+        Extracts the price arrays and finds the exits of all potential trades of a signal frame.
+
+        The result can be backtested over any range of bars with `run_range`,
+        e.g. the overlapping windows of a walk-forward optimization, without
+        searching the exits again.
+
+        Args:
+            signals (pl.DataFrame): Output of TradingStrategy (timestamp, OHLC and the signal column),
+                sorted by timestamp. An "ATR" column is used when present.
+            signal_column (str): Column with the BUY/SELL/HOLD signals.
+
+        Returns:
+            PreparedSignals: The prepared frame.
+        """
+        if "ATR" not in signals.columns:
+            signals = signals.with_columns([
+                IndicatorExpressions.atr(pl.col("high"), pl.col("low"), pl.col("close"), self.atr_window).alias("ATR")
+            ])
+
+        # Zwykłe tablice NumPy bez kopiowania (widoki z polars mają wolne wycinanie)
+        timestamps = signals["timestamp"].to_numpy().view(np.ndarray)
+        open_, high, low, close = (
+            signals[column].cast(pl.Float64).to_numpy().view(np.ndarray) for column in ("open", "high", "low", "close")
+        )
+        atr = np.array(signals["ATR"].fill_null(float("nan")).to_numpy(), dtype=np.float64)
+        buy = np.array((signals[signal_column] == "BUY").cast(pl.UInt8).to_numpy(), dtype=bool)
+        sell = np.array((signals[signal_column] == "SELL").cast(pl.UInt8).to_numpy(), dtype=bool)
+
+        candidates = self._candidates(open_, high, low, close, atr, buy, sell)
+        return PreparedSignals(timestamps, open_, high, low, close, candidates)
+
+    def run_range(self, prepared, symbol="", start=0, end=None):
+        """
+        Backtests the bars [start, end) of a prepared signal frame.
+
+        The result equals `run` on the same slice of the signal frame (with the
+        ATR of the whole frame): trading starts flat at `start` and a trade
+        still open is closed on the last bar.
+
+        Args:
+            prepared (PreparedSignals): Output of `prepare`.
+            symbol (str): Name of the backtested symbol.
+            start (int): First bar.
+            end (int, optional): Bar after the last one (default: the end of the frame).
+
+        Returns:
+            BacktestResult: Trades, equity curve and statistics.
+        """
+        end = len(prepared.close) if end is None else min(end, len(prepared.close))
+        trades = self._simulate(prepared, start, end)
+        return self._report(symbol, prepared.timestamps[start:end], prepared.close[start:end], trades)
+
+    def chain(self, results, symbol=""):
+        """
+        Joins backtests of consecutive bar ranges into one, as if the capital
+        at the end of each range were reinvested in the next.
+
+        Args:
+            results (list): BacktestResults of consecutive ranges (at least one), in time order.
+            symbol (str): Name of the backtested symbol.
+
+        Returns:
+            BacktestResult: Trades, equity curve and statistics of all the ranges.
+        """
+        equity_parts, trade_parts = [], []
+        capital = self.initial_capital
+        for result in results:
+            scale = capital / self.initial_capital
+            equity_parts.append(result.equity.with_columns([pl.col("equity") * scale]))
+            trade_parts.append(result.trades.with_columns([pl.col("pnl") * scale]))
+            capital = result.stats["final_equity"] * scale
+        equity_frame = pl.concat(equity_parts)
+        trades_frame = pl.concat(trade_parts)
+
+        timestamps = np.array(equity_frame["timestamp"].to_numpy())
+        equity = np.array(equity_frame["equity"].to_numpy(), dtype=np.float64)
+        entry_time = np.array(trades_frame["entry_time"].to_numpy())
+        exit_time = np.array(trades_frame["exit_time"].to_numpy())
+        trade_of_bar = np.searchsorted(entry_time, timestamps, side="right") - 1
+        in_position = (trade_of_bar >= 0) & (timestamps < exit_time[np.maximum(trade_of_bar, 0)]) if len(entry_time) \
+            else np.zeros(len(timestamps), dtype=bool)
+
+        trade_returns = np.array(trades_frame["return"].to_numpy(), dtype=np.float64)
+        stats = self._stats(timestamps, equity, trade_returns, trades_frame, in_position)
+        return BacktestResult(symbol, trades_frame, equity_frame, stats)
+
+    def _report(self, symbol, timestamps, close, trades):
+        """
+        Builds the equity curve, the trade list and the statistics.
+        """
+        n = len(close)
+        entry_index, exit_index = trades["entry_index"], trades["exit_index"]
+        entry_fill = trades["entry_price"] * (1 + self.slippage)
+        exit_fill = trades["exit_price"] * (1 - self.slippage)
+        trade_returns = exit_fill * (1 - self.fee_rate) / (entry_fill * (1 + self.fee_rate)) - 1
+
+        # Kapitał przed i po każdej transakcji
+        capital_after = self.initial_capital * np.cumprod(1 + trade_returns)
+        capital_before = np.concatenate(([self.initial_capital], capital_after[:-1]))
+        units = capital_before / (entry_fill * (1 + self.fee_rate))
+
+        # Krzywa kapitału: wycena pozycji po cenie zamknięcia, gotówka poza pozycją
+        equity = np.full(n, self.initial_capital)
+        in_position = np.zeros(n, dtype=bool)
+        if len(entry_index):
+            bar_index = np.arange(n)
+            trade_of_bar = np.searchsorted(entry_index, bar_index, side="right") - 1
+            has_trade = trade_of_bar >= 0
+            trade = np.maximum(trade_of_bar, 0)
+            in_position = has_trade & (bar_index < exit_index[trade])
+            equity = np.where(has_trade, capital_after[trade], equity)
+            equity = np.where(in_position, units[trade] * close, equity)
+
+        holding_bars = exit_index - entry_index + 1
+        trades_frame = pl.DataFrame({
+            "entry_time": timestamps[entry_index],
+            "exit_time": timestamps[exit_index],
+            "entry_price": entry_fill,
+            "exit_price": exit_fill,
+            "return": trade_returns,
+            "pnl": capital_after - capital_before,
+            "holding_bars": holding_bars,
+            "exit_reason": trades["exit_reason"],
+        })
+        equity_frame = pl.DataFrame({"timestamp": timestamps, "equity": equity})
+        stats = self._stats(timestamps, equity, trade_returns, trades_frame, in_position)
+        return BacktestResult(symbol, trades_frame, equity_frame, stats)
+
+    def _stats(self, timestamps, equity, trade_returns, trades, in_position):
+        n = len(equity)
+        final_equity = float(equity[-1]) if n else self.initial_capital
+        stats = {
+            "bars": n,
+            "trades": len(trade_returns),
+            "final_equity": final_equity,
+            "total_return": final_equity / self.initial_capital - 1,
+            "exposure": float(in_position.mean()) if n else 0.0,
+        }
+
+        if n > 1:
+            bar_ms = float(np.median(np.diff(timestamps)))
+            bars_per_year = 365 * DAY_MS / bar_ms if bar_ms > 0 else 0
+            years = n / bars_per_year if bars_per_year else 0
+            returns = np.diff(equity) / equity[:-1]
+            std = returns.std()
+            running_max = np.maximum.accumulate(equity)
+            stats.update({
+                "cagr": (final_equity / self.initial_capital) ** (1 / years) - 1 if years > 0 and final_equity > 0 else None,
+                "sharpe": float(returns.mean() / std * np.sqrt(bars_per_year)) if std > 0 else None,
+                "max_drawdown": float((equity / running_max - 1).min()),
+            })
+
+        if len(trade_returns):
+            gains = trade_returns[trade_returns > 0]
+            losses = trade_returns[trade_returns <= 0]
+            pnl = trades["pnl"].to_numpy()
+            stats.update({
+                "win_rate": len(gains) / len(trade_returns),
+                "avg_trade_return": float(trade_returns.mean()),
+                "best_trade": float(trade_returns.max()),
+                "worst_trade": float(trade_returns.min()),
+                "profit_factor": float(pnl[pnl > 0].sum() / -pnl[pnl <= 0].sum()) if len(losses) and pnl[pnl <= 0].sum() < 0 else None,
+                "avg_holding_bars": float(trades["holding_bars"].mean()),
+                "exit_reasons": {reason: int((trades["exit_reason"] == reason).sum()) for reason in EXIT_REASONS},
+            })
+        return stats
+
+
+async def backtest_datasets(strategy_config, strategies, data_dir=DATA_DIR, symbols=None, backtester=None):
+    """
+    Runs strategies over the datasets and backtests each strategy's signals.
+
+    Args:
+        strategy_config (dict): Strategy configuration with the indicator windows.
+        strategies (list): Strategy configurations for TradingStrategy.generate_signals_multi.
+        data_dir (str): Directory of '<COIN>_USDT.csv' datasets.
+        symbols (list, optional): Dataset names to run (e.g., ['BTC_USDT']); default all.
+        backtester (Backtester, optional): The backtester. Defaults to the main.py TP/SL rule.
+
+    Returns:
+        dict: (dataset name, strategy label) -> BacktestResult.
+    """
+    backtester = backtester or Backtester()
+    trading_strategy = TradingStrategy(strategy_config)
+    results = {}
+    for file_path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        if symbols and name not in symbols:
+            continue
+        price_data = load_dataset(file_path)
+        signals = await trading_strategy.generate_signals_multi(price_data, strategies)
+        for strategy in strategies:
+            label = strategy.get("label", strategy["name"])
+            results[(name, label)] = backtester.run(signals, name, f"Signal_{label}")
+    return results
+
+
+async def main(args):
+    strategy_config = {
+        "rsi_window": 14,
+        "bollinger_window": 20,
+        "bollinger_std_dev": 2,
+        "mfi_window": 14,
+        "momentum_window": 14,
+    }
+    backtester = Backtester(args.tp_sl_multiplier, fee_rate=args.fee, slippage=args.slippage)
+    strategies = [{"name": name} for name in args.strategies]
+    results = await backtest_datasets(strategy_config, strategies, args.data_dir, args.symbols, backtester)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary = {}
+    for (name, label), result in results.items():
+        result.equity.write_csv(os.path.join(args.output_dir, f"{name}_{label}_equity.csv"))
+        result.trades.write_csv(os.path.join(args.output_dir, f"{name}_{label}_trades.csv"))
+        summary[f"{name}/{label}"] = result.stats
+        logging.info(
+            f"{name} {label}: {result.stats['trades']} trades, return {result.stats['total_return']:.2%}, "
+            f"max drawdown {result.stats.get('max_drawdown', 0):.2%}"
+        )
+
+    with open(os.path.join(args.output_dir, "summary.json"), "w") as file:
+        json.dump(summary, file, indent=2)
+    logging.info(f"Backtest results saved to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Backtest strategies over the historical datasets.")
+    parser.add_argument("--strategies", nargs="+", default=["rsi_macd", "bollinger_breakout", "money_flow_momentum"],
+                        help="Registered strategy names")
+    parser.add_argument("--symbols", nargs="+", default=None, help="Dataset names, e.g. BTC_USDT ETH_USDT")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Datasets directory")
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help="Directory of the equity curves and trades")
+    parser.add_argument("--tp-sl-multiplier", type=float, default=TP_SL_MULTIPLIER, help="ATR multiplier of TP/SL")
+    parser.add_argument("--fee", type=float, default=FEE_RATE, help="Fee rate per side")
+    parser.add_argument("--slippage", type=float, default=SLIPPAGE, help="Slippage per side")
+
+    asyncio.run(main(parser.parse_args()))
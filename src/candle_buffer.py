@@ -0,0 +1,183 @@
+import numpy as np
+import polars as pl
+
+VALUE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+class CandleRingBuffer:
+    """
+    A fixed-capacity, array-backed ring buffer of OHLCV candles for one symbol.
+
+    Every candle is written twice, at slot `i` and `i + capacity`, so the
+    current window is always one contiguous slice of the backing arrays.
+    Appends are O(1) and column access returns NumPy views without copying.
+    Views share memory with the buffer and change when new candles arrive.
+    `version` grows with every write, so it identifies the current contents
+    (e.g., in IndicatorCache keys).
+    """
+
+    def __init__(self, capacity):
+        """
+        Initializes an empty buffer.
+
+        Args:
+            capacity (int): Maximum number of candles kept (the newest ones).
+        """
+        if capacity <= 0:
+            raise ValueError(f"Capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(VALUE_COLUMNS), 2 * capacity), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+        self.version = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def last_timestamp(self):
+        """
+        int: Timestamp of the newest candle, or None when the buffer is empty.
+        """
+        if not self._size:
+            return None
+        return int(self._timestamps[self._start + self._size - 1])
+
+    def _write(self, slot, candle):
+        self._timestamps[slot] = self._timestamps[slot + self.capacity] = int(candle[0])
+        self._values[:, slot] = self._values[:, slot + self.capacity] = candle[1:6]
+        self.version += 1
+
+    def append(self, candle):
+        """
+        Appends a candle in O(1).
+
+        A candle with the same timestamp as the newest one replaces it (the candle
+        was still open), older candles are ignored.
+
+        Args:
+            candle (list): [timestamp, open, high, low, close, volume].
+
+        Returns:
+            bool: True when a new candle was added, False otherwise.
+        """
+        last_timestamp = self.last_timestamp
+        if last_timestamp is not None and candle[0] <= last_timestamp:
+            if candle[0] == last_timestamp:
+                self._write((self._start + self._size - 1) % self.capacity, candle)
+            return False
+
+        if self._size < self.capacity:
+            self._write(self._start + self._size, candle)
+            self._size += 1
+        else:
+            self._write(self._start, candle)
+            self._start = (self._start + 1) % self.capacity
+        return True
+
+    def extend(self, candles):
+        """
+        Appends candles sorted by timestamp.
+
+        An empty buffer is filled with one vectorized copy.
+
+        Args:
+            candles (list): A list of OHLCV data.
+
+        Returns:
+            int: Number of new candles added.
+        """
+        if not candles:
+            return 0
+
+        if not self._size:
+            array = np.asarray(candles[-self.capacity:], dtype=np.float64)
+            count = len(array)
+            for offset in (0, self.capacity):
+                self._timestamps[offset:offset + count] = array[:, 0]
+                self._values[:, offset:offset + count] = array[:, 1:6].T
+            self._start = 0
+            self._size = count
+            self.version += 1
+            return count
+
+        added = 0
+        for candle in candles:
+            added += self.append(candle)
+        return added
+
+    def timestamps(self):
+        """
+        Returns:
+            np.ndarray: Read-only view of the timestamps, oldest first.
+        """
+        view = self._timestamps[self._start:self._start + self._size]
+        view.flags.writeable = False
+        return view
+
+    def column(self, name):
+        """
+        Returns a read-only view of a value column, oldest first.
+
+        Args:
+            name (str): One of 'open', 'high', 'low', 'close', 'volume'.
+
+        Returns:
+            np.ndarray: Contiguous view into the buffer.
+        """
+        if name == "timestamp":
+            return self.timestamps()
+        view = self._values[VALUE_COLUMNS.index(name), self._start:self._start + self._size]
+        view.flags.writeable = False
+        return view
+
+    def series(self, name):
+        """
+        Returns a column as a Polars Series built straight from the contiguous view.
+
+        Args:
+            name (str): Column name.
+
+        Returns:
+            pl.Series: The column values.
+        """
+        return pl.Series(name, self.column(name))
+
+    def to_polars(self):
+        """
+        Returns:
+            pl.DataFrame: The candles with the same columns main.py used to build from lists.
+        """
+        return pl.DataFrame([self.series(name) for name in ("timestamp",) + VALUE_COLUMNS])
+
+
+class CandleStore:
+    """
+    Per-symbol collection of CandleRingBuffer instances.
+    """
+
+    def __init__(self, capacity=1000):
+        """
+        Args:
+            capacity (int): Capacity of each symbol's buffer.
+        """
+        self.capacity = capacity
+        self.buffers = {}
+
+    def get(self, symbol):
+        """
+        Returns the buffer of the symbol, creating it on first use.
+        """
+        if symbol not in self.buffers:
+            self.buffers[symbol] = CandleRingBuffer(self.capacity)
+        return self.buffers[symbol]
+
+    def update(self, symbol, candles):
+        """
+        Appends the candles of the symbol.
+
+        Returns:
+            int: Number of new candles added.
+        """
+        return self.get(symbol).extend(candles)
@@ -0,0 +1,121 @@
+import asyncio
+import csv
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+import ccxt
+import ccxt.pro as ccxt_pro
+
+# 🔧 Ścieżki
+LIVE_DATA_DIR = "D:/TitanFlow/data/live_data"
+
+
+class CandleSource(ABC):
+    """
+    Base class of closed-candle sources used by `DataFetcher.stream_candles`.
+
+    Subclasses implement `stream` as an async generator yielding each candle
+    ([timestamp, open, high, low, close, volume]) once it has closed.
+    """
+
+    @abstractmethod
+    async def stream(self, symbol, timeframe):
+        """
+        Yields closed candles of the symbol as they arrive.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTC/USDT').
+            timeframe (str): The time frame of the candles (e.g., '1m').
+        """
+
+    async def close(self):
+        """
+        Releases the resources held by the source.
+        """
+        return None
+
+
+class WebSocketCandleSource(CandleSource):
+    """
+    Pushes closed candles from the exchange's websocket kline stream (ccxt.pro).
+
+    A candle is treated as closed as soon as a candle with a newer timestamp arrives.
+    """
+
+    def __init__(self, exchange=None, reconnect_delay=1.0):
+        """
+        Initializes the WebSocketCandleSource.
+
+        Args:
+            exchange (ccxt.pro.Exchange, optional): Websocket exchange instance. Defaults to Bybit spot.
+            reconnect_delay (float): Seconds to wait before watching again after a network error.
+        """
+        self.exchange = exchange or ccxt_pro.bybit({
+            'options': {
+                'defaultType': 'spot',  # Default to spot markets
+            },
+        })
+        self.reconnect_delay = reconnect_delay
+
+    async def stream(self, symbol, timeframe):
+        pending = None
+        while True:
+            try:
+                candles = await self.exchange.watch_ohlcv(symbol, timeframe)
+            except ccxt.NetworkError as network_err:
+                logging.warning(f"Websocket error for {symbol} {timeframe}: {network_err}. Reconnecting...")
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            for candle in candles:
+                if pending is not None and candle[0] > pending[0]:
+                    yield pending
+                if pending is None or candle[0] >= pending[0]:
+                    pending = list(candle)  # Kopia, bo ccxt aktualizuje świecę w miejscu
+
+    async def close(self):
+        await self.exchange.close()
+
+
+class ReplayCandleSource(CandleSource):
+    """
+    Replays candles from local CSV files (e.g., data/live_data/BTCUSDT_data.csv) for offline testing.
+    """
+
+    def __init__(self, data_dir=LIVE_DATA_DIR, interval=0.0):
+        """
+        Initializes the ReplayCandleSource.
+
+        Args:
+            data_dir (str): Directory with '<SYMBOL>_data.csv' files, as written by get_data_for_model.
+            interval (float): Seconds to wait between candles (0 replays as fast as possible).
+        """
+        self.data_dir = data_dir
+        self.interval = interval
+
+    @staticmethod
+    def _parse_timestamp(value):
+        """
+        Parses a timestamp column value ('YYYY-MM-DD', 'YYYY-MM-DD HH:MM:SS' or milliseconds) into milliseconds.
+        """
+        if value.isdigit():
+            return int(value)
+        for date_format in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d'):
+            try:
+                parsed = datetime.strptime(value, date_format)
+                return int(parsed.replace(tzinfo=timezone.utc).timestamp() * 1000)
+            except ValueError:
+                continue
+        raise ValueError(f"Invalid timestamp: {value}")
+
+    async def stream(self, symbol, timeframe):
+        file_path = os.path.join(self.data_dir, f"{symbol.replace('/', '')}_data.csv")
+        with open(file_path, "r", newline="") as file:
+            for row in csv.DictReader(file):
+                yield [
+                    self._parse_timestamp(row["timestamp"]),
+                    float(row["open"]), float(row["high"]), float(row["low"]),
+                    float(row["close"]), float(row["volume"]),
+                ]
+                await asyncio.sleep(self.interval)
@@ -4,13 +4,34 @@ import ccxt
 import os
 import pandas as pd
 import numpy as np
+from ohlcv_cache import OHLCVCache, CACHE_DIR
+from feature_builder import FeatureBuilder
+from candle_stream import WebSocketCandleSource
+from request_cache import shared_read_cache
+from indicator_cache import series_version
 
 class DataFetcher:
-    def __init__(self):
+    def __init__(self, use_cache=True, cache_dir=CACHE_DIR, candle_source=None, use_read_cache=True,
+                 read_cache=None, indicator_cache=None):
         """
         Initializes the DataFetcher without requiring API keys.
+
+        Args:
+            use_cache (bool): Whether to keep OHLCV candles in the on-disk cache (default True).
+            cache_dir (str): Directory of the on-disk OHLCV cache.
+            candle_source (CandleSource, optional): Source of the streaming mode. Defaults to
+                the exchange's websocket stream, created on first use.
+            use_read_cache (bool): Whether to coalesce and cache exchange reads in memory (default True).
+            read_cache (ReadThroughCache, optional): The read cache. Defaults to the process-wide one,
+                so all components share their results.
+            indicator_cache (IndicatorCache, optional): Cache of the model features, shared with
+                the strategies.
         """
         self.exchange = self._initialize_exchange()
+        self.ohlcv_cache = OHLCVCache(cache_dir) if use_cache else None
+        self.feature_builder = FeatureBuilder(indicator_cache=indicator_cache)
+        self.candle_source = candle_source
+        self.read_cache = (read_cache or shared_read_cache()) if use_read_cache else None
 
     @staticmethod
     def _initialize_exchange():
@@ -32,6 +53,43 @@ class DataFetcher:
             logging.error(f"Error initializing exchange: {init_error}")
             raise
 
+    async def _call_exchange(self, method_name, *args, **kwargs):
+        """
+        Calls a method of the synchronous ccxt client in a worker thread.
+
+        Args:
+            method_name (str): Name of the ccxt method (e.g., 'fetch_ohlcv').
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            The result of the ccxt call.
+        """
+        return await asyncio.to_thread(getattr(self.exchange, method_name), *args, **kwargs)
+
+    async def _cached_read(self, endpoint, key, loader):
+        """
+        Serves a read through the shared read cache, if enabled.
+
+        Args:
+            endpoint (str): Endpoint name (e.g., 'ohlcv').
+            key (tuple): Request parameters identifying the result.
+            loader (callable): Coroutine function performing the read.
+
+        Returns:
+            The result of the read.
+        """
+        if self.read_cache is None:
+            return await loader()
+        return await self.read_cache.get(endpoint, (self.exchange.id,) + key, loader)
+
+    async def close(self):
+        """
+        Releases the resources held by the fetcher (the streaming source, if any).
+        """
+        if self.candle_source is not None:
+            await self.candle_source.close()
+
     async def fetch_markets(self):
         """
         Fetches all available markets and filters for USDT pairs.
@@ -40,7 +98,7 @@ class DataFetcher:
             list: A list of symbols trading against USDT.
         """
         try:
-            markets = await asyncio.to_thread(self.exchange.fetch_markets)
+            markets = await self._cached_read('markets', (), lambda: self._call_exchange('fetch_markets'))
             usdt_pairs = [market['symbol'] for market in markets if market['quote'] == 'USDT']
             logging.info(f"Fetched {len(usdt_pairs)} USDT pairs.")
             return usdt_pairs
@@ -52,6 +110,9 @@ class DataFetcher:
         """
         Fetches historical OHLCV data for the specified symbol.
 
+        When the on-disk cache is enabled, only the candles missing since the last
+        cached one are downloaded and merged into the cache.
+
         Args:
             symbol (str): The trading pair symbol (e.g., 'BTC/USDT').
             timeframe (str): The time frame for the data (default '1d').
@@ -61,13 +122,95 @@ class DataFetcher:
             list: A list of OHLCV data.
         """
         try:
-            ohlcv = await asyncio.to_thread(self.exchange.fetch_ohlcv, symbol, timeframe, limit=limit)
-            logging.info(f"Fetched {len(ohlcv)} OHLCV data points for {symbol}.")
-            return ohlcv
+            return await self._cached_read(
+                'ohlcv', (symbol, timeframe, limit), lambda: self._load_ohlcv(symbol, timeframe, limit)
+            )
         except Exception as e:
             logging.error(f"Error fetching OHLCV data for {symbol}: {e}")
             return []
 
+    async def _load_ohlcv(self, symbol, timeframe, limit):
+        """
+        Downloads OHLCV data, incrementally when the on-disk cache is enabled.
+
+        Returns:
+            list: A list of OHLCV data.
+        """
+        if self.ohlcv_cache is None:
+            ohlcv = await self._call_exchange('fetch_ohlcv', symbol, timeframe, limit=limit)
+            logging.info(f"Fetched {len(ohlcv)} OHLCV data points for {symbol}.")
+            return ohlcv
+        return await self._fetch_ohlcv_incremental(symbol, timeframe, limit)
+
+    async def fetch_ohlcv_page(self, symbol, timeframe, since, limit=1000):
+        """
+        Fetches one page of OHLCV data starting at `since`, bypassing the on-disk cache.
+
+        Unlike `fetch_ohlcv`, errors are raised so that the caller can retry.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTC/USDT').
+            timeframe (str): The time frame for the data.
+            since (int): Timestamp in milliseconds of the first candle.
+            limit (int): The maximum number of data points to fetch (default 1000).
+
+        Returns:
+            list: A list of OHLCV data.
+        """
+        return await self._call_exchange('fetch_ohlcv', symbol, timeframe, since=since, limit=limit)
+
+    async def _fetch_ohlcv_incremental(self, symbol, timeframe, limit):
+        """
+        Serves OHLCV data from the on-disk cache, fetching only the missing tail.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTC/USDT').
+            timeframe (str): The time frame for the data.
+            limit (int): The number of data points to return.
+
+        Returns:
+            list: The newest `limit` OHLCV candles.
+        """
+        exchange_id = self.exchange.id
+        cached = self.ohlcv_cache.load(exchange_id, symbol, timeframe)
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        now = self.exchange.milliseconds()
+
+        if len(cached) >= limit and now - cached[-1][0] < limit * timeframe_ms:
+            # Pobieramy ponownie ostatnią świecę z cache, bo mogła być jeszcze otwarta
+            fresh = await self._call_exchange('fetch_ohlcv', symbol, timeframe, since=cached[-1][0], limit=limit)
+        else:
+            fresh = await self._call_exchange('fetch_ohlcv', symbol, timeframe, limit=limit)
+            if cached and fresh and fresh[0][0] > cached[-1][0] + timeframe_ms:
+                cached = []  # Luka między cache a nowymi danymi - zaczynamy od nowa
+
+        if fresh:
+            merged = OHLCVCache.merge(cached, fresh)
+            self.ohlcv_cache.save(exchange_id, symbol, timeframe, merged)
+        else:
+            merged = cached
+
+        ohlcv = merged[-limit:]
+        logging.info(f"Fetched {len(fresh)} new OHLCV data points for {symbol} ({len(ohlcv)} served).")
+        return ohlcv
+
+    async def stream_candles(self, symbol, timeframe='1d'):
+        """
+        Streams closed candles of the symbol as an async iterator.
+
+        Args:
+            symbol (str): The trading pair symbol (e.g., 'BTC/USDT').
+            timeframe (str): The time frame of the candles (default '1d').
+
+        Yields:
+            list: A closed candle [timestamp, open, high, low, close, volume].
+        """
+        if self.candle_source is None:
+            self.candle_source = WebSocketCandleSource()
+
+        async for candle in self.candle_source.stream(symbol, timeframe):
+            yield candle
+
     @staticmethod
     def calculate_rsi(ohlcv_data, window=14):
         """Calculate Relative Strength Index (RSI)."""
@@ -132,42 +275,9 @@ class DataFetcher:
         ohlcv = await self.fetch_ohlcv(symbol, timeframe, limit=limit)
 
         if ohlcv:
-            # Calculate all indicators
-            sma_50 = self.calculate_sma(ohlcv, 50)
-            sma_200 = self.calculate_sma(ohlcv, 200)  # SMA 200 z danych dla 200 dni
-            vwap = self.calculate_vwap(ohlcv)
-            atr = self.calculate_atr(ohlcv)
-            bb_middle, bb_upper, bb_lower = self.calculate_bollinger_bands(ohlcv)
-            rsi = self.calculate_rsi(ohlcv)
-            ema_12 = self.calculate_ema(ohlcv, 12)
-            ema_26 = self.calculate_ema(ohlcv, 26)
-            macd, macd_signal = self.calculate_macd(ohlcv)
-
-            # Prepare data in the required format for the model
-            data = {
-                "timestamp": [pd.to_datetime(entry[0], unit='ms').strftime('%Y-%m-%d') for entry in ohlcv],
-                # Convert and format timestamp
-                "open": [entry[1] for entry in ohlcv],
-                "high": [entry[2] for entry in ohlcv],
-                "low": [entry[3] for entry in ohlcv],
-                "close": [entry[4] for entry in ohlcv],
-                "volume": [entry[5] for entry in ohlcv],
-                "SMA_50": [sma_50] * len(ohlcv),
-                "SMA_200": [sma_200] * len(ohlcv),  # Teraz mamy dane dla SMA 200
-                "VWAP": [vwap] * len(ohlcv),
-                "ATR": [atr] * len(ohlcv),
-                "BB_middle": [bb_middle] * len(ohlcv),
-                "BB_upper": [bb_upper] * len(ohlcv),
-                "BB_lower": [bb_lower] * len(ohlcv),
-                "RSI": [rsi] * len(ohlcv),
-                "EMA_12": [ema_12] * len(ohlcv),
-                "EMA_26": [ema_26] * len(ohlcv),
-                "MACD": [macd] * len(ohlcv),
-                "MACD_signal": [macd_signal] * len(ohlcv)
-            }
-
-            # Convert data to DataFrame
-            df = pd.DataFrame(data)
+            # Compute all indicators as full series in one pass
+            df = self.feature_builder.build(ohlcv, (symbol, timeframe, series_version(ohlcv)))
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms').dt.strftime('%Y-%m-%d')
 
             # Ensure the directory exists
             output_dir = 'D:/TitanFlow/data/live_data'
@@ -183,7 +293,7 @@ class DataFetcher:
             logging.info(df.tail())  # Print the last few rows of data for verification
 
             # Return data for the model
-            return data
+            return df.to_dict('list')
         return None
 
     async def monitor_markets(self, symbols):
@@ -199,6 +309,26 @@ class DataFetcher:
             if data:
                 logging.info(f"Data for {symbol}: {data}")
 
+def create_data_fetcher(backend='thread', **kwargs):
+    """
+    Creates a data fetcher for the selected backend.
+
+    Args:
+        backend (str): 'thread' for the synchronous ccxt client run in worker threads,
+            'async' for the native ccxt.async_support client with a pooled aiohttp session.
+        **kwargs: Arguments passed to the fetcher constructor.
+
+    Returns:
+        DataFetcher: The fetcher instance.
+    """
+    if backend == 'thread':
+        return DataFetcher(**kwargs)
+    elif backend == 'async':
+        from async_data_fetcher import AsyncDataFetcher
+        return AsyncDataFetcher(**kwargs)
+    else:
+        raise ValueError(f"Unknown data fetcher backend: {backend}")
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
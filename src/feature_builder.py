@@ -0,0 +1,122 @@
+import pandas as pd
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+INDICATOR_COLUMNS = [
+    "SMA_50", "SMA_200", "VWAP", "ATR", "BB_middle", "BB_std", "BB_upper", "BB_lower",
+    "RSI", "EMA_12", "EMA_26", "MACD", "MACD_signal"
+]
+FEATURE_COLUMNS = OHLCV_COLUMNS + INDICATOR_COLUMNS
+
+
+class FeatureBuilder:
+    """
+    Builds the per-row feature matrix used by the LSTM model from OHLCV candles.
+
+    The candles are converted to a columnar frame once and every indicator is
+    computed as a full vectorized series over it.
+    """
+
+    def __init__(self, atr_window=14, bollinger_window=20, bollinger_std_dev=2, rsi_window=14,
+                 macd_short_window=12, macd_long_window=26, macd_signal_window=9, indicator_cache=None):
+        """
+        Initializes the FeatureBuilder with indicator parameters.
+
+        Args:
+            atr_window (int): The window size for ATR.
+            bollinger_window (int): The window size for the Bollinger Bands.
+            bollinger_std_dev (int): The number of standard deviations for the bands.
+            rsi_window (int): The window size for RSI.
+            macd_short_window (int): The fast EMA window of MACD.
+            macd_long_window (int): The slow EMA window of MACD.
+            macd_signal_window (int): The signal line window of MACD.
+            indicator_cache (IndicatorCache, optional): Cache of built feature frames.
+        """
+        self.atr_window = atr_window
+        self.bollinger_window = bollinger_window
+        self.bollinger_std_dev = bollinger_std_dev
+        self.rsi_window = rsi_window
+        self.macd_short_window = macd_short_window
+        self.macd_long_window = macd_long_window
+        self.macd_signal_window = macd_signal_window
+        self.indicator_cache = indicator_cache
+
+    @property
+    def params(self):
+        """
+        tuple: The indicator parameters, part of the cache key of the features.
+        """
+        return (
+            self.atr_window, self.bollinger_window, self.bollinger_std_dev, self.rsi_window,
+            self.macd_short_window, self.macd_long_window, self.macd_signal_window,
+        )
+
+    @staticmethod
+    def to_frame(ohlcv_data):
+        """
+        Converts OHLCV candles to a DataFrame.
+
+        Args:
+            ohlcv_data (list): A list of OHLCV data.
+
+        Returns:
+            pd.DataFrame: Columns timestamp (ms), open, high, low, close and volume.
+        """
+        return pd.DataFrame(ohlcv_data, columns=OHLCV_COLUMNS)
+
+    def build(self, ohlcv_data, series_key=None):
+        """
+        Computes all model features for every candle.
+
+        Leading values of the indicators, before their windows are filled, are
+        back-filled with the first available value, as in the training datasets.
+
+        Args:
+            ohlcv_data (list): A list of OHLCV data sorted by timestamp.
+            series_key (tuple, optional): Identifies the candles and their version in the
+                indicator cache (e.g., (symbol, timeframe, series_version(ohlcv_data))).
+
+        Returns:
+            pd.DataFrame: The OHLCV columns followed by the indicator columns.
+        """
+        if self.indicator_cache is None or series_key is None:
+            return self._build(ohlcv_data)
+        features = self.indicator_cache.get(
+            series_key, "features", self.params, lambda: self._build(ohlcv_data)
+        )
+        return features.copy()  # Wywołujący modyfikują ramkę (np. format timestamp)
+
+    def _build(self, ohlcv_data):
+        df = self.to_frame(ohlcv_data)
+        close = df['close']
+        volume = df['volume']
+        prev_close = close.shift()
+
+        df['SMA_50'] = close.rolling(window=50).mean()
+        df['SMA_200'] = close.rolling(window=200).mean()
+        df['VWAP'] = (close * volume).cumsum() / volume.cumsum()
+
+        true_range = pd.concat([
+            df['high'] - df['low'],
+            (df['high'] - prev_close).abs(),
+            (df['low'] - prev_close).abs(),
+        ], axis=1).max(axis=1)
+        df['ATR'] = true_range.rolling(window=self.atr_window).mean()
+
+        rolling_close = close.rolling(window=self.bollinger_window)
+        df['BB_middle'] = rolling_close.mean()
+        df['BB_std'] = rolling_close.std()
+        df['BB_upper'] = df['BB_middle'] + df['BB_std'] * self.bollinger_std_dev
+        df['BB_lower'] = df['BB_middle'] - df['BB_std'] * self.bollinger_std_dev
+
+        delta = close.diff()
+        gain = delta.where(delta > 0, 0).rolling(window=self.rsi_window).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_window).mean()
+        df['RSI'] = 100 - (100 / (1 + gain / loss))
+
+        df['EMA_12'] = close.ewm(span=self.macd_short_window, adjust=False).mean()
+        df['EMA_26'] = close.ewm(span=self.macd_long_window, adjust=False).mean()
+        df['MACD'] = df['EMA_12'] - df['EMA_26']
+        df['MACD_signal'] = df['MACD'].ewm(span=self.macd_signal_window, adjust=False).mean()
+
+        df[INDICATOR_COLUMNS] = df[INDICATOR_COLUMNS].fillna(method='bfill')
+        return df
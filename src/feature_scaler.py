@@ -0,0 +1,114 @@
+import os
+import numpy as np
+
+
+def scaler_path(model_path):
+    """
+    Returns the path of the scaling artifact saved next to a model.
+
+    Args:
+        model_path (str): Path to the saved model (e.g., 'model/lstm_best_model.h5').
+
+    Returns:
+        str: E.g., 'model/lstm_best_model_scaler.npz'.
+    """
+    return os.path.splitext(model_path)[0] + "_scaler.npz"
+
+
+class FeatureScaler:
+    """
+    Min-max scaling of many columns as NumPy arrays.
+
+    Computes the same `min_` and `scale_` as one sklearn MinMaxScaler per
+    column, but transforms all columns (and many windows) with one array
+    operation. The arrays may have leading dimensions, e.g. one scaling per
+    window of shape (windows, columns), which broadcast over the rows.
+    """
+
+    def __init__(self, columns, min_, scale_, feature_range=(0, 1)):
+        """
+        Args:
+            columns (list): Names of the columns, in order.
+            min_ (np.ndarray): Offset per column (..., columns).
+            scale_ (np.ndarray): Factor per column (..., columns).
+            feature_range (tuple): Target range of the scaled values.
+        """
+        self.columns = list(columns)
+        self.min_ = np.asarray(min_, dtype=np.float64)
+        self.scale_ = np.asarray(scale_, dtype=np.float64)
+        self.feature_range = tuple(feature_range)
+
+    @classmethod
+    def fit(cls, data, columns, feature_range=(0, 1)):
+        """
+        Fits the scaling of each column over the rows (the second to last axis).
+
+        Args:
+            data (np.ndarray): Values (rows, columns), or (windows, rows, columns) for one scaling per window.
+            columns (list): Names of the columns.
+            feature_range (tuple): Target range of the scaled values.
+
+        Returns:
+            FeatureScaler: The fitted scaler.
+        """
+        data = np.asarray(data, dtype=np.float64)
+        data_min = np.nanmin(data, axis=-2)
+        data_range = np.nanmax(data, axis=-2) - data_min
+        # Stała kolumna: jak w sklearn, zakres traktujemy jako 1
+        data_range = np.where(data_range < 10 * np.finfo(np.float64).eps, 1.0, data_range)
+        scale_ = (feature_range[1] - feature_range[0]) / data_range
+        min_ = feature_range[0] - data_min * scale_
+        return cls(columns, min_, scale_, feature_range)
+
+    def transform(self, data):
+        """
+        Scales values of all columns at once.
+
+        Args:
+            data (np.ndarray): Values (..., rows, columns) matching the leading dimensions of the scaler.
+
+        Returns:
+            np.ndarray: The scaled values.
+        """
+        return data * np.expand_dims(self.scale_, -2) + np.expand_dims(self.min_, -2)
+
+    def inverse_transform(self, values, column):
+        """
+        Maps scaled values of one column back, e.g. the model's outputs for a batch of windows.
+
+        Args:
+            values (np.ndarray): Scaled values, one per leading index of the scaler (or any shape
+                for a scaler without leading dimensions).
+            column (str): Name of the column.
+
+        Returns:
+            np.ndarray: The values in the original units.
+        """
+        index = self.columns.index(column)
+        return (np.asarray(values, dtype=np.float64) - self.min_[..., index]) / self.scale_[..., index]
+
+    def select(self, columns):
+        """
+        Returns the scaling of a subset of the columns, in the given order.
+        """
+        indexes = [self.columns.index(column) for column in columns]
+        return FeatureScaler(columns, self.min_[..., indexes], self.scale_[..., indexes], self.feature_range)
+
+    def save(self, file_path):
+        """
+        Saves the scaler as a NumPy archive.
+        """
+        np.savez(
+            file_path, columns=np.array(self.columns), min_=self.min_, scale_=self.scale_,
+            feature_range=np.array(self.feature_range, dtype=np.float64),
+        )
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Loads a scaler saved with `save`.
+        """
+        with np.load(file_path) as archive:
+            return cls(
+                archive["columns"].tolist(), archive["min_"], archive["scale_"], tuple(archive["feature_range"])
+            )
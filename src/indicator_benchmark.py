@@ -0,0 +1,429 @@
+import argparse
+import asyncio
+import gc
+import glob
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import polars as pl
+from data_fetcher import DataFetcher
+from utils import TechnicalIndicators
+
+# 🔧 Ścieżki
+DATASETS_DIR = "D:/TitanFlow/data/data/datasets"
+RESULTS_DIR = "D:/TitanFlow/data/benchmarks"
+
+# 🔧 Parametry benchmarku
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+REPEATS = 3
+REGRESSION_THRESHOLD = 0.10  # Spadek przepustowości traktowany jako regresja
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def _last(series):
+    """
+    Returns the last value of a Polars series as a float (NaN for null).
+    """
+    value = series[-1]
+    return float("nan") if value is None else float(value)
+
+
+async def _polars_mfi(frame):
+    # calculate_mfi zwraca wyrażenie (pl.when), więc wyliczamy je jawnie
+    expression = await TechnicalIndicators.calculate_mfi(
+        frame["high"], frame["low"], frame["close"], frame["volume"], 14
+    )
+    return pl.select(expression).to_series()
+
+
+# Wskaźnik -> (wywołanie pandas na tablicy świec, wywołanie Polars na ramce, nazwy wyników).
+# Wywołanie pandas zwraca ostatnie wartości (jak DataFetcher.calculate_*), wywołanie
+# Polars zwraca pełne serie. None oznacza brak wskaźnika w danym stosie.
+INDICATORS = {
+    "SMA": (
+        lambda fetcher, ohlcv: [fetcher.calculate_sma(ohlcv, 20)],
+        lambda frame: TechnicalIndicators.calculate_sma(frame["close"], 20),
+        ["SMA"],
+    ),
+    "EMA": (
+        lambda fetcher, ohlcv: [fetcher.calculate_ema(ohlcv, 12)],
+        lambda frame: TechnicalIndicators.calculate_ema(frame["close"], 12),
+        ["EMA"],
+    ),
+    "RSI": (
+        lambda fetcher, ohlcv: [fetcher.calculate_rsi(ohlcv, 14)],
+        lambda frame: TechnicalIndicators.calculate_rsi(frame["close"], 14),
+        ["RSI"],
+    ),
+    "MACD": (
+        lambda fetcher, ohlcv: list(fetcher.calculate_macd(ohlcv)),
+        lambda frame: TechnicalIndicators.calculate_macd(frame["close"]),
+        ["MACD", "Signal"],
+    ),
+    "ATR": (
+        lambda fetcher, ohlcv: [fetcher.calculate_atr(ohlcv, 14)],
+        lambda frame: TechnicalIndicators.calculate_atr(frame["high"], frame["low"], frame["close"], 14),
+        ["ATR"],
+    ),
+    "Bollinger": (
+        lambda fetcher, ohlcv: list(fetcher.calculate_bollinger_bands(ohlcv, 20, 2)),
+        lambda frame: TechnicalIndicators.calculate_bollinger_bands(frame["close"], 20, 2),
+        ["Middle Band", "Upper Band", "Lower Band"],
+    ),
+    "VWAP": (
+        lambda fetcher, ohlcv: [fetcher.calculate_vwap(ohlcv)],
+        None,
+        ["VWAP"],
+    ),
+    "MFI": (
+        None,
+        _polars_mfi,
+        ["MFI"],
+    ),
+    "Momentum": (
+        None,
+        lambda frame: TechnicalIndicators.calculate_momentum(frame["close"], 14),
+        ["Momentum"],
+    ),
+}
+
+
+def synthetic_ohlcv(rows, seed=42):
+    """
+    Generates a random-walk OHLCV series.
+
+    Args:
+        rows (int): Number of candles.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        np.ndarray: Array of shape (rows, 6) in the OHLCV column order.
+    """
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.001, rows)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, rows)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.uniform(1, 100, rows)
+    timestamp = np.arange(rows, dtype=np.float64) * 60_000
+    return np.column_stack([timestamp, open_, high, low, close, volume])
+
+
+def dataset_ohlcv(file_path):
+    """
+    Loads the OHLCV columns of a bundled dataset (data/data/datasets/*.csv).
+
+    Args:
+        file_path (str): Path to the dataset.
+
+    Returns:
+        np.ndarray: Array of shape (rows, 6) in the OHLCV column order.
+    """
+    df = pd.read_csv(file_path, usecols=OHLCV_COLUMNS[1:])
+    timestamp = np.arange(len(df), dtype=np.float64) * 86_400_000
+    return np.column_stack([timestamp, df[OHLCV_COLUMNS[1:]].to_numpy(dtype=np.float64)])
+
+
+class PeakMemory:
+    """
+    Measures the peak memory of a code block.
+
+    On Linux the resident set high-water mark is reset through /proc, which
+    also covers the Rust allocations of Polars. Elsewhere tracemalloc is used,
+    which only sees Python and NumPy allocations.
+    """
+
+    def __init__(self):
+        self.method = "rss" if os.path.exists("/proc/self/clear_refs") else "tracemalloc"
+        if self.method == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._baseline = 0
+
+    @staticmethod
+    def _status_kb(field):
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith(field):
+                    return int(line.split()[1])
+        return 0
+
+    def reset(self):
+        gc.collect()
+        if self.method == "rss":
+            with open("/proc/self/clear_refs", "w") as clear_refs:
+                clear_refs.write("5")  # Zeruje VmHWM do bieżącego VmRSS
+            self._baseline = self._status_kb("VmRSS:")
+        else:
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+
+    def peak_mb(self):
+        """
+        Returns:
+            float: Peak memory above the level at `reset()`, in MB.
+        """
+        if self.method == "rss":
+            return max(self._status_kb("VmHWM:") - self._baseline, 0) / 1024
+        return max(tracemalloc.get_traced_memory()[1] - self._baseline, 0) / 1024 / 1024
+
+
+class IndicatorBenchmark:
+    """
+    Benchmarks every indicator on the pandas stack (DataFetcher.calculate_*) and
+    the Polars stack (TechnicalIndicators) and checks that their results agree.
+    """
+
+    def __init__(self, repeats=REPEATS, indicators=None):
+        """
+        Initializes the IndicatorBenchmark.
+
+        Args:
+            repeats (int): Number of timed runs of each indicator.
+            indicators (list, optional): Names of the indicators (default: all of INDICATORS).
+        """
+        self.repeats = repeats
+        self.indicators = indicators or list(INDICATORS)
+        self.data_fetcher = DataFetcher(use_cache=False, use_read_cache=False)
+        self.memory = PeakMemory()
+        self.loop = asyncio.new_event_loop()
+
+    def _measure(self, function):
+        """
+        Runs the function `repeats` times.
+
+        Returns:
+            tuple: (result of the last run, list of run times in seconds, peak memory in MB).
+        """
+        timings = []
+        result = None
+        self.memory.reset()
+        for _ in range(self.repeats):
+            result = None
+            start = time.perf_counter()
+            result = function()
+            timings.append(time.perf_counter() - start)
+        return result, timings, self.memory.peak_mb()
+
+    def run_source(self, source, array):
+        """
+        Benchmarks all indicators on one OHLCV series.
+
+        Args:
+            source (str): Name of the series (e.g., 'synthetic', 'dataset:BTC_USDT').
+            array (np.ndarray): OHLCV array of shape (rows, 6).
+
+        Returns:
+            tuple: (list of timing results, list of agreement results).
+        """
+        rows = len(array)
+        frame = pl.DataFrame({name: array[:, i] for i, name in enumerate(OHLCV_COLUMNS)})
+
+        timing_results = []
+        agreement_results = []
+        for indicator in self.indicators:
+            pandas_call, polars_call, outputs = INDICATORS[indicator]
+            values = {}
+            for stack, call in (("pandas", pandas_call), ("polars", polars_call)):
+                if call is None:
+                    continue
+                if stack == "pandas":
+                    # Tablica NumPy zamiast listy świec z ccxt (pd.DataFrame przyjmuje obie): lista
+                    # 6 x 1e7 obiektów float mogłaby wyczerpać pamięć przed pomiarem
+                    function = lambda: call(self.data_fetcher, array)
+                else:
+                    function = lambda: self.loop.run_until_complete(call(frame))
+                try:
+                    result, timings, peak_mb = self._measure(function)
+                except MemoryError:
+                    logging.error(f"{indicator} ({stack}) ran out of memory at {rows} rows.")
+                    timing_results.append({
+                        "source": source, "rows": rows, "indicator": indicator, "stack": stack,
+                        "error": "MemoryError",
+                    })
+                    continue
+
+                values[stack] = self._last_values(stack, result, outputs)
+                median = statistics.median(timings)
+                timing_results.append({
+                    "source": source,
+                    "rows": rows,
+                    "indicator": indicator,
+                    "stack": stack,
+                    "median_s": median,
+                    "min_s": min(timings),
+                    "rows_per_s": rows / median if median > 0 else None,
+                    "peak_memory_mb": round(peak_mb, 3),
+                    "memory_method": self.memory.method,
+                })
+                logging.info(
+                    f"{source} {rows} rows {indicator} ({stack}): {median * 1000:.3f} ms, "
+                    f"{peak_mb:.1f} MB peak"
+                )
+
+            if len(values) == 2:
+                for output in outputs:
+                    pandas_value, polars_value = values["pandas"][output], values["polars"][output]
+                    abs_diff = abs(pandas_value - polars_value)
+                    scale = max(abs(pandas_value), abs(polars_value))
+                    agreement_results.append({
+                        "source": source,
+                        "rows": rows,
+                        "indicator": indicator,
+                        "output": output,
+                        "pandas": pandas_value,
+                        "polars": polars_value,
+                        "abs_diff": abs_diff,
+                        "rel_diff": abs_diff / scale if scale > 0 else 0.0,
+                    })
+        return timing_results, agreement_results
+
+    @staticmethod
+    def _last_values(stack, result, outputs):
+        """
+        Returns the last value of every output of an indicator as floats.
+        """
+        if stack == "pandas":
+            return {output: float(value) for output, value in zip(outputs, result)}
+        if isinstance(result, dict):
+            return {output: _last(result[output]) for output in outputs}
+        return {outputs[0]: _last(result)}
+
+    def close(self):
+        self.loop.close()
+
+
+def write_results(report, output_dir):
+    """
+    Writes a benchmark report as JSON.
+
+    Args:
+        report (dict): The benchmark report.
+        output_dir (str): Directory of the reports.
+
+    Returns:
+        str: Path of the report file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    file_path = os.path.join(output_dir, f"indicators_{report['run_id']}.json")
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w") as file:
+        json.dump(report, file, indent=2)
+    os.replace(tmp_path, file_path)
+    return file_path
+
+
+def compare_reports(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Finds throughput regressions between two benchmark reports.
+
+    Args:
+        baseline (dict): The earlier report.
+        current (dict): The new report.
+        threshold (float): Relative throughput drop reported as a regression (0.1 = 10%).
+
+    Returns:
+        list: Regressions with the baseline and current throughput.
+    """
+    def key(result):
+        return result["source"], result["rows"], result["indicator"], result["stack"]
+
+    baseline_results = {key(result): result for result in baseline["results"] if result.get("rows_per_s")}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_results.get(key(result))
+        if previous is None or not result.get("rows_per_s"):
+            continue
+        change = result["rows_per_s"] / previous["rows_per_s"] - 1
+        if change < -threshold:
+            regressions.append({
+                "source": result["source"],
+                "rows": result["rows"],
+                "indicator": result["indicator"],
+                "stack": result["stack"],
+                "baseline_rows_per_s": previous["rows_per_s"],
+                "rows_per_s": result["rows_per_s"],
+                "change": change,
+            })
+    return regressions
+
+
+def main(args):
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    report = {
+        "run_id": run_id,
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "pandas": pd.__version__,
+            "polars": pl.__version__,
+            "numpy": np.__version__,
+        },
+        "repeats": args.repeats,
+        "results": [],
+        "agreement": [],
+    }
+
+    sources = [("synthetic", lambda rows=rows: synthetic_ohlcv(rows)) for rows in args.sizes]
+    if not args.skip_datasets:
+        for file_path in sorted(glob.glob(os.path.join(args.datasets_dir, "*.csv"))):
+            name = os.path.splitext(os.path.basename(file_path))[0]
+            sources.append((f"dataset:{name}", lambda file_path=file_path: dataset_ohlcv(file_path)))
+
+    benchmark = IndicatorBenchmark(args.repeats, args.indicators)
+    try:
+        file_path = None
+        for source, load in sources:
+            timing_results, agreement_results = benchmark.run_source(source, load())
+            report["results"].extend(timing_results)
+            report["agreement"].extend(agreement_results)
+            # Zapis po każdej serii, aby przerwany przebieg (np. brak pamięci przy 1e7) nie przepadł
+            file_path = write_results(report, args.output_dir)
+    finally:
+        benchmark.close()
+    logging.info(f"Benchmark results saved to {file_path}")
+
+    worst = max(report["agreement"], key=lambda result: result["rel_diff"], default=None)
+    if worst is not None:
+        logging.info(
+            f"Largest pandas/Polars difference: {worst['indicator']} {worst['output']} "
+            f"({worst['source']}, {worst['rows']} rows): {worst['rel_diff']:.3e}"
+        )
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare_reports(baseline, report, args.threshold)
+        for regression in regressions:
+            logging.warning(
+                f"Regression: {regression['indicator']} ({regression['stack']}, {regression['source']}, "
+                f"{regression['rows']} rows) {regression['change']:.1%}"
+            )
+        logging.info(f"{len(regressions)} regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Benchmark the pandas and Polars indicator implementations.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="Synthetic series lengths")
+    parser.add_argument("--indicators", nargs="+", choices=list(INDICATORS), default=None, help="Indicators to run")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="Timed runs of each indicator")
+    parser.add_argument("--datasets-dir", default=DATASETS_DIR, help="Directory of the bundled datasets")
+    parser.add_argument("--skip-datasets", action="store_true", help="Only run the synthetic series")
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help="Directory of the JSON reports")
+    parser.add_argument("--compare", default=None, help="Earlier JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative throughput drop reported as a regression")
+
+    main(parser.parse_args())
@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+
+# 🔧 Maksymalna liczba zapamiętanych serii wskaźników
+MAX_ENTRIES = 4096
+
+
+def series_version(ohlcv_data):
+    """
+    Derives a version of a list of candles for use in cache keys.
+
+    The version changes when a candle is added or dropped and when the newest
+    (possibly still open) candle is updated.
+
+    Args:
+        ohlcv_data (list): A list of OHLCV data sorted by timestamp.
+
+    Returns:
+        tuple: The version, or None for an empty list.
+    """
+    if not ohlcv_data:
+        return None
+    return len(ohlcv_data), ohlcv_data[0][0], tuple(ohlcv_data[-1])
+
+
+class IndicatorCache:
+    """
+    A bounded LRU cache of computed indicator series.
+
+    Results are keyed by (series key, indicator, params), where the series key
+    identifies both the data and its version (e.g., the symbol and the candle
+    buffer's version), so a new candle never returns a stale value. One cache
+    is shared by the strategies, the TP/SL computation and the feature builder
+    within a cycle. Cached values are shared between callers and must not be
+    mutated.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        """
+        Initializes the IndicatorCache.
+
+        Args:
+            max_entries (int): Maximum number of cached series; least recently used are evicted.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(series_key, indicator, params):
+        return tuple(series_key), indicator, tuple(params)
+
+    def lookup(self, series_key, indicator, params=()):
+        """
+        Returns a cached series.
+
+        Args:
+            series_key (tuple): Identifies the data and its version (e.g., (symbol, version)).
+            indicator (str): Name of the indicator (e.g., 'ATR').
+            params (tuple): Parameters of the indicator (e.g., (14,)).
+
+        Returns:
+            tuple: (True, value) when cached, (False, None) otherwise.
+        """
+        key = self._key(series_key, indicator, params)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._entries[key]
+
+    def store(self, series_key, indicator, params, value):
+        """
+        Stores a computed series, evicting the least recently used ones above the limit.
+        """
+        if self.max_entries <= 0:
+            return
+        key = self._key(series_key, indicator, params)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, series_key, indicator, params, compute):
+        """
+        Returns the cached series or computes and stores it.
+
+        Args:
+            series_key (tuple): Identifies the data and its version (e.g., (symbol, version)).
+            indicator (str): Name of the indicator (e.g., 'ATR').
+            params (tuple): Parameters of the indicator (e.g., (14,)).
+            compute (callable): Function computing the series on a miss.
+
+        Returns:
+            The indicator series.
+        """
+        found, value = self.lookup(series_key, indicator, params)
+        if found:
+            return value
+        value = compute()
+        self.store(series_key, indicator, params, value)
+        return value
+
+    def clear(self):
+        """
+        Drops all cached series.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit and miss counters and the number of cached series.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,510 @@
+import argparse
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Client, Listener, wait
+import numpy as np
+from lstm_predictor import MODEL_PATH, NUM_FEATURES, PREDICT_BATCH_SIZE, SEQUENCE_LENGTH, ModelLoader
+
+# 🔧 Parametry serwera predykcji
+SERVER_ADDRESS = ("127.0.0.1", 6010)
+AUTHKEY_ENV = "TITANFLOW_INFERENCE_KEY"  # Zmienna z kluczem klientów; klucza domyślnego celowo nie ma
+CLIENT_SLOTS = PREDICT_BATCH_SIZE  # Okna, które klient może mieć jednocześnie w pamięci współdzielonej
+MAX_BATCH = PREDICT_BATCH_SIZE  # Maksymalna liczba okien w jednym przebiegu modelu
+BATCH_WINDOW = 0.005  # Sekundy zbierania żądań innych klientów przed przebiegiem modelu
+MAX_OUTPUTS = 8  # Maksymalna liczba wyjść modelu (jedna wartość na okno każde)
+STARTUP_TIMEOUT = 120.0
+
+
+def authkey_from_env():
+    """
+    Returns the key of the inference server from TITANFLOW_INFERENCE_KEY.
+
+    There is no default: an authenticated peer can make the server unpickle
+    anything, so the key must be a secret.
+
+    Raises:
+        RuntimeError: When the variable is not set.
+    """
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        raise RuntimeError(f"Set {AUTHKEY_ENV} to the key of the inference server")
+    return key.encode()
+
+
+def _attach(name):
+    """
+    Attaches to a client's shared memory block without registering it in the
+    resource tracker: the block belongs to the client, and the tracker would
+    otherwise unlink it when the server exits.
+    """
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _slot_arrays(memory, slots):
+    """
+    Returns the input windows (slots, SEQUENCE_LENGTH, NUM_FEATURES) and the outputs
+    (slots, MAX_OUTPUTS) stored in a client's shared memory block.
+    """
+    inputs = np.ndarray((slots, SEQUENCE_LENGTH, NUM_FEATURES), dtype=np.float32, buffer=memory.buf)
+    outputs = np.ndarray((slots, MAX_OUTPUTS), dtype=np.float32, buffer=memory.buf, offset=inputs.nbytes)
+    return inputs, outputs
+
+
+def _block_size(slots):
+    return slots * (SEQUENCE_LENGTH * NUM_FEATURES + MAX_OUTPUTS) * np.dtype(np.float32).itemsize
+
+
+def _check_request(inputs, slots, rows):
+    """
+    Returns why a "predict" request does not fit the client's block, or None when it does.
+    """
+    if not isinstance(rows, int) or not 1 <= rows <= SEQUENCE_LENGTH:
+        return f"Rows must be between 1 and {SEQUENCE_LENGTH}, got {rows!r}"
+    if not isinstance(slots, list) or not slots or not all(
+        isinstance(slot, int) and 0 <= slot < len(inputs) for slot in slots
+    ):
+        return f"Slot indexes must be a non-empty list of integers in [0, {len(inputs)})"
+    return None
+
+
+class InferenceServer:
+    """
+    Local process owning the LSTM model and serving predictions to other processes.
+
+    Each client creates a shared memory block with a fixed number of window
+    slots and sends only small control messages over an authenticated
+    connection (`multiprocessing.connection`):
+
+        ("attach", block name, slots)    -> ("attached", model version)
+        ("predict", request id, slot indexes, rows)
+                                         -> ("result", request id, outputs) or ("error", request id, message)
+        ("close",)
+        ("shutdown",)                    stops the server
+
+    Requests that do not fit the client's block, or malformed messages, are
+    answered with "error" without affecting other clients. The windows are
+    read from and the model's outputs written to the client's block. Requests arriving within `batch_window` seconds of each
+    other, from any client, are predicted together with one
+    `predict_on_batch` call per `max_batch` windows of the same length.
+    """
+
+    def __init__(self, address=SERVER_ADDRESS, authkey=None, model_path=MODEL_PATH, max_batch=MAX_BATCH,
+                 batch_window=BATCH_WINDOW):
+        """
+        Args:
+            address (tuple): (host, port) to listen on; port 0 picks a free port.
+            authkey (bytes, optional): Key the clients must present (default: from TITANFLOW_INFERENCE_KEY).
+            model_path (str): Path to the saved Keras model.
+            max_batch (int): Maximum number of windows per forward pass.
+            batch_window (float): Seconds to collect requests before a forward pass.
+        """
+        self.address = address
+        self.authkey = authkey or authkey_from_env()
+        self.model_loader = ModelLoader(model_path)
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.clients = {}  # Połączenie -> (blok pamięci, wejścia, wyjścia)
+        self.stats = {"requests": 0, "windows": 0, "batches": 0, "errors": 0}
+        self._new_connections = []
+        self._lock = threading.Lock()
+        self._running = False
+
+    def serve_forever(self, ready=None):
+        """
+        Loads the model, then serves the clients until a client sends "shutdown".
+
+        Args:
+            ready (Connection, optional): Receives the listening address once the model is
+                warmed up, or the error message when it could not be loaded.
+        """
+        self.model_loader.warm_up(background=False)
+        if self.model_loader.error is not None:
+            if ready is not None:
+                ready.send(f"Model could not be loaded: {self.model_loader.error}")
+            return
+
+        listener = Listener(self.address, authkey=self.authkey)
+        self.address = listener.address
+        wakeup_reader, wakeup_writer = multiprocessing.Pipe(duplex=False)
+        acceptor = threading.Thread(target=self._accept, args=(listener, wakeup_writer), daemon=True)
+        self._running = True
+        acceptor.start()
+        logging.info(f"Inference server listening on {self.address} (model {self.model_loader.version}).")
+        if ready is not None:
+            ready.send(self.address)
+
+        queue = []
+        deadline = None
+        try:
+            while self._running:
+                timeout = None if deadline is None else max(deadline - time.perf_counter(), 0)
+                for connection in wait(list(self.clients) + [wakeup_reader], timeout):
+                    if connection is wakeup_reader:
+                        wakeup_reader.recv_bytes()
+                        with self._lock:
+                            new_connections, self._new_connections = self._new_connections, []
+                        for new_connection in new_connections:
+                            self.clients[new_connection] = None
+                    else:
+                        self._receive(connection, queue)
+
+                if queue and deadline is None:
+                    deadline = time.perf_counter() + self.batch_window
+                queued_windows = sum(len(request[2]) for request in queue)
+                if queue and (time.perf_counter() >= deadline or queued_windows >= self.max_batch or not self._running):
+                    self._predict(queue)
+                    queue, deadline = [], None
+        finally:
+            listener.close()
+            for connection in list(self.clients):
+                self._detach(connection)
+            logging.info(f"Inference server stopped: {self.stats}")
+
+    def _accept(self, listener, wakeup_writer):
+        while True:
+            try:
+                connection = listener.accept()
+            except multiprocessing.AuthenticationError as e:
+                logging.warning(f"⚠️ Rejected inference client: {e}")
+                continue
+            except OSError:
+                return  # Listener zamknięty
+            with self._lock:
+                self._new_connections.append(connection)
+            wakeup_writer.send_bytes(b"")
+
+    def _receive(self, connection, queue):
+        try:
+            message = connection.recv()
+        except (EOFError, OSError):
+            self._detach(connection)
+            return
+
+        # Błędne żądanie jednego klienta dostaje odpowiedź "error" i nie zatrzymuje serwera
+        try:
+            kind = message[0]
+            if kind == "predict":
+                _, request_id, slots, rows = message
+                client = self.clients.get(connection)
+                error = "Client is not attached" if client is None else _check_request(client[1], slots, rows)
+                if error is not None:
+                    self._reply(connection, ("error", request_id, error))
+                else:
+                    queue.append((connection, request_id, slots, rows))
+            elif kind == "attach":
+                _, name, slots = message
+                self._attach_client(connection, name, slots)
+            elif kind == "close":
+                self._detach(connection)
+            elif kind == "shutdown":
+                self._running = False
+        except (TypeError, ValueError, IndexError) as e:
+            self._reply(connection, ("error", None, f"Malformed message {message!r}: {e}"))
+
+    def _attach_client(self, connection, name, slots):
+        try:
+            memory = _attach(name)
+        except OSError as e:
+            self._reply(connection, ("error", None, f"Shared memory {name} could not be attached: {e}"))
+            return
+        if not isinstance(slots, int) or slots < 1 or _block_size(slots) > memory.size:
+            memory.close()
+            message = f"Shared memory {name} of {memory.size} bytes does not hold {slots!r} slots"
+            self._reply(connection, ("error", None, message))
+            return
+        self.clients[connection] = (memory,) + _slot_arrays(memory, slots)
+        self._reply(connection, ("attached", self.model_loader.version))
+
+    def _predict(self, queue):
+        """
+        Runs the queued requests of all clients, batched by window length.
+        """
+        requests_by_rows = {}
+        for request in queue:
+            if request[0] in self.clients:
+                requests_by_rows.setdefault(request[3], []).append(request)
+
+        model = self.model_loader.get()
+        for rows, requests in requests_by_rows.items():
+            windows = np.concatenate([self.clients[connection][1][slots, :rows] for connection, _, slots, _ in requests])
+            try:
+                outputs = []
+                for start in range(0, len(windows), self.max_batch):
+                    predictions = model.predict_on_batch(windows[start:start + self.max_batch])
+                    if not isinstance(predictions, (list, tuple)):
+                        predictions = [predictions]
+                    outputs.append(np.column_stack([
+                        np.asarray(prediction).reshape(len(prediction), -1)[:, 0] for prediction in predictions
+                    ]))
+                    self.stats["batches"] += 1
+                outputs = np.concatenate(outputs)
+                if outputs.shape[1] > MAX_OUTPUTS:
+                    raise ValueError(f"The model has {outputs.shape[1]} outputs, at most {MAX_OUTPUTS} are supported")
+            except Exception as e:
+                logging.warning(f"⚠️ Błąd predykcji dla {len(windows)} okien: {e}")
+                self.stats["errors"] += len(requests)
+                for connection, request_id, _, _ in requests:
+                    self._reply(connection, ("error", request_id, str(e)))
+                continue
+
+            offset = 0
+            for connection, request_id, slots, _ in requests:
+                client = self.clients.get(connection)
+                if client is not None:
+                    client[2][slots, :outputs.shape[1]] = outputs[offset:offset + len(slots)]
+                    self._reply(connection, ("result", request_id, outputs.shape[1]))
+                offset += len(slots)
+            self.stats["requests"] += len(requests)
+            self.stats["windows"] += len(windows)
+
+    def _reply(self, connection, message):
+        try:
+            connection.send(message)
+        except OSError:
+            self._detach(connection)
+
+    def _detach(self, connection):
+        client = self.clients.pop(connection, None)
+        if client is not None:
+            memory, client = client[0], None  # Widoki NumPy muszą zniknąć przed zamknięciem bloku
+            memory.close()
+        connection.close()
+
+
+def _serve(address, authkey, model_path, max_batch, batch_window, ready):
+    logging.basicConfig(level=logging.INFO)
+    server = InferenceServer(address, authkey, model_path, max_batch, batch_window)
+    try:
+        server.serve_forever(ready)
+    except Exception as e:
+        logging.error(f"Inference server failed: {e}")
+        if not ready.closed:
+            try:
+                ready.send(f"Inference server failed: {e}")
+            except OSError:
+                pass
+        raise
+
+
+def start_server(address=("127.0.0.1", 0), authkey=None, model_path=MODEL_PATH, max_batch=MAX_BATCH,
+                 batch_window=BATCH_WINDOW, timeout=STARTUP_TIMEOUT):
+    """
+    Starts an InferenceServer in a new process and waits until its model is loaded.
+
+    Args:
+        address (tuple): (host, port) to listen on; port 0 picks a free port.
+        authkey (bytes, optional): Key the clients must present (default: a new random key).
+        model_path (str): Path to the saved Keras model.
+        max_batch (int): Maximum number of windows per forward pass.
+        batch_window (float): Seconds to collect requests before a forward pass.
+        timeout (float): Seconds to wait for the server to start.
+
+    Returns:
+        tuple: (multiprocessing.Process, the address the server listens on, the key to pass to the clients).
+    """
+    authkey = authkey or os.urandom(32)
+    # Spawn: proces serwera nie dziedziczy wątków ani stanu TensorFlow rodzica
+    context = multiprocessing.get_context("spawn")
+    ready_reader, ready_writer = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_serve, args=(address, authkey, model_path, max_batch, batch_window, ready_writer),
+        name="inference-server", daemon=True,
+    )
+    process.start()
+    ready_writer.close()
+
+    if not ready_reader.poll(timeout):
+        process.terminate()
+        raise TimeoutError(f"Inference server did not start within {timeout}s")
+    try:
+        reply = ready_reader.recv()
+    except EOFError:
+        raise RuntimeError(f"Inference server exited with code {process.exitcode}")
+    if isinstance(reply, str):
+        process.join(1)
+        raise RuntimeError(reply)
+    return process, reply, authkey
+
+
+class InferenceClient:
+    """
+    Connection of one process to an InferenceServer.
+
+    Windows are copied into the client's shared memory block and only slot
+    indexes travel over the connection. A reader thread resolves the
+    requests as their results arrive, so any number of threads or asyncio
+    tasks can have predictions in flight at once; the server batches them
+    together with the requests of other clients.
+    """
+
+    def __init__(self, address=SERVER_ADDRESS, authkey=None, slots=CLIENT_SLOTS):
+        """
+        Connects to the server and attaches a new shared memory block.
+
+        Args:
+            address (tuple): (host, port) of the server.
+            authkey (bytes, optional): Key of the server (default: from TITANFLOW_INFERENCE_KEY).
+            slots (int): Windows that can be in flight at once.
+        """
+        self.slots = slots
+        self.connection = Client(address, authkey=authkey or authkey_from_env())
+        self.memory = shared_memory.SharedMemory(create=True, size=_block_size(slots))
+        self.inputs, self.outputs = _slot_arrays(self.memory, slots)
+
+        self.connection.send(("attach", self.memory.name, slots))
+        reply = self.connection.recv()
+        if reply[0] != "attached":
+            self._closed = True
+            self.close()
+            raise RuntimeError(f"Inference server refused the client: {reply[-1]}")
+        self.model_version = reply[1]
+
+        self._free_slots = list(range(slots))
+        self._slots_released = threading.Condition()
+        self._pending = {}  # Id żądania -> (Future, sloty)
+        self._request_ids = itertools.count()
+        self._send_lock = threading.Lock()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read, name="inference-client", daemon=True)
+        self._reader.start()
+
+    def submit(self, windows):
+        """
+        Sends windows to the server, waiting for free slots if needed.
+
+        Args:
+            windows (np.ndarray): Scaled windows (windows, rows, NUM_FEATURES), at most `slots`
+                windows of at most SEQUENCE_LENGTH rows.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the model's outputs, one (windows, 1) array each.
+        """
+        count, rows = len(windows), windows.shape[1]
+        if count > self.slots or rows > SEQUENCE_LENGTH:
+            raise ValueError(f"{windows.shape} does not fit {self.slots} slots of {SEQUENCE_LENGTH} rows")
+
+        with self._slots_released:
+            while len(self._free_slots) < count:
+                if self._closed:
+                    raise ConnectionError("The inference client is closed")
+                self._slots_released.wait()
+            slots, self._free_slots = self._free_slots[:count], self._free_slots[count:]
+
+        self.inputs[slots, :rows] = windows
+        future = Future()
+        request_id = next(self._request_ids)
+        self._pending[request_id] = (future, slots)
+        try:
+            with self._send_lock:
+                self.connection.send(("predict", request_id, slots, rows))
+        except OSError as e:
+            self._pending.pop(request_id, None)
+            self._release(slots)
+            raise ConnectionError(f"The inference server is unreachable: {e}")
+        return future
+
+    def predict_sync(self, windows):
+        """
+        Predicts windows, blocking until the results arrive.
+
+        Args:
+            windows (np.ndarray): Scaled windows (windows, rows, NUM_FEATURES); more than
+                `slots` windows are sent in chunks.
+
+        Returns:
+            list: The model's outputs, one (windows, 1) array each (as `predict_on_batch`).
+        """
+        futures = [self.submit(windows[start:start + self.slots]) for start in range(0, len(windows), self.slots)]
+        chunks = [future.result() for future in futures]
+        return [np.concatenate([chunk[output] for chunk in chunks]) for output in range(len(chunks[0]))]
+
+    async def predict(self, windows):
+        """
+        Predicts windows without blocking the event loop (see `predict_sync`).
+        """
+        futures = [
+            asyncio.wrap_future(await asyncio.to_thread(self.submit, windows[start:start + self.slots]))
+            for start in range(0, len(windows), self.slots)
+        ]
+        chunks = await asyncio.gather(*futures)
+        return [np.concatenate([chunk[output] for chunk in chunks]) for output in range(len(chunks[0]))]
+
+    def _release(self, slots):
+        with self._slots_released:
+            self._free_slots.extend(slots)
+            self._slots_released.notify_all()
+
+    def _read(self):
+        try:
+            while True:
+                kind, request_id, value = self.connection.recv()
+                future, slots = self._pending.pop(request_id)
+                if kind == "result":
+                    result = [self.outputs[slots, output:output + 1].copy() for output in range(value)]
+                    self._release(slots)
+                    future.set_result(result)
+                else:
+                    self._release(slots)
+                    future.set_exception(RuntimeError(f"Inference server error: {value}"))
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self._slots_released:
+                self._closed = True
+                self._slots_released.notify_all()
+            for future, _ in list(self._pending.values()):
+                future.set_exception(ConnectionError("The inference server closed the connection"))
+            self._pending.clear()
+
+    def shutdown_server(self):
+        """
+        Asks the server to stop (after the requests it has already received).
+        """
+        with self._send_lock:
+            self.connection.send(("shutdown",))
+
+    def close(self):
+        """
+        Detaches from the server and releases the shared memory block.
+        """
+        if self.memory is None:
+            return
+        if not self._closed:
+            try:
+                with self._send_lock:
+                    self.connection.send(("close",))
+            except OSError:
+                pass
+            self._reader.join(5)
+        self.connection.close()
+        self.inputs = self.outputs = None
+        self.memory.close()
+        self.memory.unlink()
+        self.memory = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Serve LSTM predictions to local processes.")
+    parser.add_argument("--host", default=SERVER_ADDRESS[0], help="Address to listen on")
+    parser.add_argument("--port", type=int, default=SERVER_ADDRESS[1], help="Port to listen on")
+    parser.add_argument("--model", default=MODEL_PATH, help="Path to the saved Keras model")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="Maximum windows per forward pass")
+    parser.add_argument("--batch-window", type=float, default=BATCH_WINDOW,
+                        help="Seconds to collect requests before a forward pass")
+    args = parser.parse_args()
+
+    InferenceServer((args.host, args.port), None, args.model, args.max_batch, args.batch_window).serve_forever()
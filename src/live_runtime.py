@@ -0,0 +1,255 @@
+import asyncio
+import logging
+import time
+from collections import deque
+import polars as pl
+from candle_buffer import CandleStore
+from strategy import TradingStrategy
+from utils import TechnicalIndicators
+
+# 🔧 Parametry środowiska uruchomieniowego
+TP_SL_MULTIPLIER = 2  # Mnożnik ATR dla TP/SL
+ATR_WINDOW = 14
+BATCH_DELAY = 0.05  # Sekundy zbierania świec zamkniętych w tej samej chwili przed przeliczeniem
+LATENCY_SAMPLES = 10_000  # Liczba ostatnich pomiarów opóźnienia w raporcie
+REPORT_INTERVAL = 60.0  # Co ile sekund logować raport opóźnień
+RECONNECT_DELAY = 5.0  # Sekundy przed ponowną subskrypcją po błędzie strumienia
+
+
+async def log_signals(events):
+    """
+    Default sink: logs each changed signal in one line.
+
+    Args:
+        events (list): Signal events (see LiveRuntime).
+    """
+    for event in events:
+        logging.info(
+            f"{event['symbol']} {event['strategy']}: {event['signal']} @ {event['close']} "
+            f"(TP: {event['tp']}, SL: {event['sl']})"
+        )
+
+
+class LiveRuntime:
+    """
+    Long-running strategy runtime driven by closed candles.
+
+    Every symbol has its own lightweight task that waits for the next closed
+    candle from `DataFetcher.stream_candles` and appends it to the symbol's
+    ring buffer. The symbols that received candles are collected for
+    `batch_delay` seconds (candles of many symbols close at the same moment)
+    and the strategies and TP/SL are computed for those symbols only, in one
+    grouped pass. Only signals that differ from the last emitted signal of
+    the symbol and strategy are passed to the sinks.
+
+    The indicators are not cached: every evaluated symbol has just received
+    a candle, so a cache keyed by the buffer's version would never be hit.
+
+    Each event is a dict with 'symbol', 'strategy', 'timestamp', 'signal',
+    'close', 'atr', 'tp' and 'sl'.
+    """
+
+    def __init__(self, data_fetcher, strategy_config, strategies, timeframe="1m", capacity=300,
+                 sinks=None, tp_sl_multiplier=TP_SL_MULTIPLIER, batch_delay=BATCH_DELAY,
+                 report_interval=REPORT_INTERVAL):
+        """
+        Initializes the LiveRuntime.
+
+        Args:
+            data_fetcher (DataFetcher): Source of the candle streams (`stream_candles`).
+            strategy_config (dict): Strategy configuration with the indicator windows.
+            strategies (list): Strategy configurations for TradingStrategy.generate_signals_multi.
+            timeframe (str): Time frame of the candles (e.g., '1m').
+            capacity (int): Candles kept per symbol (the indicators' history).
+            sinks (list, optional): Async callables receiving each list of changed signal events.
+                Defaults to logging them.
+            tp_sl_multiplier (float): ATR multiplier of TP/SL.
+            batch_delay (float): Seconds to collect closed candles before computing the signals.
+            report_interval (float): Seconds between latency reports in the log (None disables them).
+        """
+        self.data_fetcher = data_fetcher
+        self.strategies = strategies
+        self.timeframe = timeframe
+        self.trading_strategy = TradingStrategy(strategy_config)
+        self.candle_store = CandleStore(capacity=capacity)
+        self.sinks = sinks if sinks is not None else [log_signals]
+        self.tp_sl_multiplier = tp_sl_multiplier
+        self.batch_delay = batch_delay
+        self.report_interval = report_interval
+
+        self.last_signals = {}  # (symbol, strategia) -> ostatni wysłany sygnał
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._pending = {}  # Symbol -> czas odbioru najstarszej nieprzeliczonej świecy (None dla danych startowych)
+        self._wakeup = asyncio.Event()
+        self._running = False
+        self._tasks = []
+
+    def seed(self, ohlcv_data):
+        """
+        Loads the history of the symbols before streaming; their signals are computed
+        in the first pass of the runtime. The newest candle of the history may still be
+        open; when it closes, the stream replaces it and the symbol is evaluated again.
+
+        Args:
+            ohlcv_data (dict): Symbol -> list of OHLCV data.
+        """
+        for symbol, ohlcv in ohlcv_data.items():
+            if self.candle_store.update(symbol, ohlcv):
+                self._pending.setdefault(symbol, None)
+        if self._pending:
+            self._wakeup.set()
+
+    async def _watch(self, symbol):
+        """
+        Appends the closed candles of one symbol to its buffer and schedules its evaluation.
+        """
+        while True:
+            try:
+                async for candle in self.data_fetcher.stream_candles(symbol, self.timeframe):
+                    received_at = time.perf_counter()
+                    buffer = self.candle_store.get(symbol)
+                    version = buffer.version
+                    buffer.append(candle)
+                    # Także gdy świeca zastąpiła najnowszą (otwartą przy starcie), nie tylko gdy doszła nowa
+                    if buffer.version != version:
+                        self._pending.setdefault(symbol, received_at)
+                        self._wakeup.set()
+                return  # Strumień zakończony (np. odtwarzanie z pliku)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Candle stream of {symbol} failed: {e}. Resubscribing in {RECONNECT_DELAY}s.")
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    async def _evaluate_loop(self):
+        # Po zatrzymaniu przeliczamy jeszcze świece, które przyszły przed końcem strumieni
+        while self._running or self._pending:
+            await self._wakeup.wait()
+            if self.batch_delay and self._running:
+                await asyncio.sleep(self.batch_delay)
+            self._wakeup.clear()
+            pending, self._pending = self._pending, {}
+            if not pending:
+                continue
+            try:
+                await self.evaluate(pending)
+            except Exception as e:
+                logging.error(f"Signal evaluation of {len(pending)} symbols failed: {e}")
+
+    async def evaluate(self, pending):
+        """
+        Computes the signals and TP/SL of the symbols with new candles and emits the changed ones.
+
+        Args:
+            pending (dict): Symbol -> perf_counter time the newest candle was received (None for seeded data).
+
+        Returns:
+            list: The emitted events.
+        """
+        symbols = [symbol for symbol in pending if len(self.candle_store.get(symbol))]
+        if not symbols:
+            return []
+
+        # Format długi: tylko pary z nowymi świecami, jeden przebieg dla wszystkich
+        frames = [
+            self.candle_store.get(symbol).to_polars().with_columns([pl.lit(symbol).alias("symbol")])
+            for symbol in symbols
+        ]
+        price_data = pl.concat(frames)
+        price_data = await TechnicalIndicators.calculate_batch(price_data, ["ATR"], {"atr_window": ATR_WINDOW})
+        signals = await self.trading_strategy.generate_signals_multi(price_data, self.strategies, symbol_column="symbol")
+
+        # Ostatnia świeca każdej pary (ramki są sklejone w kolejności symboli)
+        last_rows = []
+        end = 0
+        for frame in frames:
+            end += frame.height
+            last_rows.append(end - 1)
+        labels = [strategy.get("label", strategy["name"]) for strategy in self.strategies]
+        columns = ["symbol", "timestamp", "close", "ATR"] + [f"Signal_{label}" for label in labels]
+        latest = signals.select(columns)[last_rows].to_dicts()
+
+        events = []
+        for row in latest:
+            atr = row["ATR"]
+            tp = row["close"] + self.tp_sl_multiplier * atr if atr is not None else None
+            sl = row["close"] - self.tp_sl_multiplier * atr if atr is not None else None
+            for label in labels:
+                signal = row[f"Signal_{label}"]
+                key = (row["symbol"], label)
+                if self.last_signals.get(key) == signal:
+                    continue
+                self.last_signals[key] = signal
+                events.append({
+                    "symbol": row["symbol"],
+                    "strategy": label,
+                    "timestamp": row["timestamp"],
+                    "signal": signal,
+                    "close": row["close"],
+                    "atr": atr,
+                    "tp": tp,
+                    "sl": sl,
+                })
+
+        if events:
+            await asyncio.gather(*[sink(events) for sink in self.sinks])
+
+        finished_at = time.perf_counter()
+        self.latencies.extend(
+            finished_at - received_at for received_at in pending.values() if received_at is not None
+        )
+        return events
+
+    def latency_report(self):
+        """
+        Summarizes the candle-close-to-signal latency: the time from receiving a
+        closed candle to its signals being passed to the sinks.
+
+        Returns:
+            dict: Count and p50/p95/p99/max latency in seconds.
+        """
+        if not self.latencies:
+            return {"count": 0}
+
+        values = sorted(self.latencies)
+        return {
+            "count": len(values),
+            "p50": values[int(0.50 * (len(values) - 1))],
+            "p95": values[int(0.95 * (len(values) - 1))],
+            "p99": values[int(0.99 * (len(values) - 1))],
+            "max": values[-1],
+        }
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            logging.info(f"Candle-close-to-signal latency: {self.latency_report()}")
+
+    async def run(self, symbols):
+        """
+        Runs until every candle stream ends or `stop` is called.
+
+        Args:
+            symbols (list): Trading pairs to watch.
+        """
+        self._running = True
+        evaluator = asyncio.create_task(self._evaluate_loop())
+        reporter = asyncio.create_task(self._report_loop()) if self.report_interval else None
+        self._tasks = [asyncio.create_task(self._watch(symbol)) for symbol in symbols]
+        logging.info(f"Live runtime watching {len(symbols)} symbols ({self.timeframe}).")
+        try:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            self._running = False
+            self._wakeup.set()
+            await evaluator
+            if reporter is not None:
+                reporter.cancel()
+            logging.info(f"Candle-close-to-signal latency: {self.latency_report()}")
+
+    def stop(self):
+        """
+        Cancels the symbol tasks; `run` returns once the received candles are evaluated.
+        """
+        for task in self._tasks:
+            task.cancel()
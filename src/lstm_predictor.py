@@ -1,10 +1,14 @@
+import asyncio
+import io
 import os
+import sys
+import threading
+import time
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
-import tensorflow as tf
-from tensorflow.keras.models import load_model
-from sklearn.preprocessing import MinMaxScaler
 import logging
+from feature_scaler import FeatureScaler, scaler_path
 
 # 🔧 Ścieżki
 BASE_DIR = "D:/TitanFlow/data/data"
@@ -14,99 +18,482 @@ MODEL_PATH = os.path.join(BASE_DIR, "model/lstm_best_model.h5")
 # 🔧 Parametry modelu
 SEQUENCE_LENGTH = 100
 TP_SL_MULTIPLIER = 2  # Mnożnik ATR dla obliczeń TP/SL
+REQUIRED_COLUMNS = [
+    "close", "volume", "SMA_50", "SMA_200", "VWAP", "ATR", "BB_middle",
+    "BB_std", "BB_upper", "BB_lower", "RSI", "EMA_12", "EMA_26", "MACD",
+    "MACD_signal", "profit_signal"
+]
+NUM_FEATURES = len(REQUIRED_COLUMNS)
+PREDICT_BATCH_SIZE = 256  # Maksymalna liczba okien w jednym przebiegu modelu
+PREDICTION_CACHE_SIZE = 1024  # Maksymalna liczba zapamiętanych predykcji (jedna na symbol)
+STARTUP_BUDGET = 15.0  # Sekundy; dłuższe wczytywanie modelu jest zgłaszane w logu
 
-# ✅ Wczytaj model
-logging.info("🔄 Wczytywanie modelu...")
-model = load_model(MODEL_PATH)
+class ModelLoader:
+    """
+    Loads the LSTM model on first use instead of at import time.
 
-# ✅ Wczytaj dane do predykcji dla danego pliku
-def load_latest_data(file_path):
-    df = pd.read_csv(file_path)
+    TensorFlow is imported and the model deserialized only when `get` is
+    first called (or by `warm_up`, optionally in a background thread), so
+    components that never predict do not pay for it. The time of each step
+    is recorded in `report()`. The scaling artifact saved by the trainer
+    next to the model is loaded once by `get_scaler`. `version` identifies
+    the loaded model and its scaling artifact and changes with every (re)load.
+    """
 
-    if "timestamp" in df.columns:
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df.set_index("timestamp", inplace=True)
+    def __init__(self, model_path=MODEL_PATH, startup_budget=STARTUP_BUDGET):
+        """
+        Args:
+            model_path (str): Path to the saved Keras model.
+            startup_budget (float): Seconds the loading may take before a warning is logged.
+        """
+        self.model_path = model_path
+        self.startup_budget = startup_budget
+        self.model = None
+        self.scaler = None
+        self._scaler_checked = False
+        self.version = None
+        self.generation = 0
+        self.timings = {}
+        self.imported_modules = []
+        self.error = None
+        self._lock = threading.Lock()
+        self._warm_up_thread = None
 
-    required_columns = [
-        "close", "volume", "SMA_50", "SMA_200", "VWAP", "ATR", "BB_middle",
-        "BB_std", "BB_upper", "BB_lower", "RSI", "EMA_12", "EMA_26", "MACD",
-        "MACD_signal", "profit_signal"
-    ]
+    @property
+    def loaded(self):
+        return self.model is not None
 
-    # ✅ Jeśli brakuje `profit_signal`, dodaj jako 0
-    if "profit_signal" not in df.columns:
-        df["profit_signal"] = 0
+    def get(self):
+        """
+        Returns the model, loading it on the first call.
 
-    df = df[required_columns].fillna(method='bfill').fillna(method='ffill')  # Uzupełniamy braki
+        Returns:
+            tf.keras.Model: The loaded model.
+        """
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    self._load()
+        return self.model
 
-    return df[-SEQUENCE_LENGTH:]
+    def get_scaler(self):
+        """
+        Returns the training scaler of the model's input columns, loading it on the first call.
 
-# ✅ Skalowanie danych
-def scale_data(df):
-    scalers = {}
+        Returns:
+            FeatureScaler: The scaler, or None when the model has no scaling artifact
+                (each window is then scaled by itself, as before the artifact existed).
+        """
+        if not self._scaler_checked:
+            with self._lock:
+                if not self._scaler_checked:
+                    path = scaler_path(self.model_path)
+                    if os.path.exists(path):
+                        self.scaler = FeatureScaler.load(path).select(REQUIRED_COLUMNS)
+                    else:
+                        logging.warning(f"⚠️ Brak skalera {path}, okna skalowane osobno.")
+                    self._scaler_checked = True
+        return self.scaler
 
-    for col in df.columns:
-        scaler = MinMaxScaler(feature_range=(0, 1))
-        df[col] = scaler.fit_transform(df[col].values.reshape(-1, 1))  # Dopasowanie i transformacja
-        scalers[col] = scaler
+    def _load(self):
+        modules_before = set(sys.modules)
+        started_at = time.perf_counter()
+        from tensorflow.keras.models import load_model
+        imported_at = time.perf_counter()
 
-    return df, scalers
+        logging.info("🔄 Wczytywanie modelu...")
+        model = load_model(self.model_path)
+        loaded_at = time.perf_counter()
 
-# ✅ Predykcja dla pojedynczego tokena z obliczaniem TP i SL
-def make_prediction(file_path):
-    try:
-        latest_data = load_latest_data(file_path)
-        latest_data, scalers = scale_data(latest_data)
+        self.timings["tensorflow_import"] = imported_at - started_at
+        self.timings["model_load"] = loaded_at - imported_at
+        self.imported_modules = sorted(set(sys.modules) - modules_before)
+        self.generation += 1
+        # Wersja obejmuje też artefakt skalera: nowy skaler przy tym samym modelu unieważnia predykcje
+        artifact_path = scaler_path(self.model_path)
+        artifact_mtime = os.path.getmtime(artifact_path) if os.path.exists(artifact_path) else None
+        self.version = (self.generation, self.model_path, os.path.getmtime(self.model_path), artifact_mtime)
+        self.model = model
+
+        report = self.report()
+        logging.info(f"Model loaded: {report}")
+        if report["total"] > self.startup_budget:
+            logging.warning(f"⚠️ Model loading took {report['total']:.2f}s (budget {self.startup_budget:.2f}s)")
+
+    def reload(self, model_path=None):
+        """
+        Swaps the model: the next `get` loads it (and its scaler) again.
+
+        Args:
+            model_path (str, optional): Path to the new model (default: the current path).
+        """
+        with self._lock:
+            if model_path:
+                self.model_path = model_path
+            self.model = None
+            self.version = None
+            self.scaler = None
+            self._scaler_checked = False
+            self._warm_up_thread = None
+
+    def warm_up(self, background=True):
+        """
+        Loads the model and runs one prediction so the first real call is fast.
+
+        Args:
+            background (bool): Whether to warm up in a daemon thread and return immediately.
+
+        Returns:
+            threading.Thread: The warm-up thread, or None when run in the foreground.
+        """
+        if not background:
+            self._warm_up()
+            return None
+        if self._warm_up_thread is None:
+            self._warm_up_thread = threading.Thread(target=self._warm_up, name="model-warm-up", daemon=True)
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def _warm_up(self):
+        try:
+            model = self.get()
+            started_at = time.perf_counter()
+            model.predict(np.zeros((1, SEQUENCE_LENGTH, NUM_FEATURES)), verbose=0)
+            self.timings["warm_up"] = time.perf_counter() - started_at
+        except Exception as e:
+            self.error = e
+            logging.warning(f"⚠️ Błąd rozgrzewania modelu: {e}")
+
+    def report(self):
+        """
+        Returns:
+            dict: Whether the model is loaded, the seconds spent on the TensorFlow import,
+                the model load and the warm-up, their total, and the number and top-level
+                packages of the modules imported by the loading.
+        """
+        report = {"loaded": self.loaded, **self.timings}
+        report["total"] = sum(self.timings.values())
+        report["imported_modules"] = len(self.imported_modules)
+        report["imported_packages"] = sorted({name.split(".")[0] for name in self.imported_modules})
+        return report
+
+class PredictionCache:
+    """
+    A bounded LRU cache of the newest prediction of each symbol.
+
+    The result only changes when a new candle lands in the input window or
+    the model is swapped, so an entry is valid for one (model version, last
+    candle timestamp) pair; a lookup with another pair counts as an
+    invalidation and the entry is replaced by the next store.
+    """
+
+    def __init__(self, max_entries=PREDICTION_CACHE_SIZE):
+        """
+        Args:
+            max_entries (int): Maximum number of cached symbols; least recently used are evicted.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def lookup(self, symbol, model_version, last_timestamp):
+        """
+        Returns the cached prediction.
 
-        X_input = np.array([latest_data.values])  # Tworzymy batch 1x100xN
-        lstm_predictions = model.predict(X_input)
+        Args:
+            symbol (str): The symbol (its dataset file).
+            model_version (tuple): `ModelLoader.version` of the model that made the prediction.
+            last_timestamp (str): Timestamp of the newest candle in the input window.
 
-        # ✅ Spłaszczamy tablicę, aby uniknąć błędu wymiaru
-        predicted_price = scalers["close"].inverse_transform([[lstm_predictions[0].flatten()[0]]])[0][0]
-        predicted_trend = "Bullish" if lstm_predictions[1].flatten()[0] > 0.5 else "Bearish"
-        predicted_volume = scalers["volume"].inverse_transform([[lstm_predictions[2].flatten()[0]]])[0][0]
-        predicted_volatility = scalers["ATR"].inverse_transform([[lstm_predictions[3].flatten()[0]]])[0][0]
-        buy_signal = "BUY" if lstm_predictions[4].flatten()[0] > 0.5 else "SELL"
+        Returns:
+            dict: A copy of the prediction, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None or model_version is None:
+                self.misses += 1
+                return None
+            if entry[0] != (model_version, last_timestamp):
+                self.misses += 1
+                self.invalidations += 1
+                return None
+            self._entries.move_to_end(symbol)
+            self.hits += 1
+            return dict(entry[1])
 
-        # ✅ Obliczanie TP i SL
-        atr_value = predicted_volatility  # ATR to zmienność, której już używamy
-        tp = predicted_price + TP_SL_MULTIPLIER * atr_value  # TP = Cena + 2 * ATR
-        sl = predicted_price - TP_SL_MULTIPLIER * atr_value  # SL = Cena - 2 * ATR
+    def store(self, symbol, model_version, last_timestamp, prediction):
+        """
+        Stores the prediction of a symbol, replacing its previous one.
+        """
+        if self.max_entries <= 0 or model_version is None:
+            return
+        with self._lock:
+            self._entries[symbol] = ((model_version, last_timestamp), dict(prediction))
+            self._entries.move_to_end(symbol)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
 
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit, miss and invalidation counters, the hit rate and the number of cached symbols.
+        """
+        lookups = self.hits + self.misses
         return {
-            "price": predicted_price,
-            "trend": predicted_trend,
-            "volume": predicted_volume,
-            "volatility": predicted_volatility,
-            "signal": buy_signal,
-            "tp": tp,
-            "sl": sl
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
         }
 
-    except Exception as e:
-        logging.warning(f"⚠️ Błąd predykcji dla {file_path}: {e}")
+# ✅ Model wczytywany przy pierwszym użyciu i cache predykcji
+model_loader = ModelLoader()
+prediction_cache = PredictionCache()
+inference_client = None  # InferenceClient (inference_server.py); None = model w tym procesie
+
+def use_inference_server(client):
+    """
+    Routes the forward passes of `predict_batch` to an inference server process.
+
+    The windows are still loaded and scaled here, with the scaler saved next
+    to MODEL_PATH, so the server should serve the same model.
+
+    Args:
+        client (InferenceClient): Connected client, or None to predict in this process again.
+    """
+    global inference_client
+    inference_client = client
+
+def _model_version():
+    return inference_client.model_version if inference_client is not None else model_loader.version
+
+def _predict_on_batch(X_input):
+    if inference_client is not None:
+        return inference_client.predict_sync(X_input)
+    return model_loader.get().predict_on_batch(X_input)
+
+def __getattr__(name):
+    # Zgodność wstecz: `lstm_predictor.model` wczytuje model dopiero przy odwołaniu
+    if name == "model":
+        return model_loader.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ✅ Plik danych symbolu ('BTC/USDT' -> datasets/BTC_USDT.csv); ścieżki do plików bez zmian
+def dataset_path(symbol):
+    if symbol.endswith(".csv"):
+        return symbol
+    return os.path.join(DATA_DIR, f"{symbol.replace('/', '_')}.csv")
+
+# ✅ Nagłówek i ostatnie linie pliku CSV, czytane blokami od końca (koszt nie zależy od długości historii)
+def read_tail(file_path, count, block_size=65536):
+    """
+    Reads the header and the last non-empty lines of a CSV file without reading the rest.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        count (int): Number of lines to read.
+        block_size (int): Bytes read per step backwards from the end.
+
+    Returns:
+        tuple: (header line, list of at most `count` lines, whether the whole file was read).
+    """
+    with open(file_path, "rb") as file:
+        header = file.readline()
+        data_start = file.tell()
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        tail = b""
+        lines = []
+        while position > data_start:
+            step = min(block_size, position - data_start)
+            position -= step
+            file.seek(position)
+            tail = file.read(step) + tail
+            # Pierwsza linia bloku może być niepełna, chyba że doszliśmy do początku danych
+            lines = tail.split(b"\n")[1 if position > data_start else 0:]
+            lines = [line for line in lines if line.strip()]
+            if len(lines) >= count:
+                break
+    return header, lines[-count:] if count else [], position <= data_start
+
+# ✅ Znacznik czasu ostatniej świecy bez czytania całego pliku (ostatnia linia)
+def last_candle_timestamp(file_path, block_size=4096):
+    _, lines, _ = read_tail(file_path, 1, block_size)
+    if not lines:
         return None
+    return lines[-1].split(b",", 1)[0].decode().strip()
+
+# ✅ Wczytaj dane do predykcji dla danego pliku (tylko ostatnie świece)
+def load_latest_data(file_path, rows=SEQUENCE_LENGTH):
+    """
+    Loads the newest `rows` candles of a dataset, reading the file from its end.
+
+    Gives the same window as filling the gaps of the whole file: gaps inside
+    the window are back-filled from later rows, and when trailing gaps need
+    an earlier value to forward-fill from, twice as many rows are read.
+
+    Args:
+        file_path (str): Path to the dataset.
+        rows (int): Number of candles.
+
+    Returns:
+        pd.DataFrame: The REQUIRED_COLUMNS of the newest candles, indexed by timestamp.
+    """
+    count = rows
+    while True:
+        header, lines, whole_file = read_tail(file_path, count)
+        df = pd.read_csv(io.BytesIO(header + b"\n".join(lines)))
+
+        if "timestamp" in df.columns:
+            df["timestamp"] = pd.to_datetime(df["timestamp"])
+            df.set_index("timestamp", inplace=True)
+
+        # ✅ Jeśli brakuje `profit_signal`, dodaj jako 0
+        if "profit_signal" not in df.columns:
+            df["profit_signal"] = 0
+
+        df = df[REQUIRED_COLUMNS].fillna(method='bfill').fillna(method='ffill')  # Uzupełniamy braki
+
+        if whole_file or not df[-rows:].isna().values.any():
+            return df[-rows:]
+        count *= 2
+
+# ✅ Skalowanie okien (N x 100 x 16) jedną operacją
+def scale_windows(windows):
+    """
+    Scales windows with the training scaler saved next to the model.
+
+    Without the artifact, each window is scaled by its own min and max (the
+    former per-call MinMaxScaler fit), still as one array operation.
+
+    Args:
+        windows (np.ndarray): Raw windows (windows, rows, columns).
+
+    Returns:
+        tuple: (scaled windows, FeatureScaler for the inverse transforms).
+    """
+    scaler = model_loader.get_scaler()
+    if scaler is None:
+        scaler = FeatureScaler.fit(windows, REQUIRED_COLUMNS)
+    return scaler.transform(windows), scaler
+
+# ✅ Zamiana wyjść modelu dla wszystkich okien na wyniki z TP i SL
+def decode_predictions(lstm_predictions, scaler):
+    # ✅ Spłaszczamy wyjścia (N x 1 -> N), odwrotne skalowanie całego batcha naraz
+    outputs = [np.asarray(output).reshape(len(output), -1)[:, 0] for output in lstm_predictions]
+    predicted_price = scaler.inverse_transform(outputs[0], "close")
+    predicted_volume = scaler.inverse_transform(outputs[2], "volume")
+    predicted_volatility = scaler.inverse_transform(outputs[3], "ATR")
+
+    # ✅ Obliczanie TP i SL
+    atr_value = predicted_volatility  # ATR to zmienność, której już używamy
+    tp = predicted_price + TP_SL_MULTIPLIER * atr_value  # TP = Cena + 2 * ATR
+    sl = predicted_price - TP_SL_MULTIPLIER * atr_value  # SL = Cena - 2 * ATR
+
+    return [
+        {
+            "price": float(predicted_price[index]),
+            "trend": "Bullish" if outputs[1][index] > 0.5 else "Bearish",
+            "volume": float(predicted_volume[index]),
+            "volatility": float(predicted_volatility[index]),
+            "signal": "BUY" if outputs[4][index] > 0.5 else "SELL",
+            "tp": float(tp[index]),
+            "sl": float(sl[index])
+        }
+        for index in range(len(predicted_price))
+    ]
+
+# ✅ Predykcja dla wielu tokenów: okna wszystkich plików w jednym tensorze
+def predict_batch(file_paths, batch_size=PREDICT_BATCH_SIZE):
+    """
+    Predicts many files with one forward pass per micro-batch instead of one per file.
+
+    Files whose newest candle was already predicted by the current model are
+    served from `prediction_cache` without loading their data.
+
+    Args:
+        file_paths (list): Dataset files to predict.
+        batch_size (int): Maximum number of windows per forward pass.
+
+    Returns:
+        dict: File path -> prediction dict (as make_prediction), None when the file failed.
+    """
+    predictions = {file_path: None for file_path in file_paths}
+
+    # ✅ Okna każdego pliku bez aktualnej predykcji, grupowane po kształcie (krótsze pliki osobno)
+    windows_by_shape = {}
+    last_timestamps = {}
+    for file_path in file_paths:
+        try:
+            last_timestamps[file_path] = last_candle_timestamp(file_path)
+            cached = prediction_cache.lookup(file_path, _model_version(), last_timestamps[file_path])
+            if cached is not None:
+                predictions[file_path] = cached
+                continue
+            window = load_latest_data(file_path).values.astype(np.float64)
+            if not len(window):
+                raise ValueError("brak świec w pliku")
+            windows_by_shape.setdefault(window.shape, []).append((file_path, window))
+        except Exception as e:
+            logging.warning(f"⚠️ Błąd predykcji dla {file_path}: {e}")
+
+    for entries in windows_by_shape.values():
+        for start in range(0, len(entries), batch_size):
+            chunk = entries[start:start + batch_size]
+            try:
+                # Skalowanie w obsłudze błędów mikro-batcha: błąd skalera nie przerywa całej predykcji
+                X_input, scaler = scale_windows(np.stack([window for _, window in chunk]))  # Batch Nx100xN
+                # Jedno wywołanie na mikro-batch, bez narzutu model.predict (lub przez serwer predykcji)
+                lstm_predictions = _predict_on_batch(X_input.astype(np.float32))
+                decoded = decode_predictions(lstm_predictions, scaler)
+            except Exception as e:
+                logging.warning(f"⚠️ Błąd predykcji dla {len(chunk)} plików: {e}")
+                continue
+
+            for (file_path, _), prediction in zip(chunk, decoded):
+                predictions[file_path] = prediction
+                prediction_cache.store(file_path, _model_version(), last_timestamps[file_path], prediction)
+
+    return predictions
+
+# ✅ Predykcja dla pojedynczego tokena z obliczaniem TP i SL (symbol 'BTC/USDT' lub ścieżka do pliku)
+def make_prediction(file_path):
+    file_path = dataset_path(file_path)
+    return predict_batch([file_path])[file_path]
+
+# ✅ Predykcja z kodu asynchronicznego bez blokowania pętli zdarzeń
+async def make_prediction_async(file_path):
+    return await asyncio.to_thread(make_prediction, file_path)
 
 # ✅ Przeprowadź predykcję dla wszystkich tokenów
-def predict_all_tokens():
+def predict_all_tokens(batch_size=PREDICT_BATCH_SIZE):
     lstm_predictions = {}
 
-    for file in os.listdir(DATA_DIR):
-        if file.endswith(".csv"):
-            file_path = os.path.join(DATA_DIR, file)
-            token = file.replace("_USDT.csv", "")
-            prediction = make_prediction(file_path)
-
-            if prediction:
-                lstm_predictions[token] = prediction
-                print(f"\n🔷 **{token}**\n"
-                      f"💰 Cena: {prediction['price']:.2f} USDT\n"
-                      f"📈 Trend: {prediction['trend']}\n"
-                      f"📊 Wolumen: {prediction['volume']:.2f}\n"
-                      f"📉 Zmienność: {prediction['volatility']:.4f}\n"
-                      f"📢 Sygnał: {prediction['signal']}\n"
-                      f"🚀 TP: {prediction['tp']:.2f}\n"
-                      f"🛑 SL: {prediction['sl']:.2f}")
+    files = sorted(file for file in os.listdir(DATA_DIR) if file.endswith(".csv"))
+    predictions = predict_batch([os.path.join(DATA_DIR, file) for file in files], batch_size)
+
+    for file in files:
+        token = file.replace("_USDT.csv", "")
+        prediction = predictions[os.path.join(DATA_DIR, file)]
+
+        if prediction:
+            lstm_predictions[token] = prediction
+            print(f"\n🔷 **{token}**\n"
+                  f"💰 Cena: {prediction['price']:.2f} USDT\n"
+                  f"📈 Trend: {prediction['trend']}\n"
+                  f"📊 Wolumen: {prediction['volume']:.2f}\n"
+                  f"📉 Zmienność: {prediction['volatility']:.4f}\n"
+                  f"📢 Sygnał: {prediction['signal']}\n"
+                  f"🚀 TP: {prediction['tp']:.2f}\n"
+                  f"🛑 SL: {prediction['sl']:.2f}")
 
     return lstm_predictions
 
@@ -5,9 +5,9 @@ import pandas as pd
 import tensorflow as tf
 from tensorflow.keras.models import load_model, Model
 from tensorflow.keras.layers import LSTM, Dense, Dropout, Input, BatchNormalization
-from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau, ModelCheckpoint
-from sklearn.preprocessing import MinMaxScaler
+from tensorflow.keras.callbacks import Callback, EarlyStopping, ReduceLROnPlateau, ModelCheckpoint
 import matplotlib.pyplot as plt
+from feature_scaler import FeatureScaler, scaler_path
 
 # 🔧 Ścieżki
 BASE_DIR = "D:/TitanFlow/data/data"
@@ -42,11 +42,51 @@ SEQUENCE_LENGTH = 100
 BATCH_SIZE = 64
 EPOCHS = 100  # Mniejsza liczba epok, bo to fine-tuning
 
+class ScalerCheckpoint(Callback):
+    """
+    Saves the training scaler whenever the model file has been written.
+
+    Placed after `ModelCheckpoint(save_best_only=True)`, so the scaler next
+    to the deployed model is only replaced together with the model: when
+    training aborts or never improves, the old pair stays intact.
+    """
+
+    def __init__(self, scaler, model_path, scaler_path):
+        """
+        Args:
+            scaler (FeatureScaler): The scaler fitted on the training data.
+            model_path (str): Path written by the model checkpoint.
+            scaler_path (str): Path of the scaler artifact.
+        """
+        super().__init__()
+        self.scaler = scaler
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self._model_stamp = None
+
+    def _stamp(self):
+        if not os.path.exists(self.model_path):
+            return None
+        stat = os.stat(self.model_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def on_train_begin(self, logs=None):
+        self._model_stamp = self._stamp()
+
+    def on_epoch_end(self, epoch, logs=None):
+        stamp = self._stamp()
+        if stamp != self._model_stamp:
+            self._model_stamp = stamp
+            self.scaler.save(self.scaler_path)
+            logging.info(f"✅ Zapisano skaler do {self.scaler_path}")
+
+
 class LSTMTrainer:
     def __init__(self, data_dir, model_save_path):
         self.data_dir = os.path.abspath(data_dir)
         self.model_save_path = os.path.abspath(model_save_path)
-        self.scalers = {}
+        self.scaler_path = scaler_path(self.model_save_path)
+        self.scaler = None
 
         # Wymagane kolumny w danych (16 cech)
         self.required_columns = [
@@ -90,16 +130,11 @@ class LSTMTrainer:
         take_profit = np.concatenate([d[1] for d in all_data])
         stop_loss = np.concatenate([d[2] for d in all_data])
 
-        # Normalizacja danych
-        for i, col in enumerate(self.required_columns):
-            self.scalers[col] = MinMaxScaler(feature_range=(0, 1))
-            data[:, i] = self.scalers[col].fit_transform(data[:, i].reshape(-1, 1)).flatten()
-
-        # Dodaj TP i SL do danych wyjściowych
-        self.scalers['take_profit'] = MinMaxScaler(feature_range=(0, 1))
-        self.scalers['stop_loss'] = MinMaxScaler(feature_range=(0, 1))
-        take_profit = self.scalers['take_profit'].fit_transform(take_profit.reshape(-1, 1)).flatten()
-        stop_loss = self.scalers['stop_loss'].fit_transform(stop_loss.reshape(-1, 1)).flatten()
+        # Normalizacja cech oraz TP i SL jednym skalerem (zapisywanym obok modelu dla predykcji)
+        values = np.column_stack([data, take_profit, stop_loss])
+        self.scaler = FeatureScaler.fit(values, self.required_columns + ["take_profit", "stop_loss"])
+        values = self.scaler.transform(values)
+        data, take_profit, stop_loss = values[:, :len(self.required_columns)], values[:, -2], values[:, -1]
 
         return data, take_profit, stop_loss
 
@@ -162,7 +197,9 @@ class LSTMTrainer:
         callbacks = [
             EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
             ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-6),
-            ModelCheckpoint(self.model_save_path, save_best_only=True)
+            ModelCheckpoint(self.model_save_path, save_best_only=True),
+            # Skaler zapisywany razem z modelem, po ModelCheckpoint
+            ScalerCheckpoint(self.scaler, self.model_save_path, self.scaler_path)
         ]
 
         # Trenowanie modelu
@@ -1,32 +1,58 @@
 import asyncio
 import logging
-import polars as pl
-from data_fetcher import DataFetcher
-from strategy import TradingStrategy
-from utils import TechnicalIndicators  # Dodajemy import klasy TechnicalIndicators
+from data_fetcher import create_data_fetcher
+from market_scanner import MarketScanner
+from indicator_cache import IndicatorCache
+from live_runtime import LiveRuntime, log_signals
+from signal_journal import SignalJournal
 
 # Konfiguracja logowania
 logging.basicConfig(level=logging.INFO)
 
 async def main():
+    # Konfiguracja skanowania rynku
+    scan_config = {
+        "backend": "async",  # "thread" (ccxt w wątkach) lub "async" (ccxt.async_support)
+        "max_concurrency": 20,  # Maksymalna liczba równoległych zapytań
+        "burst": 5,  # Liczba zapytań dozwolonych jedno po drugim ponad rateLimit giełdy
+        "timeframe": "1d",
+        "limit": 100,
+    }
+
+    # Cache wskaźników cech modelu (DataFetcher)
+    indicator_cache = IndicatorCache()
+
+    # Dziennik zmienionych sygnałów (binarny, czytany przez GUI, backtester i analitykę)
+    signal_journal = SignalJournal()
+
     # Inicjalizacja DataFetcher do pobierania danych z giełdy
-    data_fetcher = DataFetcher()
+    data_fetcher = create_data_fetcher(scan_config["backend"], indicator_cache=indicator_cache)
+    try:
+        runtime = await start_runtime(
+            data_fetcher, scan_config, sinks=[signal_journal.sink, log_signals]
+        )
+        if runtime is not None:
+            await runtime.run(list(runtime.candle_store.buffers))
+    finally:
+        await data_fetcher.close()
+        signal_journal.close()
 
+async def start_runtime(data_fetcher, scan_config, sinks=None):
     # Pobieranie dostępnych par USDT
     usdt_pairs = await data_fetcher.fetch_markets()
     if not usdt_pairs:
         logging.error("Nie udało się pobrać par USDT.")
-        return
-
-    # Ograniczenie do pierwszych 5 par dla testów
-    usdt_pairs = usdt_pairs[:5]
+        return None
 
-    # Pobieranie danych OHLCV dla każdej pary
-    ohlcv_data = {}
-    for symbol in usdt_pairs:
-        ohlcv = await data_fetcher.fetch_ohlcv(symbol)
-        if ohlcv:
-            ohlcv_data[symbol] = ohlcv
+    # Równoległe pobieranie historii OHLCV dla wszystkich par (rozgrzanie wskaźników)
+    market_scanner = MarketScanner(
+        data_fetcher, max_concurrency=scan_config["max_concurrency"], burst=scan_config["burst"]
+    )
+    ohlcv_data = await market_scanner.scan(usdt_pairs, scan_config["timeframe"], scan_config["limit"])
+    logging.info(f"Statystyki skanowania: {market_scanner.summary()}")
+    if not ohlcv_data:
+        logging.error("Brak danych OHLCV dla żadnej pary.")
+        return None
 
     # Konfiguracja strategii handlowej
     strategy_config = {
@@ -38,40 +64,19 @@ async def main():
         "momentum_window": 14,
     }
 
-    # Inicjalizacja strategii handlowej
-    trading_strategy = TradingStrategy(strategy_config)
-
-    # Parametry TP/SL
-    TP_SL_MULTIPLIER = 2  # Mnożnik ATR dla TP/SL
-
-    # Generowanie sygnałów handlowych i wyznaczanie TP/SL
-    for symbol, ohlcv in ohlcv_data.items():
-        # Tworzenie DataFrame z danych OHLCV
-        price_data = pl.DataFrame({
-            "timestamp": [x[0] for x in ohlcv],
-            "open": [x[1] for x in ohlcv],
-            "high": [x[2] for x in ohlcv],
-            "low": [x[3] for x in ohlcv],
-            "close": [x[4] for x in ohlcv],
-            "volume": [x[5] for x in ohlcv],
-        })
-
-        # Obliczanie ATR (Average True Range) dla TP/SL
-        atr = await TechnicalIndicators.calculate_atr(  # Używamy TechnicalIndicators zamiast TradingStrategy
-            price_data["high"], price_data["low"], price_data["close"], window=14
-        )
-
-        # Ostatnia cena zamknięcia
-        last_close = price_data["close"][-1]
-
-        # Obliczanie TP i SL
-        tp = last_close + TP_SL_MULTIPLIER * atr[-1]
-        sl = last_close - TP_SL_MULTIPLIER * atr[-1]
+    # Strategie uruchamiane równolegle na tych samych danych (wspólne wskaźniki liczone raz)
+    strategies = [{"name": "rsi_macd"}, {"name": "bollinger_breakout"}, {"name": "money_flow_momentum"}]
 
-        # Generowanie sygnałów handlowych
-        signals = await trading_strategy.generate_signals(price_data)
-        logging.info(f"Sygnały handlowe dla {symbol}: {signals}")
-        logging.info(f"TP: {tp}, SL: {sl}")
+    # Zadanie na parę budzone zamknięciem świecy; sygnały i TP/SL tylko dla par z nowymi danymi
+    runtime = LiveRuntime(
+        data_fetcher, strategy_config, strategies,
+        timeframe=scan_config["timeframe"],
+        capacity=scan_config["limit"],
+        sinks=sinks,
+        tp_sl_multiplier=2,  # Mnożnik ATR dla TP/SL
+    )
+    runtime.seed(ohlcv_data)
+    return runtime
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
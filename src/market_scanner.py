@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from rate_limiter import TokenBucket
+
+
+class MarketScanner:
+    """
+    Fetches OHLCV data for many symbols concurrently under a concurrency cap and a rate limiter.
+    """
+
+    def __init__(self, data_fetcher, max_concurrency=20, rate_limiter=None, burst=5):
+        """
+        Initializes the MarketScanner.
+
+        Args:
+            data_fetcher (DataFetcher): The fetcher used to download the candles.
+            max_concurrency (int): Maximum number of requests in flight at once.
+            rate_limiter (TokenBucket, optional): Shared limiter. Defaults to one derived
+                from the exchange's `rateLimit`.
+            burst (int): Burst size of the default rate limiter.
+        """
+        self.data_fetcher = data_fetcher
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or TokenBucket.from_exchange(data_fetcher.exchange, burst)
+        self.stats = {}
+
+    async def _fetch_symbol(self, semaphore, symbol, timeframe, limit):
+        """
+        Fetches a single symbol and records its timing stats.
+
+        Returns:
+            tuple: (symbol, list of OHLCV data).
+        """
+        async with semaphore:
+            queued_at = time.perf_counter()
+            await self.rate_limiter.acquire()
+            started_at = time.perf_counter()
+            ohlcv = await self.data_fetcher.fetch_ohlcv(symbol, timeframe, limit=limit)
+            finished_at = time.perf_counter()
+
+        self.stats[symbol] = {
+            "wait": started_at - queued_at,
+            "fetch": finished_at - started_at,
+            "rows": len(ohlcv),
+        }
+        return symbol, ohlcv
+
+    async def scan(self, symbols, timeframe='1d', limit=100):
+        """
+        Fetches OHLCV data for all given symbols concurrently.
+
+        Args:
+            symbols (list): Trading pairs to fetch.
+            timeframe (str): The time frame for the data (default '1d').
+            limit (int): The number of data points per symbol (default 100).
+
+        Returns:
+            dict: Symbol -> OHLCV data, only for symbols that returned data.
+        """
+        self.stats = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started_at = time.perf_counter()
+        results = await asyncio.gather(
+            *[self._fetch_symbol(semaphore, symbol, timeframe, limit) for symbol in symbols]
+        )
+        elapsed = time.perf_counter() - started_at
+
+        ohlcv_data = {symbol: ohlcv for symbol, ohlcv in results if ohlcv}
+        logging.info(f"Scanned {len(symbols)} symbols in {elapsed:.2f}s ({len(ohlcv_data)} with data).")
+        return ohlcv_data
+
+    def summary(self):
+        """
+        Summarizes the timing stats of the last scan.
+
+        Returns:
+            dict: Count and p50/p95/max of the fetch and rate-limit wait times in seconds.
+        """
+        if not self.stats:
+            return {"count": 0}
+
+        def percentiles(values):
+            values = sorted(values)
+            return {
+                "p50": values[int(0.50 * (len(values) - 1))],
+                "p95": values[int(0.95 * (len(values) - 1))],
+                "max": values[-1],
+            }
+
+        return {
+            "count": len(self.stats),
+            "fetch": percentiles([entry["fetch"] for entry in self.stats.values()]),
+            "wait": percentiles([entry["wait"] for entry in self.stats.values()]),
+        }
@@ -0,0 +1,117 @@
+import csv
+import logging
+import os
+
+# 🔧 Ścieżki
+CACHE_DIR = "D:/TitanFlow/data/cache/ohlcv"
+
+# 🔧 Maksymalna liczba świec przechowywana dla jednej pary
+MAX_ROWS = 5000
+
+
+class OHLCVCache:
+    """
+    A persistent on-disk store of OHLCV candles keyed by (exchange, symbol, timeframe).
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_rows=MAX_ROWS):
+        """
+        Initializes the cache and makes sure the cache directory exists.
+
+        Args:
+            cache_dir (str): Directory where the candle files are stored.
+            max_rows (int): Maximum number of candles kept per (exchange, symbol, timeframe).
+        """
+        self.cache_dir = cache_dir
+        self.max_rows = max_rows
+        self._memory = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, exchange_id, symbol, timeframe):
+        """
+        Builds the file path for the given key.
+
+        Args:
+            exchange_id (str): The ccxt exchange id (e.g., 'bybit').
+            symbol (str): The trading pair symbol (e.g., 'BTC/USDT').
+            timeframe (str): The time frame of the candles (e.g., '1d').
+
+        Returns:
+            str: Path of the CSV file holding the candles.
+        """
+        safe_symbol = symbol.replace('/', '_').replace(':', '_')
+        return os.path.join(self.cache_dir, f"{exchange_id}_{safe_symbol}_{timeframe}.csv")
+
+    def load(self, exchange_id, symbol, timeframe):
+        """
+        Loads the cached candles for the given key.
+
+        Args:
+            exchange_id (str): The ccxt exchange id.
+            symbol (str): The trading pair symbol.
+            timeframe (str): The time frame of the candles.
+
+        Returns:
+            list: Cached OHLCV candles sorted by timestamp (empty if nothing is cached).
+        """
+        key = (exchange_id, symbol, timeframe)
+        if key in self._memory:
+            return self._memory[key]
+
+        file_path = self._path(exchange_id, symbol, timeframe)
+        candles = []
+        if os.path.isfile(file_path):
+            try:
+                with open(file_path, "r", newline="") as file:
+                    for row in csv.reader(file):
+                        candles.append([int(row[0])] + [float(value) for value in row[1:6]])
+            except Exception as e:
+                logging.warning(f"Error reading OHLCV cache {file_path}: {e}")
+                candles = []
+
+        self._memory[key] = candles
+        return candles
+
+    def save(self, exchange_id, symbol, timeframe, candles):
+        """
+        Stores the candles for the given key, keeping only the newest `max_rows` entries.
+
+        Args:
+            exchange_id (str): The ccxt exchange id.
+            symbol (str): The trading pair symbol.
+            timeframe (str): The time frame of the candles.
+            candles (list): OHLCV candles sorted by timestamp.
+        """
+        candles = candles[-self.max_rows:]
+        self._memory[(exchange_id, symbol, timeframe)] = candles
+
+        file_path = self._path(exchange_id, symbol, timeframe)
+        tmp_path = f"{file_path}.tmp"
+        try:
+            with open(tmp_path, "w", newline="") as file:
+                csv.writer(file).writerows(candles)
+            os.replace(tmp_path, file_path)  # Atomowa podmiana pliku
+        except Exception as e:
+            logging.warning(f"Error writing OHLCV cache {file_path}: {e}")
+
+    @staticmethod
+    def merge(cached, fresh):
+        """
+        Merges freshly fetched candles into the cached ones.
+
+        Candles with the same timestamp are replaced by the fresh version, because the
+        last cached candle may have been stored while it was still open.
+
+        Args:
+            cached (list): Candles already in the cache.
+            fresh (list): Candles just fetched from the exchange.
+
+        Returns:
+            list: The merged candles sorted by timestamp.
+        """
+        if not fresh:
+            return cached
+        first_fresh = fresh[0][0]
+        merged = [candle for candle in cached if candle[0] < first_fresh]
+        merged.extend(fresh)
+        return merged
@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import polars as pl
+from backtester import Backtester, load_dataset
+from indicator_cache import IndicatorCache
+from strategy import TradingStrategy
+
+# 🔧 Ścieżki
+DATA_DIR = "D:/TitanFlow/data/data/datasets"
+RESULTS_DIR = "D:/TitanFlow/data/sweeps"
+
+# 🔧 Parametry przeszukiwania
+CHUNK_SIZE = 16  # Liczba kombinacji w jednym zadaniu procesu
+RANK_METRIC = "sharpe"
+
+PRICE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+# Domyślne siatki parametrów używanych przez każdą strategię
+SWEEP_GRIDS = {
+    "rsi_macd": {
+        "rsi_window": [7, 10, 14, 21, 28],
+        "tp_sl_multiplier": [1.5, 2, 3],
+    },
+    "bollinger_breakout": {
+        "bollinger_window": [10, 15, 20, 30, 50],
+        "bollinger_std_dev": [1.5, 2, 2.5, 3],
+        "tp_sl_multiplier": [1.5, 2, 3],
+    },
+    "money_flow_momentum": {
+        "mfi_window": [7, 10, 14, 21],
+        "momentum_window": [5, 10, 14, 21],
+        "tp_sl_multiplier": [1.5, 2, 3],
+    },
+}
+
+# Parametry backtestu, pozostałe trafiają do strategy_config
+BACKTEST_PARAMS = ("tp_sl_multiplier", "fee_rate", "slippage")
+
+# Stan procesu roboczego: dane z pamięci współdzielonej i cache wskaźników
+_worker = {}
+
+
+def grid(param_grid):
+    """
+    Expands a parameter grid into all combinations.
+
+    Args:
+        param_grid (dict): Parameter name -> list of values.
+
+    Returns:
+        list: Parameter dicts.
+    """
+    names = sorted(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[name] for name in names))]
+
+
+def random_sample(param_grid, count, seed=0):
+    """
+    Draws distinct random combinations from a parameter grid.
+
+    Args:
+        param_grid (dict): Parameter name -> list of values.
+        count (int): Number of combinations.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        list: Parameter dicts.
+    """
+    combinations = grid(param_grid)
+    if count >= len(combinations):
+        return combinations
+    return random.Random(seed).sample(combinations, count)
+
+
+def combination_id(strategy_name, params, symbols):
+    """
+    Returns a stable id of a combination, used to resume interrupted sweeps.
+    """
+    payload = json.dumps([strategy_name, params, sorted(symbols)], sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _column_arrays(memory, rows):
+    """
+    Views of the columns in a shared memory block, one contiguous block per column.
+
+    Args:
+        memory (SharedMemory): The block.
+        rows (int): Number of candles of all symbols.
+
+    Returns:
+        dict: Column -> np.ndarray (int64 timestamps, float64 prices and volume).
+    """
+    return {
+        column: np.ndarray(
+            (rows,), dtype=np.int64 if column == "timestamp" else np.float64, buffer=memory.buf, offset=i * rows * 8
+        )
+        for i, column in enumerate(PRICE_COLUMNS)
+    }
+
+
+class SharedPrices:
+    """
+    Candles of many symbols in one shared memory block.
+
+    The block is column-major: each of the PRICE_COLUMNS is one contiguous
+    array holding all symbols one after another, so a symbol's column is a
+    contiguous slice. Workers attach to it by name instead of receiving
+    pickled copies.
+    """
+
+    def __init__(self, frames):
+        """
+        Copies the candles into a new shared memory block.
+
+        Args:
+            frames (dict): Symbol -> pl.DataFrame with the PRICE_COLUMNS.
+        """
+        self.layout = {}
+        total_rows = 0
+        for symbol, frame in frames.items():
+            self.layout[symbol] = (total_rows, frame.height)
+            total_rows += frame.height
+
+        self.rows = total_rows
+        self.memory = shared_memory.SharedMemory(create=True, size=max(total_rows, 1) * len(PRICE_COLUMNS) * 8)
+        arrays = _column_arrays(self.memory, total_rows)
+        for symbol, frame in frames.items():
+            start, rows = self.layout[symbol]
+            for column in PRICE_COLUMNS:
+                arrays[column][start:start + rows] = frame[column].to_numpy()
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def close(self):
+        """
+        Releases the shared memory block.
+        """
+        self.memory.close()
+        self.memory.unlink()
+
+
+def _init_worker(memory_name, rows, layout, strategy_name):
+    """
+    Attaches a worker process to the shared candles.
+    """
+    # Jeden wątek polars na proces - równoległość zapewnia pula procesów (pula wątków
+    # polars powstaje przy pierwszej operacji, więc wystarczy ustawić to przed nią)
+    os.environ.setdefault("POLARS_MAX_THREADS", "1")
+    memory = shared_memory.SharedMemory(name=memory_name)
+    _worker.update({
+        "memory": memory,
+        "arrays": _column_arrays(memory, rows),
+        "layout": layout,
+        "strategy_name": strategy_name,
+        "indicator_cache": IndicatorCache(),
+        "loop": asyncio.new_event_loop(),
+    })
+
+
+def _symbol_frame(symbol):
+    """
+    Builds the frame of one symbol from the contiguous slices of its columns.
+
+    polars (without pyarrow) copies NumPy data into its own buffers, so the
+    frame is built only while the symbol is backtested: a worker holds one
+    symbol's candles at a time, not a copy of the whole block.
+    """
+    start, rows = _worker["layout"][symbol]
+    return pl.DataFrame({column: _worker["arrays"][column][start:start + rows] for column in PRICE_COLUMNS})
+
+
+def _evaluate(combinations):
+    """
+    Backtests a chunk of combinations on every symbol (runs in a worker process).
+
+    Args:
+        combinations (list): (combination id, params) pairs.
+
+    Returns:
+        list: One result dict per combination.
+    """
+    runs = []
+    for combination, params in combinations:
+        strategy_config = {"name": _worker["strategy_name"]}
+        strategy_config.update({key: value for key, value in params.items() if key not in BACKTEST_PARAMS})
+        backtester = Backtester(**{key: value for key, value in params.items() if key in BACKTEST_PARAMS})
+        runs.append((TradingStrategy(strategy_config, _worker["indicator_cache"]), backtester, {}))
+
+    # Symbol po symbolu: ramka jednego symbolu dla wszystkich kombinacji zadania
+    for symbol in _worker["layout"]:
+        frame = _symbol_frame(symbol)
+        for trading_strategy, backtester, per_symbol in runs:
+            signals = _worker["loop"].run_until_complete(
+                trading_strategy.generate_signals(frame, series_key=(symbol,))
+            )
+            per_symbol[symbol] = backtester.run(signals, symbol).stats
+
+    return [
+        {
+            "id": combination,
+            "params": params,
+            "metrics": _aggregate(per_symbol),
+            "symbols": per_symbol,
+        }
+        for (combination, params), (_, _, per_symbol) in zip(combinations, runs)
+    ]
+
+
+def _aggregate(per_symbol):
+    """
+    Averages the statistics of the symbols (missing values are skipped).
+    """
+    metrics = {}
+    for name in ("total_return", "cagr", "sharpe", "max_drawdown", "win_rate", "profit_factor"):
+        values = [stats.get(name) for stats in per_symbol.values()]
+        values = [value for value in values if value is not None]
+        metrics[name] = float(np.mean(values)) if values else None
+    metrics["trades"] = int(sum(stats["trades"] for stats in per_symbol.values()))
+    return metrics
+
+
+def load_results(file_path):
+    """
+    Reads the results of a sweep (JSON lines), ignoring a truncated last line.
+
+    Returns:
+        dict: Combination id -> result.
+    """
+    results = {}
+    if not os.path.exists(file_path):
+        return results
+    with open(file_path, "r") as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Przerwany zapis ostatniej linii
+            results[result["id"]] = result
+    return results
+
+
+def rank_results(results, metric=RANK_METRIC, top=None, min_trades=1):
+    """
+    Ranks combinations by an aggregated metric, best first.
+
+    Args:
+        results (iterable): Result dicts of the sweep.
+        metric (str): Metric to sort by (e.g., 'sharpe', 'total_return').
+        top (int, optional): Number of results to return.
+        min_trades (int): Minimum number of trades across symbols.
+
+    Returns:
+        list: The ranked results.
+    """
+    ranked = [
+        result for result in results
+        if result["metrics"].get(metric) is not None and result["metrics"]["trades"] >= min_trades
+    ]
+    ranked.sort(key=lambda result: result["metrics"][metric], reverse=True)
+    return ranked[:top] if top else ranked
+
+
+class ParameterSweep:
+    """
+    Evaluates strategy parameter combinations across symbols with a process pool.
+
+    The candles are placed in shared memory once, so tasks only carry the
+    parameters. Every finished chunk is appended to a JSON lines file;
+    combinations already in the file are skipped when the sweep is started
+    again.
+    """
+
+    def __init__(self, strategy_name, frames, results_path, max_workers=None, chunk_size=CHUNK_SIZE):
+        """
+        Initializes the ParameterSweep.
+
+        Args:
+            strategy_name (str): Registered strategy to sweep.
+            frames (dict): Symbol -> pl.DataFrame with the PRICE_COLUMNS.
+            results_path (str): JSON lines file of the results (appended, used for resuming).
+            max_workers (int, optional): Number of worker processes (default: all cores).
+            chunk_size (int): Number of combinations per task.
+        """
+        self.strategy_name = strategy_name
+        self.frames = frames
+        self.results_path = results_path
+        self.max_workers = max_workers or os.cpu_count()
+        self.chunk_size = chunk_size
+
+    def run(self, combinations):
+        """
+        Runs the combinations not evaluated yet.
+
+        Args:
+            combinations (list): Parameter dicts.
+
+        Returns:
+            list: Results of all the combinations, including the earlier ones.
+        """
+        symbols = list(self.frames)
+        tasks = [(combination_id(self.strategy_name, params, symbols), params) for params in combinations]
+        done = load_results(self.results_path)
+        pending = [task for task in tasks if task[0] not in done]
+        logging.info(f"Sweep {self.strategy_name}: {len(tasks)} combinations, {len(tasks) - len(pending)} already done.")
+
+        if pending:
+            self._run_pool(pending, done)
+        return [done[combination] for combination, _ in tasks if combination in done]
+
+    def _run_pool(self, pending, done):
+        chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+        shared_prices = SharedPrices(self.frames)
+        os.makedirs(os.path.dirname(self.results_path) or ".", exist_ok=True)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),  # fork z działającym polars może się zawiesić
+                initializer=_init_worker,
+                initargs=(shared_prices.name, shared_prices.rows, shared_prices.layout, self.strategy_name),
+            ) as executor, open(self.results_path, "a") as results_file:
+                futures = [executor.submit(_evaluate, chunk) for chunk in chunks]
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    for result in future.result():
+                        results_file.write(json.dumps(result) + "\n")
+                        done[result["id"]] = result
+                    results_file.flush()
+                    logging.info(f"Sweep progress: {completed}/{len(chunks)} chunks")
+        finally:
+            shared_prices.close()
+
+
+def load_frames(data_dir, symbols=None):
+    """
+    Loads the datasets to sweep over.
+
+    Returns:
+        dict: Dataset name (e.g., 'BTC_USDT') -> pl.DataFrame.
+    """
+    frames = {}
+    for file_path in sorted(glob.glob(os.path.join(data_dir, "*.csv"))):
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        if not symbols or name in symbols:
+            frames[name] = load_dataset(file_path).select(PRICE_COLUMNS)
+    return frames
+
+
+def main(args):
+    param_grid = SWEEP_GRIDS[args.strategy]
+    if args.samples:
+        combinations = random_sample(param_grid, args.samples, args.seed)
+    else:
+        combinations = grid(param_grid)
+
+    frames = load_frames(args.data_dir, args.symbols)
+    results_path = args.results or os.path.join(RESULTS_DIR, f"{args.strategy}.jsonl")
+    sweep = ParameterSweep(args.strategy, frames, results_path, args.workers, args.chunk_size)
+    results = sweep.run(combinations)
+
+    ranking = rank_results(results, args.metric, args.top)
+    ranking_path = os.path.splitext(results_path)[0] + "_ranking.json"
+    with open(ranking_path, "w") as file:
+        json.dump([{"params": result["params"], "metrics": result["metrics"]} for result in ranking], file, indent=2)
+    for position, result in enumerate(ranking[:10], start=1):
+        logging.info(f"{position}. {result['params']} {args.metric}={result['metrics'][args.metric]:.4f}")
+    logging.info(f"Ranking saved to {ranking_path}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Sweep strategy parameters over the historical datasets.")
+    parser.add_argument("--strategy", choices=list(SWEEP_GRIDS), default="rsi_macd", help="Strategy to sweep")
+    parser.add_argument("--symbols", nargs="+", default=None, help="Dataset names, e.g. BTC_USDT ETH_USDT")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Datasets directory")
+    parser.add_argument("--results", default=None, help="JSON lines file of the results (resumed if it exists)")
+    parser.add_argument("--samples", type=int, default=None, help="Random sample size instead of the full grid")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random sample")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Combinations per task")
+    parser.add_argument("--metric", default=RANK_METRIC, help="Metric used for ranking")
+    parser.add_argument("--top", type=int, default=50, help="Number of ranked results saved")
+
+    main(parser.parse_args())
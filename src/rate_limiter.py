@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    An asyncio token-bucket rate limiter shared by concurrent exchange requests.
+    """
+
+    def __init__(self, rate, capacity=1):
+        """
+        Initializes the bucket full.
+
+        Args:
+            rate (float): Number of tokens added per second.
+            capacity (int): Maximum number of tokens (allowed burst size).
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_exchange(cls, exchange, burst=1):
+        """
+        Creates a bucket matching the exchange's `rateLimit` (milliseconds between requests).
+
+        Args:
+            exchange (ccxt.Exchange): The exchange instance.
+            burst (int): Maximum number of requests allowed back to back.
+
+        Returns:
+            TokenBucket: The rate limiter.
+        """
+        rate_limit_ms = getattr(exchange, "rateLimit", None) or 1000
+        return cls(1000 / rate_limit_ms, burst)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self, tokens=1):
+        """
+        Waits until the requested number of tokens is available and takes them.
+
+        Waiters are served in arrival order.
+
+        Args:
+            tokens (int): Number of tokens to take (default 1).
+
+        Raises:
+            ValueError: When more tokens are requested than the bucket can hold.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+# 🔧 Czas ważności (w sekundach) wyników dla poszczególnych zapytań
+DEFAULT_TTLS = {
+    "markets": 3600,
+    "ohlcv": 10,
+    "balance": 5,
+}
+MAX_ENTRIES = 1024
+
+
+class _LoadCancelled(Exception):
+    """
+    Tells the coalesced waiters that the caller running the load was cancelled.
+    """
+
+
+class ReadThroughCache:
+    """
+    A read-through TTL/LRU cache with single-flight request coalescing for exchange reads.
+
+    Concurrent identical requests share one in-flight call, and results are
+    served from memory until their endpoint's TTL expires. Cached values are
+    shared between callers and must not be mutated. When the caller running a
+    shared call is cancelled, one of the waiting callers runs it again.
+    """
+
+    def __init__(self, ttls=None, max_entries=MAX_ENTRIES):
+        """
+        Initializes the ReadThroughCache.
+
+        Args:
+            ttls (dict, optional): Endpoint -> TTL in seconds, merged over DEFAULT_TTLS.
+            max_entries (int): Maximum number of cached results; least recently used are evicted.
+        """
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._sync_in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _lookup(self, key):
+        """
+        Returns:
+            tuple: (True, value) for a fresh cached entry, (False, None) otherwise.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def _store(self, key, value):
+        ttl = self.ttls.get(key[0], 0)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get(self, endpoint, key, loader, should_cache=bool):
+        """
+        Returns the cached result or awaits the loader, sharing the call with concurrent requests.
+
+        Args:
+            endpoint (str): Endpoint name, used to look up the TTL (e.g., 'ohlcv').
+            key (tuple): Request parameters identifying the result.
+            loader (callable): Coroutine function fetching the result.
+            should_cache (callable): Predicate deciding whether a result is cached (default: non-empty).
+
+        Returns:
+            The result of the request.
+        """
+        full_key = (endpoint,) + tuple(key)
+        while True:
+            found, value = self._lookup(full_key)
+            if found:
+                return value
+
+            in_flight = self._in_flight.get(full_key)
+            if in_flight is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(in_flight)
+            except _LoadCancelled:
+                continue  # Anulowano tylko wywołującego ładowanie: ponawiamy je
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[full_key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # Czekający nie zostali anulowani - jeden z nich ponowi ładowanie
+            future.set_exception(_LoadCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Oznaczamy wyjątek jako odebrany, gdy nikt inny nie czeka
+            raise
+        else:
+            if should_cache(value):
+                self._store(full_key, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._in_flight[full_key]
+
+    def get_sync(self, endpoint, key, loader, should_cache=bool):
+        """
+        Synchronous counterpart of `get` for callers running in threads.
+
+        Args:
+            endpoint (str): Endpoint name, used to look up the TTL (e.g., 'balance').
+            key (tuple): Request parameters identifying the result.
+            loader (callable): Function fetching the result.
+            should_cache (callable): Predicate deciding whether a result is cached (default: non-empty).
+
+        Returns:
+            The result of the request.
+        """
+        full_key = (endpoint,) + tuple(key)
+        found, value = self._lookup(full_key)
+        if found:
+            return value
+
+        with self._lock:
+            in_flight = self._sync_in_flight.get(full_key)
+            is_leader = in_flight is None
+            if is_leader:
+                in_flight = {"event": threading.Event(), "error": None, "value": None}
+                self._sync_in_flight[full_key] = in_flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            in_flight["event"].wait()
+            if in_flight["error"] is not None:
+                raise in_flight["error"]
+            return in_flight["value"]
+
+        try:
+            value = loader()
+            if should_cache(value):
+                self._store(full_key, value)
+            in_flight["value"] = value
+            return value
+        except Exception as e:
+            in_flight["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._sync_in_flight[full_key]
+            in_flight["event"].set()
+
+    def invalidate(self, endpoint=None):
+        """
+        Drops cached results, for one endpoint or all of them.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if endpoint is None or key[0] == endpoint:
+                    del self._entries[key]
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit, miss and coalesced counters and the number of cached entries.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+        }
+
+
+_shared_cache = None
+
+
+def shared_read_cache():
+    """
+    Returns the process-wide ReadThroughCache shared by all components.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ReadThroughCache()
+    return _shared_cache
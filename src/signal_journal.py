@@ -0,0 +1,244 @@
+import argparse
+import logging
+import os
+import time
+import numpy as np
+import polars as pl
+
+# 🔧 Ścieżki
+JOURNAL_PATH = "D:/TitanFlow/data/signals/signals.journal"
+
+MAGIC = b"TFSJ"
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+
+# Kody sygnałów zapisywane w dzienniku
+SIGNAL_CODES = {"HOLD": 0, "BUY": 1, "SELL": 2}
+SIGNAL_NAMES = {code: name for name, code in SIGNAL_CODES.items()}
+
+# Rekord o stałej długości (48 bajtów, little-endian)
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<i8"),  # Świeca, której dotyczy sygnał (ms)
+    ("recorded_at", "<i8"),  # Czas zapisu (ms)
+    ("symbol_id", "<u4"),
+    ("strategy_id", "<u2"),
+    ("signal", "i1"),
+    ("reserved", "u1"),
+    ("close", "<f8"),
+    ("tp", "<f8"),
+    ("sl", "<f8"),
+])
+
+
+def _header():
+    header = MAGIC + FORMAT_VERSION.to_bytes(2, "little") + RECORD_DTYPE.itemsize.to_bytes(2, "little")
+    return header.ljust(HEADER_SIZE, b"\0")
+
+
+def _check_header(header, file_path):
+    if len(header) < HEADER_SIZE or header[:4] != MAGIC:
+        raise ValueError(f"{file_path} is not a signal journal")
+    record_size = int.from_bytes(header[6:8], "little")
+    if record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{file_path} has records of {record_size} bytes, expected {RECORD_DTYPE.itemsize}")
+
+
+class _NameTable:
+    """
+    Append-only list of names (symbols or strategies) stored next to the journal, one per line.
+
+    The id of a name is its line number, so ids never change.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.names = []
+        self.ids = {}
+        self.reload()
+
+    def reload(self):
+        """
+        Reads the names added since the last read (e.g., by the writer process).
+        """
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, "r", encoding="utf-8") as file:
+            lines = file.read().split("\n")
+        # Ostatnia linia bez znaku nowej linii może być jeszcze zapisywana
+        for name in lines[len(self.names):-1]:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+
+    def id(self, name):
+        """
+        Returns the id of a name, appending it to the table when new.
+        """
+        if name not in self.ids:
+            with open(self.file_path, "a", encoding="utf-8") as file:
+                file.write(name + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+
+class SignalJournal:
+    """
+    Append-only journal of signals with fixed-width binary records.
+
+    Each record (RECORD_DTYPE) holds the candle timestamp, the time it was
+    recorded, the symbol and strategy ids, the signal code (SIGNAL_CODES) and
+    the close, TP and SL prices (NaN when unknown). Symbol and strategy names
+    are kept in '<journal>.symbols' and '<journal>.strategies' next to it.
+    Records are only ever appended, each batch with a single write, so
+    readers (see SignalJournalReader) can memory-map the file while it grows.
+    """
+
+    def __init__(self, file_path=JOURNAL_PATH, sync=False):
+        """
+        Opens the journal for appending, creating it when missing.
+
+        Args:
+            file_path (str): Path to the journal.
+            sync (bool): Whether to fsync after every batch.
+        """
+        self.file_path = file_path
+        self.sync = sync
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        self.symbols = _NameTable(file_path + ".symbols")
+        self.strategies = _NameTable(file_path + ".strategies")
+
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            with open(file_path, "wb") as file:
+                file.write(_header())
+        else:
+            with open(file_path, "rb") as file:
+                _check_header(file.read(HEADER_SIZE), file_path)
+            # Ucinamy niepełny rekord po przerwanym zapisie
+            size = os.path.getsize(file_path)
+            complete = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize
+            if complete != size:
+                logging.warning(f"Truncating {size - complete} bytes of an incomplete record in {file_path}.")
+                os.truncate(file_path, complete)
+
+        self._file = open(file_path, "ab", buffering=0)
+
+    def append(self, events):
+        """
+        Appends signal events.
+
+        Args:
+            events (list): Dicts with 'symbol', 'strategy', 'timestamp', 'signal', and optionally
+                'close', 'tp' and 'sl' (e.g., the events of LiveRuntime).
+
+        Returns:
+            int: Number of records written.
+        """
+        if not events:
+            return 0
+
+        records = np.zeros(len(events), dtype=RECORD_DTYPE)
+        records["recorded_at"] = int(time.time() * 1000)
+        records["timestamp"] = [event["timestamp"] for event in events]
+        records["symbol_id"] = [self.symbols.id(event["symbol"]) for event in events]
+        records["strategy_id"] = [self.strategies.id(event["strategy"]) for event in events]
+        records["signal"] = [SIGNAL_CODES[event["signal"]] for event in events]
+        for field in ("close", "tp", "sl"):
+            records[field] = [np.nan if event.get(field) is None else event[field] for event in events]
+
+        self._file.write(records.tobytes())
+        if self.sync:
+            os.fsync(self._file.fileno())
+        return len(records)
+
+    async def sink(self, events):
+        """
+        LiveRuntime sink writing the changed signals to the journal.
+        """
+        self.append(events)
+
+    def close(self):
+        self._file.close()
+
+
+class SignalJournalReader:
+    """
+    Reads a signal journal through a read-only memory map, concurrently with the writer.
+    """
+
+    def __init__(self, file_path=JOURNAL_PATH):
+        """
+        Args:
+            file_path (str): Path to the journal.
+        """
+        self.file_path = file_path
+        with open(file_path, "rb") as file:
+            _check_header(file.read(HEADER_SIZE), file_path)
+        self.symbols = _NameTable(file_path + ".symbols")
+        self.strategies = _NameTable(file_path + ".strategies")
+
+    def __len__(self):
+        return (os.path.getsize(self.file_path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+
+    def records(self, start=0, stop=None):
+        """
+        Maps the complete records written so far.
+
+        Args:
+            start (int): First record.
+            stop (int, optional): Record after the last one (default: all written so far).
+
+        Returns:
+            np.ndarray: Read-only structured array (RECORD_DTYPE) backed by the file.
+        """
+        count = len(self)
+        stop = count if stop is None else min(stop, count)
+        if start >= stop:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.memmap(
+            self.file_path, dtype=RECORD_DTYPE, mode="r",
+            offset=HEADER_SIZE + start * RECORD_DTYPE.itemsize, shape=(stop - start,),
+        )
+
+    def to_polars(self, start=0, stop=None):
+        """
+        Decodes records into a frame with symbol, strategy and signal names.
+
+        Args:
+            start (int): First record (e.g., the number of records read before, to read only new ones).
+            stop (int, optional): Record after the last one.
+
+        Returns:
+            pl.DataFrame: Columns timestamp, recorded_at, symbol, strategy, signal, close, tp and sl.
+        """
+        records = self.records(start, stop)
+        self.symbols.reload()
+        self.strategies.reload()
+        symbol_names = pl.Series("symbol", self.symbols.names, dtype=pl.Utf8)
+        strategy_names = pl.Series("strategy", self.strategies.names, dtype=pl.Utf8)
+        signal_names = pl.Series("signal", [SIGNAL_NAMES[code] for code in sorted(SIGNAL_NAMES)], dtype=pl.Utf8)
+        return pl.DataFrame({
+            "timestamp": np.array(records["timestamp"]),
+            "recorded_at": np.array(records["recorded_at"]),
+            "symbol": symbol_names.take(np.array(records["symbol_id"], dtype=np.int64)),
+            "strategy": strategy_names.take(np.array(records["strategy_id"], dtype=np.int64)),
+            "signal": signal_names.take(np.array(records["signal"], dtype=np.int64)),
+            "close": np.array(records["close"]),
+            "tp": np.array(records["tp"]),
+            "sl": np.array(records["sl"]),
+        })
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Print the newest records of a signal journal.")
+    parser.add_argument("--journal", default=JOURNAL_PATH, help="Path to the journal")
+    parser.add_argument("--tail", type=int, default=20, help="Number of records to print")
+    args = parser.parse_args()
+
+    reader = SignalJournalReader(args.journal)
+    count = len(reader)
+    logging.info(f"{count} records in {args.journal}")
+    print(reader.to_polars(max(count - args.tail, 0)))
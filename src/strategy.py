@@ -1,129 +1,348 @@
 import logging
 import polars as pl
-from utils import TechnicalIndicators
+from utils import IndicatorExpressions, TechnicalIndicators
+
+# Nazwa strategii -> funkcja deklarująca jej wskaźniki i warunki (rejestrowana przez @register_strategy)
+STRATEGY_REGISTRY = {}
+
+
+def register_strategy(name):
+    """
+    Registers a strategy definition under a name usable in `strategy_config["name"]`.
+
+    The definition takes the strategy configuration and returns the indicators
+    the strategy needs and a function building its conditions:
+    `conditions(column)` gets a function mapping an Indicator to its column
+    expression and returns the (buy, sell) condition expressions.
+
+    Args:
+        name (str): Name of the strategy.
+    """
+    def decorator(definition):
+        STRATEGY_REGISTRY[name] = definition
+        return definition
+    return decorator
+
+
+class Indicator:
+    """
+    A node of the indicator graph: one indicator column with its parameters and inputs.
+    """
+
+    def __init__(self, name, params, build, inputs=()):
+        """
+        Args:
+            name (str): Column name of the indicator (e.g., 'RSI').
+            params (tuple): Parameters of the indicator; indicators with the same name and
+                parameters are computed once.
+            build (callable): Builds the indicator expression from the column expressions of the inputs.
+            inputs (tuple): Indicators the expression is computed from.
+        """
+        self.name = name
+        self.params = tuple(params)
+        self.build = build
+        self.inputs = tuple(inputs)
+
+    @property
+    def key(self):
+        return self.name, self.params
+
+
+class IndicatorGraph:
+    """
+    Deduplicated dependency graph of the indicators of many strategies.
+
+    Each (name, params) indicator becomes one column, computed in the first
+    stage after all its inputs. Indicators sharing a name with different
+    parameters get the parameters appended to their column names.
+    """
+
+    def __init__(self, indicators):
+        """
+        Args:
+            indicators (list): Indicators needed by the strategies, in any order and with duplicates.
+        """
+        self.nodes = {}
+        for indicator in indicators:
+            self._add(indicator)
+
+        names = [name for name, _ in self.nodes]
+        self.columns = {}
+        for name, params in self.nodes:
+            if names.count(name) > 1:
+                self.columns[(name, params)] = "_".join([name] + [str(param) for param in params])
+            else:
+                self.columns[(name, params)] = name
+
+    def _add(self, indicator):
+        for dependency in indicator.inputs:
+            self._add(dependency)
+        self.nodes.setdefault(indicator.key, indicator)
+
+    def column(self, indicator):
+        """
+        Returns:
+            pl.Expr: The column expression of an indicator of the graph.
+        """
+        return pl.col(self.columns[indicator.key])
+
+    def _depth(self, indicator):
+        if not indicator.inputs:
+            return 0
+        return 1 + max(self._depth(self.nodes[dependency.key]) for dependency in indicator.inputs)
+
+    def stages(self):
+        """
+        Returns:
+            list: Lists of (column, params, expression) tuples for TechnicalIndicators.apply_stages.
+        """
+        stages = []
+        for key, indicator in self.nodes.items():
+            depth = self._depth(indicator)
+            while len(stages) <= depth:
+                stages.append([])
+            expression = indicator.build(*[self.column(dependency) for dependency in indicator.inputs])
+            stages[depth].append((self.columns[key], indicator.params, expression))
+        return stages
+
+
+@register_strategy("rsi_macd")
+def rsi_macd(strategy_config):
+    """
+    RSI + MACD strategy: Buy when RSI is oversold and MACD indicates upward trend.
+    """
+    rsi_window = strategy_config["rsi_window"]
+    rsi = Indicator("RSI", (rsi_window,), lambda: IndicatorExpressions.rsi(pl.col("close"), rsi_window))
+    macd = Indicator("MACD", (12, 26), lambda: IndicatorExpressions.macd(pl.col("close")))
+    macd_signal = Indicator(
+        "MACD_Signal", (12, 26, 9), lambda macd_line: IndicatorExpressions.ema(macd_line, 9), inputs=(macd,)
+    )
+
+    def conditions(column):
+        buy_condition = (column(rsi) < 30) & (column(macd) > column(macd_signal))
+        sell_condition = (column(rsi) > 70) & (column(macd) < column(macd_signal))
+        return buy_condition, sell_condition
+
+    return [rsi, macd, macd_signal], conditions
+
+
+@register_strategy("bollinger_breakout")
+def bollinger_breakout(strategy_config):
+    """
+    Bollinger Bands breakout strategy.
+    """
+    window = strategy_config["bollinger_window"]
+    num_std_dev = strategy_config["bollinger_std_dev"]
+    # Średnia i odchylenie liczone raz (wspólne także dla innych szerokości wstęg), wstęgi z nich
+    middle_band = Indicator("Bollinger_Middle", (window,), lambda: IndicatorExpressions.sma(pl.col("close"), window))
+    std_dev = Indicator("Bollinger_Std", (window,), lambda: pl.col("close").rolling_std(window))
+    params = (window, num_std_dev)
+    upper_band = Indicator(
+        "Bollinger_Upper", params, lambda middle, std: middle + std * num_std_dev, inputs=(middle_band, std_dev)
+    )
+    lower_band = Indicator(
+        "Bollinger_Lower", params, lambda middle, std: middle - std * num_std_dev, inputs=(middle_band, std_dev)
+    )
+
+    def conditions(column):
+        buy_condition = pl.col("close") < column(lower_band)
+        sell_condition = pl.col("close") > column(upper_band)
+        return buy_condition, sell_condition
+
+    return [upper_band, lower_band], conditions
+
+
+@register_strategy("money_flow_momentum")
+def money_flow_momentum(strategy_config):
+    """
+    Money Flow Index (MFI) and Momentum strategy: Buy when MFI is oversold and Momentum is positive.
+    """
+    mfi_window = strategy_config.get("mfi_window", 14)
+    momentum_window = strategy_config.get("momentum_window", 14)
+    mfi = Indicator("MFI", (mfi_window,), lambda: IndicatorExpressions.mfi(
+        pl.col("high"), pl.col("low"), pl.col("close"), pl.col("volume"), mfi_window
+    ))
+    momentum = Indicator(
+        "Momentum", (momentum_window,), lambda: IndicatorExpressions.momentum(pl.col("close"), momentum_window)
+    )
+
+    def conditions(column):
+        buy_condition = (column(mfi) < 20) & (column(momentum) > 0)
+        sell_condition = (column(mfi) > 80) & (column(momentum) < 0)
+        return buy_condition, sell_condition
+
+    return [mfi, momentum], conditions
+
 
 class TradingStrategy:
     """
     A class for implementing various trading strategies.
     """
 
-    def __init__(self, strategy_configuration):
+    def __init__(self, strategy_configuration, indicator_cache=None):
         """
         Initializes the TradingStrategy with configuration parameters.
 
         Args:
             strategy_configuration (dict): The bot's configuration.
+            indicator_cache (IndicatorCache, optional): Cache of indicator columns shared
+                with other strategies and the TP/SL computation.
         """
         self.strategy_config = strategy_configuration
+        self.indicator_cache = indicator_cache
 
-    async def strategy_rsi_macd(self, price_data):
+    @staticmethod
+    def _signal(buy_condition, sell_condition, column="Signal"):
         """
-        RSI + MACD strategy: Buy when RSI is oversold and MACD indicates upward trend.
+        Builds the BUY/SELL/HOLD signal expression.
 
         Args:
-            price_data (pl.DataFrame): The input data.
+            buy_condition (pl.Expr): Condition for a BUY signal.
+            sell_condition (pl.Expr): Condition for a SELL signal.
+            column (str): Name of the signal column.
 
         Returns:
-            pl.DataFrame: Data with signals.
+            pl.Expr: The signal column expression.
         """
-        enriched_data = price_data.with_columns([
-            (await TechnicalIndicators.calculate_rsi(price_data["close"], self.strategy_config["rsi_window"])).alias(
-                "RSI"),
-            (await TechnicalIndicators.calculate_macd(price_data["close"]))["MACD"].alias("MACD"),
-            (await TechnicalIndicators.calculate_macd(price_data["close"]))["Signal"].alias("MACD_Signal"),
-        ])
-
-        enriched_data = enriched_data.with_columns([
-            pl.when((enriched_data["RSI"] < 30) & (enriched_data["MACD"] > enriched_data["MACD_Signal"]))
-            .then("BUY")
-            .when((enriched_data["RSI"] > 70) & (enriched_data["MACD"] < enriched_data["MACD_Signal"]))
-            .then("SELL")
-            .otherwise("HOLD")
-            .alias("Signal")
-        ])
+        return (
+            pl.when(buy_condition).then(pl.lit("BUY"))
+            .when(sell_condition).then(pl.lit("SELL"))
+            .otherwise(pl.lit("HOLD"))
+            .alias(column)
+        )
 
-        return enriched_data
+    @staticmethod
+    def _definition(strategy_config):
+        strategy_name = strategy_config["name"]
+        if strategy_name not in STRATEGY_REGISTRY:
+            raise ValueError(f"Unknown strategy: {strategy_name}")
+        return STRATEGY_REGISTRY[strategy_name](strategy_config)
 
-    async def strategy_bollinger_breakout(self, price_data):
+    def _run_strategies(self, price_data, strategies, symbol_column=None, series_key=None):
         """
-        Bollinger Bands breakout strategy.
+        Computes the indicators of all strategies once and adds a signal column per strategy.
 
         Args:
             price_data (pl.DataFrame): The input data.
+            strategies (list): (signal column, strategy configuration) pairs.
+            symbol_column (str, optional): Column identifying the symbol of each row. When given,
+                indicator windows are computed per symbol and never cross symbol boundaries.
+            series_key (tuple or dict, optional): Identifies price_data and its version in the indicator
+                cache, or maps each symbol to its own key (with `symbol_column`).
 
         Returns:
-            pl.DataFrame: Data with signals.
+            pl.DataFrame: Data with indicator columns and signals.
         """
-        bollinger_data = await TechnicalIndicators.calculate_bollinger_bands(
-            price_data["close"],
-            self.strategy_config["bollinger_window"],
-            self.strategy_config["bollinger_std_dev"]
+        definitions = [(column, self._definition(config)) for column, config in strategies]
+        graph = IndicatorGraph([
+            indicator for _, (indicators, _) in definitions for indicator in indicators
+        ])
+        query = TechnicalIndicators.apply_stages(
+            price_data, graph.stages(), symbol_column, self.indicator_cache, series_key
         )
+        signals = [
+            TradingStrategy._signal(*conditions(graph.column), column=column)
+            for column, (_, conditions) in definitions
+        ]
+        return query.with_columns(signals).collect()
 
-        enriched_data = price_data.with_columns([
-            bollinger_data["Upper Band"].alias("Bollinger_Upper"),
-            bollinger_data["Lower Band"].alias("Bollinger_Lower"),
-        ])
+    async def strategy_rsi_macd(self, price_data, series_key=None):
+        """
+        RSI + MACD strategy: Buy when RSI is oversold and MACD indicates upward trend.
 
-        enriched_data = enriched_data.with_columns([
-            pl.when(enriched_data["close"] < enriched_data["Bollinger_Lower"]).then("BUY")
-            .when(enriched_data["close"] > enriched_data["Bollinger_Upper"]).then("SELL")
-            .otherwise("HOLD")
-            .alias("Signal")
-        ])
+        Args:
+            price_data (pl.DataFrame): The input data.
+            series_key (tuple, optional): Identifies price_data and its version in the indicator cache.
 
-        return enriched_data
+        Returns:
+            pl.DataFrame: Data with signals.
+        """
+        config = {**self.strategy_config, "name": "rsi_macd"}
+        return self._run_strategies(price_data, [("Signal", config)], series_key=series_key)
 
-    async def strategy_money_flow_momentum(self, price_data):
+    async def strategy_bollinger_breakout(self, price_data, series_key=None):
         """
-        Money Flow Index (MFI) and Momentum strategy: Buy when MFI is oversold and Momentum is positive.
+        Bollinger Bands breakout strategy.
 
         Args:
             price_data (pl.DataFrame): The input data.
+            series_key (tuple, optional): Identifies price_data and its version in the indicator cache.
 
         Returns:
             pl.DataFrame: Data with signals.
         """
-        enriched_data = price_data.with_columns([
-            (await TechnicalIndicators.calculate_mfi(
-                price_data["high"], price_data["low"], price_data["close"], price_data["volume"],
-                self.strategy_config.get("mfi_window", 14)
-            )).alias("MFI"),
-            (await TechnicalIndicators.calculate_momentum(
-                price_data["close"],
-                self.strategy_config.get("momentum_window", 14)
-            )).alias("Momentum"),
-        ])
+        config = {**self.strategy_config, "name": "bollinger_breakout"}
+        return self._run_strategies(price_data, [("Signal", config)], series_key=series_key)
 
-        enriched_data = enriched_data.with_columns([
-            pl.when((enriched_data["MFI"] < 20) & (enriched_data["Momentum"] > 0)).then("BUY")
-            .when((enriched_data["MFI"] > 80) & (enriched_data["Momentum"] < 0)).then("SELL")
-            .otherwise("HOLD")
-            .alias("Signal")
-        ])
+    async def strategy_money_flow_momentum(self, price_data, series_key=None):
+        """
+        Money Flow Index (MFI) and Momentum strategy: Buy when MFI is oversold and Momentum is positive.
 
-        return enriched_data
+        Args:
+            price_data (pl.DataFrame): The input data.
+            series_key (tuple, optional): Identifies price_data and its version in the indicator cache.
 
-    async def generate_signals(self, price_data):
+        Returns:
+            pl.DataFrame: Data with signals.
+        """
+        config = {**self.strategy_config, "name": "money_flow_momentum"}
+        return self._run_strategies(price_data, [("Signal", config)], series_key=series_key)
+
+    async def generate_signals(self, price_data, series_key=None):
         """
         Selects and applies the chosen strategy to generate trading signals.
 
         Args:
             price_data (pl.DataFrame): The input data containing price information.
+            series_key (tuple, optional): Identifies price_data and its version in the indicator
+                cache (e.g., (symbol, version)); indicators are not cached without it.
 
         Returns:
             pl.DataFrame: A DataFrame with generated trading signals.
         """
-        strategy_name = self.strategy_config["name"]
+        return self._run_strategies(price_data, [("Signal", self.strategy_config)], series_key=series_key)
 
-        if strategy_name == "rsi_macd":
-            return await self.strategy_rsi_macd(price_data)
-        elif strategy_name == "bollinger_breakout":
-            return await self.strategy_bollinger_breakout(price_data)
-        elif strategy_name == "money_flow_momentum":
-            return await self.strategy_money_flow_momentum(price_data)
-        else:
-            raise ValueError(f"Unknown strategy: {strategy_name}")
+    async def generate_signals_batch(self, price_data, symbol_column="symbol", series_key=None):
+        """
+        Applies the chosen strategy to many symbols at once.
+
+        Args:
+            price_data (pl.DataFrame): Long-format data of many symbols; rows of each symbol
+                must be in time order (symbols may be interleaved).
+            symbol_column (str): Column identifying the symbol of each row (default "symbol").
+            series_key (tuple or dict, optional): Identifies price_data and its version in the indicator
+                cache, or maps each symbol to its own key (with `symbol_column`).
+
+        Returns:
+            pl.DataFrame: The input rows with indicator columns and signals, in the input order.
+        """
+        return self._run_strategies(
+            price_data, [("Signal", self.strategy_config)], symbol_column=symbol_column, series_key=series_key
+        )
+
+    async def generate_signals_multi(self, price_data, strategy_configs, symbol_column=None, series_key=None):
+        """
+        Applies many strategies to the same data, computing each shared indicator once.
+
+        Args:
+            price_data (pl.DataFrame): The input data (long format with `symbol_column` for many symbols).
+            strategy_configs (list): Strategy configurations; each needs "name" and may set "label",
+                which names its signal column "Signal_<label>" (default: the strategy name).
+            symbol_column (str, optional): Column identifying the symbol of each row.
+            series_key (tuple or dict, optional): Identifies price_data and its version in the indicator
+                cache, or maps each symbol to its own key (with `symbol_column`).
+
+        Returns:
+            pl.DataFrame: Data with the indicator columns of all strategies and one signal column each.
+        """
+        strategies = [
+            (f"Signal_{config.get('label', config['name'])}", {**self.strategy_config, **config})
+            for config in strategy_configs
+        ]
+        columns = [column for column, _ in strategies]
+        if len(set(columns)) != len(columns):
+            raise ValueError(f"Duplicate signal columns: {columns}; set distinct 'label' values")
+        return self._run_strategies(price_data, strategies, symbol_column=symbol_column, series_key=series_key)
 
 if __name__ == "__main__":
     # Example usage
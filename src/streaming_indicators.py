@@ -0,0 +1,357 @@
+import math
+from collections import deque
+
+# Co ile aktualizacji przeliczamy sumy okna od nowa, aby ograniczyć błędy zaokrągleń
+RESUM_INTERVAL = 1024
+
+
+class StreamingIndicator:
+    """
+    Base class of the incremental indicators.
+
+    Each indicator is updated with one new candle in O(1) and numerically
+    matches its batch counterpart in `utils.TechnicalIndicators`. `None` is
+    returned while the indicator is warming up, where the batch version
+    returns null. The state can be captured with `snapshot()` and brought
+    back with `restore()`.
+    """
+
+    def snapshot(self):
+        """
+        Captures the indicator state.
+
+        Returns:
+            dict: A state built from plain Python values.
+        """
+        state = {}
+        for name, value in self.__dict__.items():
+            if isinstance(value, deque):
+                value = {"deque": list(value), "maxlen": value.maxlen}
+            elif isinstance(value, StreamingIndicator):
+                value = value.snapshot()
+            state[name] = value
+        return {"type": type(self).__name__, "state": state}
+
+    @staticmethod
+    def restore(snapshot):
+        """
+        Rebuilds an indicator from a snapshot.
+
+        Args:
+            snapshot (dict): The result of `snapshot()`.
+
+        Returns:
+            StreamingIndicator: The restored indicator.
+        """
+        return INDICATOR_CLASSES[snapshot["type"]]._from_state(snapshot["state"])
+
+    @classmethod
+    def _from_state(cls, state):
+        indicator = cls.__new__(cls)
+        for name, value in state.items():
+            if isinstance(value, dict) and "deque" in value:
+                value = deque(value["deque"], maxlen=value["maxlen"])
+            elif isinstance(value, dict) and "type" in value:
+                value = StreamingIndicator.restore(value)
+            setattr(indicator, name, value)
+        return indicator
+
+
+class RollingSum(StreamingIndicator):
+    """
+    Sum over the last `window` values (polars `rolling_sum`).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.updates = 0
+
+    def update(self, value):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+        self.updates += 1
+        if self.updates % RESUM_INTERVAL == 0:
+            self.total = math.fsum(self.values)
+
+        if len(self.values) < self.window:
+            return None
+        return self.total
+
+
+class StreamingSMA(StreamingIndicator):
+    """
+    Incremental Simple Moving Average (TechnicalIndicators.calculate_sma).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.sum = RollingSum(window)
+        self.value = None
+
+    def update(self, close):
+        total = self.sum.update(close)
+        self.value = None if total is None else total / self.window
+        return self.value
+
+
+class StreamingEMA(StreamingIndicator):
+    """
+    Incremental Exponential Moving Average (TechnicalIndicators.calculate_ema).
+
+    Polars' `ewm_mean` is bias-adjusted, so a weighted sum and the sum of the
+    weights are carried separately.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.decay = 1 - 2 / (window + 1)
+        self.weighted_sum = 0.0
+        self.weight_sum = 0.0
+        self.value = None
+
+    def update(self, close):
+        self.weighted_sum = close + self.decay * self.weighted_sum
+        self.weight_sum = 1 + self.decay * self.weight_sum
+        self.value = self.weighted_sum / self.weight_sum
+        return self.value
+
+
+class StreamingRSI(StreamingIndicator):
+    """
+    Incremental Relative Strength Index (TechnicalIndicators.calculate_rsi).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.gains = RollingSum(window)
+        self.losses = RollingSum(window)
+        self.prev_close = None
+        self.value = None
+
+    def update(self, close):
+        if self.prev_close is None:
+            self.prev_close = close
+            return None
+
+        delta = close - self.prev_close
+        self.prev_close = close
+        gain = self.gains.update(max(delta, 0.0))
+        loss = self.losses.update(max(-delta, 0.0))
+        if gain is None:
+            return None
+
+        if loss == 0:
+            # Jak w polars: x / 0 = inf (RSI = 100), 0 / 0 = NaN
+            self.value = 100.0 if gain > 0 else math.nan
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+
+class StreamingMACD(StreamingIndicator):
+    """
+    Incremental Moving Average Convergence Divergence (TechnicalIndicators.calculate_macd).
+    """
+
+    def __init__(self, fast_window=12, slow_window=26, signal_window=9):
+        self.fast_ema = StreamingEMA(fast_window)
+        self.slow_ema = StreamingEMA(slow_window)
+        self.signal_ema = StreamingEMA(signal_window)
+        self.value = None
+
+    def update(self, close):
+        macd_line = self.fast_ema.update(close) - self.slow_ema.update(close)
+        self.value = {"MACD": macd_line, "Signal": self.signal_ema.update(macd_line)}
+        return self.value
+
+
+class StreamingATR(StreamingIndicator):
+    """
+    Incremental Average True Range (TechnicalIndicators.calculate_atr).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.true_ranges = RollingSum(window)
+        self.prev_close = None
+        self.value = None
+
+    def update(self, high, low, close):
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = max(true_range, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+
+        total = self.true_ranges.update(true_range)
+        self.value = None if total is None else total / self.window
+        return self.value
+
+
+class StreamingBollingerBands(StreamingIndicator):
+    """
+    Incremental Bollinger Bands (TechnicalIndicators.calculate_bollinger_bands).
+
+    The window mean and sum of squared deviations are updated with a sliding
+    Welford step, which stays accurate for large prices.
+    """
+
+    def __init__(self, window, num_std_dev):
+        self.window = window
+        self.num_std_dev = num_std_dev
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.squared_deviations = 0.0
+        self.value = None
+
+    def update(self, close):
+        if len(self.values) < self.window:
+            self.values.append(close)
+            count = len(self.values)
+            old_mean = self.mean
+            self.mean += (close - old_mean) / count
+            self.squared_deviations += (close - old_mean) * (close - self.mean)
+        else:
+            oldest = self.values[0]
+            self.values.append(close)
+            old_mean = self.mean
+            self.mean += (close - oldest) / self.window
+            self.squared_deviations += (close - oldest) * (close - self.mean + oldest - old_mean)
+            self.squared_deviations = max(self.squared_deviations, 0.0)
+
+        if len(self.values) < self.window:
+            return None
+
+        std_dev = math.sqrt(self.squared_deviations / (self.window - 1))
+        self.value = {
+            "Upper Band": self.mean + std_dev * self.num_std_dev,
+            "Middle Band": self.mean,
+            "Lower Band": self.mean - std_dev * self.num_std_dev,
+        }
+        return self.value
+
+
+class StreamingMFI(StreamingIndicator):
+    """
+    Incremental Money Flow Index (TechnicalIndicators.calculate_mfi).
+    """
+
+    def __init__(self, window=14):
+        self.window = window
+        self.positive_flows = RollingSum(window)
+        self.negative_flows = RollingSum(window)
+        self.prev_typical_price = None
+        self.value = None
+
+    def update(self, high, low, close, volume):
+        typical_price = (high + low + close) / 3
+        money_flow = typical_price * volume
+
+        positive_flow = negative_flow = 0.0
+        if self.prev_typical_price is not None:
+            if typical_price > self.prev_typical_price:
+                positive_flow = money_flow
+            else:
+                negative_flow = money_flow
+        self.prev_typical_price = typical_price
+
+        positive = self.positive_flows.update(positive_flow)
+        negative = self.negative_flows.update(negative_flow)
+        if positive is None:
+            return None
+
+        if negative == 0:
+            self.value = 100.0 if positive > 0 else math.nan
+        else:
+            self.value = 100 - (100 / (1 + positive / negative))
+        return self.value
+
+
+class StreamingMomentum(StreamingIndicator):
+    """
+    Incremental Momentum (TechnicalIndicators.calculate_momentum).
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window + 1)
+        self.value = None
+
+    def update(self, close):
+        self.values.append(close)
+        if len(self.values) <= self.window:
+            return None
+        self.value = close - self.values[0]
+        return self.value
+
+
+class StreamingIndicatorSet(StreamingIndicator):
+    """
+    All incremental indicators of one symbol, updated together with each closed candle.
+    """
+
+    def __init__(self, strategy_config=None):
+        """
+        Args:
+            strategy_config (dict, optional): Strategy configuration with the indicator windows.
+        """
+        config = strategy_config or {}
+        self.indicators = {
+            "SMA": StreamingSMA(config.get("bollinger_window", 20)),
+            "EMA": StreamingEMA(config.get("ema_window", 12)),
+            "RSI": StreamingRSI(config.get("rsi_window", 14)),
+            "MACD": StreamingMACD(),
+            "ATR": StreamingATR(config.get("atr_window", 14)),
+            "Bollinger": StreamingBollingerBands(
+                config.get("bollinger_window", 20), config.get("bollinger_std_dev", 2)
+            ),
+            "MFI": StreamingMFI(config.get("mfi_window", 14)),
+            "Momentum": StreamingMomentum(config.get("momentum_window", 14)),
+        }
+
+    def update(self, candle):
+        """
+        Updates every indicator with one candle.
+
+        Args:
+            candle (list): [timestamp, open, high, low, close, volume].
+
+        Returns:
+            dict: Indicator name -> current value.
+        """
+        _, _, high, low, close, volume = candle[:6]
+        return {
+            "SMA": self.indicators["SMA"].update(close),
+            "EMA": self.indicators["EMA"].update(close),
+            "RSI": self.indicators["RSI"].update(close),
+            "MACD": self.indicators["MACD"].update(close),
+            "ATR": self.indicators["ATR"].update(high, low, close),
+            "Bollinger": self.indicators["Bollinger"].update(close),
+            "MFI": self.indicators["MFI"].update(high, low, close, volume),
+            "Momentum": self.indicators["Momentum"].update(close),
+        }
+
+    def snapshot(self):
+        return {
+            "type": type(self).__name__,
+            "state": {name: indicator.snapshot() for name, indicator in self.indicators.items()},
+        }
+
+    @classmethod
+    def _from_state(cls, state):
+        indicator_set = cls.__new__(cls)
+        indicator_set.indicators = {name: StreamingIndicator.restore(value) for name, value in state.items()}
+        return indicator_set
+
+
+INDICATOR_CLASSES = {
+    indicator_class.__name__: indicator_class
+    for indicator_class in (
+        RollingSum, StreamingSMA, StreamingEMA, StreamingRSI, StreamingMACD, StreamingATR,
+        StreamingBollingerBands, StreamingMFI, StreamingMomentum, StreamingIndicatorSet,
+    )
+}
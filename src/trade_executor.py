@@ -1,16 +1,19 @@
 # trade_executor.py
 import logging
 import ccxt
-from lstm_predictor import make_prediction  # Zmiana importu
+from lstm_predictor import make_prediction, model_loader, use_inference_server  # Zmiana importu
+from inference_server import InferenceClient
 from data_fetcher import DataFetcher
 
 class TradeExecutor:
-    def __init__(self, config):
+    def __init__(self, config, data_fetcher=None):
         """
         Initializes the TradeExecutor with configuration parameters.
 
         Args:
             config (dict): The bot's configuration for trading execution.
+            data_fetcher (DataFetcher, optional): Shared data fetcher. Defaults to a new one,
+                which still shares the process-wide read cache.
         """
         self.trade_config = config
         self.api_key = config.get("exchange", {}).get("api_key")
@@ -42,8 +45,20 @@ class TradeExecutor:
             logging.error(f"Failed to initialize exchange: {init_err}")
             raise
 
-        # Initialize Data Fetcher
-        self.data_fetcher = DataFetcher()
+        # Initialize Data Fetcher and reuse its read cache for balance requests
+        self.data_fetcher = data_fetcher or DataFetcher()
+        self.read_cache = self.data_fetcher.read_cache
+
+        # The LSTM model is loaded on first prediction; optionally warm it up in the background,
+        # or use a model served by a separate inference server process
+        model_config = config.get("model", {})
+        self.inference_client = None
+        if model_config.get("inference_server"):
+            # Klucz serwera z TITANFLOW_INFERENCE_KEY
+            self.inference_client = InferenceClient(tuple(model_config["inference_server"]))
+            use_inference_server(self.inference_client)
+        elif model_config.get("warm_up", False):
+            model_loader.warm_up()
 
     def execute_trade(self, symbol, side, amount, price=None):
         """
@@ -59,9 +74,6 @@ class TradeExecutor:
             dict: The response from the exchange.
         """
         try:
-            # Fetch real-time market data
-            market_data = self.data_fetcher.get_data_for_model(symbol)
-
             # Predict optimal SL/TP percentages using LSTM
             predictions = make_prediction(symbol)  # Używamy funkcji make_prediction
             if not predictions:
@@ -81,6 +93,10 @@ class TradeExecutor:
                 order = self.exchange.create_market_order(symbol, side, amount)
 
             logging.info(f"Trade executed: {order}")
+
+            # The balance changed, drop its cached value
+            if self.read_cache is not None:
+                self.read_cache.invalidate("balance")
             return order
 
         except ccxt.NetworkError as network_err:
@@ -96,11 +112,18 @@ class TradeExecutor:
         """
         Fetches the account balance from the exchange.
 
+        Concurrent calls share one request and the result is cached briefly.
+
         Returns:
             dict: The balance data.
         """
         try:
-            balance_data = self.exchange.fetch_balance()
+            if self.read_cache is None:
+                balance_data = self.exchange.fetch_balance()
+            else:
+                balance_data = self.read_cache.get_sync(
+                    "balance", (self.exchange_name, self.exchange_mode, self.api_key), self.exchange.fetch_balance
+                )
             logging.info("Fetched account balance successfully.")
             return balance_data
         except ccxt.NetworkError as network_err:
@@ -112,6 +135,15 @@ class TradeExecutor:
 
         return {}
 
+    def close(self):
+        """
+        Disconnects from the inference server, releasing the client's shared memory block.
+        """
+        if self.inference_client is not None:
+            use_inference_server(None)
+            self.inference_client.close()
+            self.inference_client = None
+
 if __name__ == "__main__":
     # Example usage
     logging.basicConfig(level=logging.INFO)
@@ -127,6 +159,10 @@ if __name__ == "__main__":
         "risk_management": {
             "default_stop_loss": 5,
             "default_take_profit": 12
+        },
+        "model": {
+            "warm_up": True,  # Load the LSTM model in the background at startup
+            "inference_server": None  # E.g. ["127.0.0.1", 6010] with TITANFLOW_INFERENCE_KEY set
         }
     }
 
@@ -142,3 +178,5 @@ if __name__ == "__main__":
         print(account_balance)
     except Exception as main_err:
         logging.error(f"Error in trade execution or balance fetch: {main_err}")
+    finally:
+        executor.close()
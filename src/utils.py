@@ -1,6 +1,23 @@
 import polars as pl
 import asyncio
 
+# Wskaźniki obliczane przez TechnicalIndicators.calculate_batch
+BATCH_INDICATORS = [
+    "SMA", "EMA", "RSI", "MACD", "MACD_Signal", "ATR",
+    "Bollinger_Upper", "Bollinger_Middle", "Bollinger_Lower", "MFI", "Momentum",
+]
+BATCH_DEFAULTS = {
+    "sma_window": 20,
+    "ema_window": 12,
+    "rsi_window": 14,
+    "atr_window": 14,
+    "bollinger_window": 20,
+    "bollinger_std_dev": 2,
+    "mfi_window": 14,
+    "momentum_window": 14,
+}
+ROW_INDEX_COLUMN = "__row"  # Pomocnicza kolumna przywracająca kolejność wierszy po podziale na symbole
+
 class TechnicalIndicators:
     """
     A class to calculate technical indicators for financial data.
@@ -32,8 +49,7 @@ class TechnicalIndicators:
         Returns:
             pl.Series: The EMA values.
         """
-        alpha = 2 / (window + 1)
-        return data.ewm_mean(span=window, alpha=alpha)
+        return data.ewm_mean(span=window)  # alpha = 2 / (window + 1)
 
     @staticmethod
     async def calculate_rsi(data, window):
@@ -48,8 +64,8 @@ class TechnicalIndicators:
             pl.Series: The RSI values.
         """
         delta = data.diff()
-        gain = delta.apply(lambda x: x if x > 0 else 0).rolling_mean(window)
-        loss = (-delta).apply(lambda x: x if x > 0 else 0).rolling_mean(window)
+        gain = ((delta + delta.abs()) / 2).rolling_mean(window)  # max(delta, 0)
+        loss = ((delta.abs() - delta) / 2).rolling_mean(window)  # max(-delta, 0)
         rs = gain / loss
         return 100 - (100 / (1 + rs))
 
@@ -128,9 +144,10 @@ class TechnicalIndicators:
             pl.Series: The ATR values.
         """
         tr1 = high - low
-        tr2 = (high - close.shift(1)).abs()
-        tr3 = (low - close.shift(1)).abs()
-        tr = pl.concat([tr1, tr2, tr3], how="vertical").max(axis=1)
+        tr2 = (high - close.shift(1)).abs().fill_null(0)  # Pierwsza świeca nie ma poprzedniego zamknięcia
+        tr3 = (low - close.shift(1)).abs().fill_null(0)
+        tr = tr1.zip_with(tr1 >= tr2, tr2)
+        tr = tr.zip_with(tr >= tr3, tr3)
         return tr.rolling_mean(window)
 
     @staticmethod
@@ -151,3 +168,290 @@ class TechnicalIndicators:
         upper_band = sma + (std_dev * num_std_dev)
         lower_band = sma - (std_dev * num_std_dev)
         return {"Upper Band": upper_band, "Middle Band": sma, "Lower Band": lower_band}
+
+
+    @staticmethod
+    async def calculate_batch(price_data, indicators=None, config=None, symbol_column="symbol",
+                              indicator_cache=None, series_key=None):
+        """
+        Calculates indicators for many symbols in one grouped, windowed pass.
+
+        Args:
+            price_data (pl.DataFrame): Long-format data of many symbols; rows of each symbol
+                must be in time order (symbols may be interleaved).
+            indicators (list, optional): Names of the indicator columns to add
+                (default: all of BATCH_INDICATORS).
+            config (dict, optional): Window sizes, using the keys of the strategy configuration
+                (e.g., "rsi_window", "bollinger_window"); missing keys use the defaults.
+            symbol_column (str): Column identifying the symbol of each row (default "symbol").
+            indicator_cache (IndicatorCache, optional): Cache of computed indicator columns.
+            series_key (tuple or dict, optional): Identifies price_data and its version in the cache,
+                or maps each symbol to its own key (e.g., {symbol: (symbol, version)}).
+
+        Returns:
+            pl.DataFrame: The input rows with the indicator columns, in the input order.
+        """
+        config = {**BATCH_DEFAULTS, **(config or {})}
+        indicators = indicators or BATCH_INDICATORS
+        high, low, close, volume = pl.col("high"), pl.col("low"), pl.col("close"), pl.col("volume")
+        bollinger_params = (config["bollinger_window"], config["bollinger_std_dev"])
+        bollinger_bands = IndicatorExpressions.bollinger_bands(close, *bollinger_params)
+        expressions = {
+            "SMA": ((config["sma_window"],), IndicatorExpressions.sma(close, config["sma_window"])),
+            "EMA": ((config["ema_window"],), IndicatorExpressions.ema(close, config["ema_window"])),
+            "RSI": ((config["rsi_window"],), IndicatorExpressions.rsi(close, config["rsi_window"])),
+            "MACD": ((12, 26), IndicatorExpressions.macd(close)),
+            "ATR": ((config["atr_window"],), IndicatorExpressions.atr(high, low, close, config["atr_window"])),
+            "Bollinger_Upper": (bollinger_params, bollinger_bands["Upper Band"]),
+            "Bollinger_Middle": (bollinger_params, bollinger_bands["Middle Band"]),
+            "Bollinger_Lower": (bollinger_params, bollinger_bands["Lower Band"]),
+            "MFI": ((config["mfi_window"],), IndicatorExpressions.mfi(high, low, close, volume, config["mfi_window"])),
+            "Momentum": ((config["momentum_window"],), IndicatorExpressions.momentum(close, config["momentum_window"])),
+        }
+
+        first_stage = [(name,) + expressions[name] for name in indicators if name != "MACD_Signal"]
+        stages = [first_stage]
+        if "MACD_Signal" in indicators:
+            if "MACD" not in indicators:
+                first_stage.append(("MACD",) + expressions["MACD"])
+            stages.append([("MACD_Signal", (12, 26, 9), IndicatorExpressions.ema(pl.col("MACD"), 9))])
+
+        return TechnicalIndicators.apply_stages(
+            price_data, stages, symbol_column, indicator_cache, series_key
+        ).collect()
+
+    @staticmethod
+    def apply_stages(price_data, stages, symbol_column=None, indicator_cache=None, series_key=None):
+        """
+        Adds indicator columns computed in stages, reusing cached columns.
+
+        Without a cache all stages form one lazy query. With a cache, only the
+        missing columns of each stage are computed and then stored.
+
+        Args:
+            price_data (pl.DataFrame): The input data.
+            stages (list): Lists of (column, params, expression) tuples; each stage may use
+                columns of the previous ones.
+            symbol_column (str, optional): Column identifying the symbol of each row. When given,
+                indicator windows are computed per symbol and never cross symbol boundaries.
+            indicator_cache (IndicatorCache, optional): Cache of computed indicator columns.
+            series_key (tuple or dict, optional): Identifies price_data and its version in the cache
+                (e.g., (symbol, version)); nothing is cached without it. With a symbol_column it
+                may map each symbol to its own key, so every symbol's columns are cached separately.
+
+        Returns:
+            pl.LazyFrame: The input data with the indicator columns.
+        """
+        use_cache = indicator_cache is not None and series_key is not None
+        if use_cache and symbol_column is not None and isinstance(series_key, dict):
+            return TechnicalIndicators._apply_stages_by_symbol(
+                price_data, stages, symbol_column, indicator_cache, series_key
+            )
+        query = price_data.lazy()
+        for stage in stages:
+            cached_columns = []
+            computed = []
+            for column, params, expression in stage:
+                if use_cache:
+                    found, values = indicator_cache.lookup(series_key, column, params)
+                    if found:
+                        cached_columns.append(values)
+                        continue
+                if symbol_column is not None:
+                    expression = expression.over(symbol_column)
+                computed.append((column, params, expression.alias(column)))
+
+            if cached_columns:
+                query = query.with_columns(cached_columns)
+            if computed:
+                query = query.with_columns([expression for _, _, expression in computed])
+                if use_cache:
+                    frame = query.collect()
+                    for column, params, _ in computed:
+                        indicator_cache.store(series_key, column, params, frame[column])
+                    query = frame.lazy()
+        return query
+
+    @staticmethod
+    def _apply_stages_by_symbol(price_data, stages, symbol_column, indicator_cache, series_keys):
+        """
+        `apply_stages` with one cache key per symbol: a symbol reuses its cached columns
+        while its own candles are unchanged, whatever happens to the other symbols. The
+        symbols missing a column of a stage are computed together in one grouped pass
+        and their slices are stored separately.
+        """
+        frames = price_data.with_row_count(ROW_INDEX_COLUMN).partition_by(symbol_column, maintain_order=True)
+        frames = {frame[symbol_column][0]: frame for frame in frames}
+        for stage in stages:
+            missing = []
+            for symbol, frame in frames.items():
+                cached_columns = []
+                for column, params, _ in stage:
+                    found, values = indicator_cache.lookup(series_keys[symbol], column, params)
+                    if not found:
+                        break
+                    cached_columns.append(values)
+                else:
+                    frames[symbol] = frame.with_columns(cached_columns)
+                    continue
+                missing.append(symbol)
+
+            if missing:
+                computed = pl.concat([frames[symbol] for symbol in missing]).with_columns([
+                    expression.over(symbol_column).alias(column) for column, _, expression in stage
+                ])
+                for frame in computed.partition_by(symbol_column, maintain_order=True):
+                    symbol = frame[symbol_column][0]
+                    for column, params, _ in stage:
+                        indicator_cache.store(series_keys[symbol], column, params, frame[column])
+                    frames[symbol] = frame
+
+        return pl.concat(list(frames.values())).sort(ROW_INDEX_COLUMN).drop(ROW_INDEX_COLUMN).lazy()
+
+class IndicatorExpressions:
+    """
+    Technical indicators as Polars expressions.
+
+    The expressions take input expressions (e.g., `pl.col("close")`) and can be
+    combined into one lazy query, which Polars optimizes and runs multi-threaded
+    without Python callbacks per row.
+    """
+
+    @staticmethod
+    def sma(data, window):
+        """
+        Simple Moving Average (SMA).
+
+        Args:
+            data (pl.Expr): The price expression.
+            window (int): The window size for SMA.
+
+        Returns:
+            pl.Expr: The SMA values.
+        """
+        return data.rolling_mean(window)
+
+    @staticmethod
+    def ema(data, window):
+        """
+        Exponential Moving Average (EMA).
+
+        Args:
+            data (pl.Expr): The price expression.
+            window (int): The window size for EMA.
+
+        Returns:
+            pl.Expr: The EMA values.
+        """
+        return data.ewm_mean(span=window)
+
+    @staticmethod
+    def rsi(data, window):
+        """
+        Relative Strength Index (RSI).
+
+        Args:
+            data (pl.Expr): The price expression.
+            window (int): The window size for RSI.
+
+        Returns:
+            pl.Expr: The RSI values.
+        """
+        delta = data.diff()
+        gain = ((delta + delta.abs()) / 2).rolling_mean(window)  # max(delta, 0)
+        loss = ((delta.abs() - delta) / 2).rolling_mean(window)  # max(-delta, 0)
+        return gain / (gain + loss) * 100  # = 100 - 100 / (1 + gain / loss)
+
+    @staticmethod
+    def macd(data, fast_window=12, slow_window=26):
+        """
+        MACD line. The signal line is `ema(macd, signal_window)`; computing it from the
+        MACD column in a following `with_columns` avoids evaluating the EMAs twice.
+
+        Args:
+            data (pl.Expr): The price expression.
+            fast_window (int): The fast EMA window size.
+            slow_window (int): The slow EMA window size.
+
+        Returns:
+            pl.Expr: The MACD line.
+        """
+        return IndicatorExpressions.ema(data, fast_window) - IndicatorExpressions.ema(data, slow_window)
+
+    @staticmethod
+    def mfi(high, low, close, volume, window=14):
+        """
+        Money Flow Index (MFI).
+
+        Args:
+            high (pl.Expr): High prices.
+            low (pl.Expr): Low prices.
+            close (pl.Expr): Close prices.
+            volume (pl.Expr): Volumes.
+            window (int): The window size for MFI.
+
+        Returns:
+            pl.Expr: The MFI values.
+        """
+        typical_price = (high + low + close) / 3
+        money_flow = typical_price * volume
+        price_change = typical_price.diff()
+        positive_flow = pl.when(price_change > 0).then(money_flow).otherwise(0).rolling_sum(window)
+        negative_flow = pl.when(price_change <= 0).then(money_flow).otherwise(0).rolling_sum(window)
+        # = 100 - 100 / (1 + positive / negative); literał po lewej stronie źle się wyrównuje w .over() (polars 0.16)
+        return positive_flow / (positive_flow + negative_flow) * 100
+
+    @staticmethod
+    def momentum(data, window):
+        """
+        Momentum.
+
+        Args:
+            data (pl.Expr): The price expression.
+            window (int): The window size for Momentum.
+
+        Returns:
+            pl.Expr: The Momentum values.
+        """
+        return data - data.shift(window)
+
+    @staticmethod
+    def atr(high, low, close, window):
+        """
+        Average True Range (ATR).
+
+        Args:
+            high (pl.Expr): High prices.
+            low (pl.Expr): Low prices.
+            close (pl.Expr): Close prices.
+            window (int): The window size for ATR.
+
+        Returns:
+            pl.Expr: The ATR values.
+        """
+        tr1 = high - low
+        tr2 = (high - close.shift(1)).abs().fill_null(0)
+        tr3 = (low - close.shift(1)).abs().fill_null(0)
+        # Maksimum poziome zamiast when/then: poprawne także w oknach `.over(symbol)`
+        return pl.max([tr1, tr2, tr3]).rolling_mean(window)
+
+    @staticmethod
+    def bollinger_bands(data, window, num_std_dev):
+        """
+        Bollinger Bands.
+
+        Args:
+            data (pl.Expr): The price expression.
+            window (int): The window size for the moving average.
+            num_std_dev (int): The number of standard deviations for the bands.
+
+        Returns:
+            dict: A dictionary with upper, middle, and lower band expressions.
+        """
+        sma = IndicatorExpressions.sma(data, window)
+        std_dev = data.rolling_std(window)
+        return {
+            "Upper Band": sma + (std_dev * num_std_dev),
+            "Middle Band": sma,
+            "Lower Band": sma - (std_dev * num_std_dev),
+        }
@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import polars as pl
+from backtester import Backtester
+from indicator_cache import IndicatorCache
+from parameter_sweep import BACKTEST_PARAMS, SWEEP_GRIDS, grid, load_frames
+from strategy import TradingStrategy
+from utils import IndicatorExpressions
+
+# 🔧 Ścieżki
+DATA_DIR = "D:/TitanFlow/data/data/datasets"
+RESULTS_DIR = "D:/TitanFlow/data/walk_forward"
+
+# 🔧 Parametry walk-forward (świece dzienne)
+TRAIN_BARS = 730  # Okno optymalizacji
+TEST_BARS = 60  # Okno out-of-sample, o tyle przesuwają się kolejne okna
+OPTIMIZE_METRIC = "sharpe"
+MIN_TRADES = 3  # Minimalna liczba transakcji w oknie treningowym
+ATR_WINDOW = 14
+
+
+def fold_windows(n_bars, train_bars=TRAIN_BARS, test_bars=TEST_BARS, anchored=False):
+    """
+    Splits a series into walk-forward folds.
+
+    The test windows follow each other without overlapping, so their
+    results can be stitched together.
+
+    Args:
+        n_bars (int): Length of the series.
+        train_bars (int): Length of the training window (the minimum length when anchored).
+        test_bars (int): Length of the test window and the step between folds.
+        anchored (bool): Whether every training window starts at the first bar.
+
+    Returns:
+        list: (train start, train end, test end) bar indexes; the test window is [train end, test end).
+    """
+    folds = []
+    train_end = train_bars
+    while train_end < n_bars:
+        test_end = min(train_end + test_bars, n_bars)
+        folds.append((0 if anchored else train_end - train_bars, train_end, test_end))
+        train_end = test_end
+    return folds
+
+
+class WalkForwardResult:
+    """
+    Folds and stitched out-of-sample backtest of one symbol.
+    """
+
+    def __init__(self, symbol, folds, out_of_sample):
+        """
+        Args:
+            symbol (str): The symbol.
+            folds (list): One dict per fold (windows, chosen params, train score, test stats).
+            out_of_sample (BacktestResult): The test windows backtested one after another.
+        """
+        self.symbol = symbol
+        self.folds = folds
+        self.out_of_sample = out_of_sample
+
+
+class WalkForwardOptimizer:
+    """
+    Re-optimizes strategy parameters on sliding training windows and trades
+    the best ones on the following test window.
+
+    Overlapping folds share most of their bars, so nothing is computed per
+    fold from scratch: the indicators and signals of each combination are
+    computed once on the whole series (through the shared IndicatorCache)
+    and the exits of all potential trades are found once by
+    `Backtester.prepare`; a fold only slices them with `Backtester.run_range`.
+    The indicators of a window are therefore warmed up by the bars before it,
+    as they would be in live trading. Scores of training windows are kept
+    by timestamps, so running again after new candles were appended only
+    evaluates the new folds.
+    """
+
+    def __init__(self, strategy_name, combinations, strategy_config=None, train_bars=TRAIN_BARS,
+                 test_bars=TEST_BARS, anchored=False, metric=OPTIMIZE_METRIC, min_trades=MIN_TRADES,
+                 indicator_cache=None):
+        """
+        Initializes the WalkForwardOptimizer.
+
+        Args:
+            strategy_name (str): Registered strategy to optimize.
+            combinations (list): Parameter dicts to choose from (see parameter_sweep.grid).
+            strategy_config (dict, optional): Base strategy configuration the combinations override.
+            train_bars (int): Length of the training window.
+            test_bars (int): Length of the test window.
+            anchored (bool): Whether every training window starts at the first bar.
+            metric (str): Backtest statistic maximized on the training window.
+            min_trades (int): Minimum trades in the training window for a combination to be chosen.
+            indicator_cache (IndicatorCache, optional): Cache of indicator series.
+        """
+        self.strategy_name = strategy_name
+        self.combinations = [(json.dumps(params, sort_keys=True), params) for params in combinations]
+        self.strategy_config = strategy_config or {}
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.anchored = anchored
+        self.metric = metric
+        self.min_trades = min_trades
+        self.indicator_cache = indicator_cache or IndicatorCache()
+        self._prepared = {}  # Symbol -> (wersja danych, {kombinacja: PreparedSignals})
+        self._scores = {}  # (symbol, kombinacja, początek danych, okno) -> (wynik, liczba transakcji)
+
+    def _backtester(self, params):
+        return Backtester(**{key: value for key, value in params.items() if key in BACKTEST_PARAMS})
+
+    async def _prepare_all(self, price_data, symbol):
+        """
+        Returns the prepared signals of every combination on the whole series, reusing them
+        while the data is unchanged.
+        """
+        version = (price_data.height, price_data["timestamp"][0], price_data["timestamp"][-1])
+        cached_version, prepared = self._prepared.get(symbol, (None, None))
+        if cached_version == version:
+            return prepared
+
+        series_key = (symbol, version)
+        price_data = price_data.with_columns([
+            self.indicator_cache.get(
+                series_key, "ATR", (ATR_WINDOW,),
+                lambda: price_data.select([
+                    IndicatorExpressions.atr(pl.col("high"), pl.col("low"), pl.col("close"), ATR_WINDOW).alias("ATR")
+                ])["ATR"],
+            )
+        ])
+
+        prepared = {}
+        for combination, params in self.combinations:
+            strategy_config = {**self.strategy_config, "name": self.strategy_name}
+            strategy_config.update({key: value for key, value in params.items() if key not in BACKTEST_PARAMS})
+            trading_strategy = TradingStrategy(strategy_config, self.indicator_cache)
+            signals = await trading_strategy.generate_signals(price_data, series_key=series_key)
+            prepared[combination] = self._backtester(params).prepare(signals)
+
+        self._prepared[symbol] = (version, prepared)
+        return prepared
+
+    def _score(self, symbol, combination, params, prepared, start, end):
+        """
+        Returns the training score and trade count of a combination on the bars [start, end).
+        """
+        timestamps = prepared.timestamps
+        key = (symbol, combination, int(timestamps[0]), int(timestamps[start]), int(timestamps[end - 1]))
+        if key not in self._scores:
+            stats = self._backtester(params).run_range(prepared, symbol, start, end).stats
+            self._scores[key] = (stats.get(self.metric), stats["trades"])
+        return self._scores[key]
+
+    def _choose(self, symbol, prepared, start, end, previous):
+        """
+        Picks the combination with the best training score.
+
+        When no combination makes enough trades, the previous fold's choice is kept
+        (or, in the first fold, the best score regardless of the trade count).
+        """
+        scores = [
+            (combination, params) + self._score(symbol, combination, params, prepared[combination], start, end)
+            for combination, params in self.combinations
+        ]
+        qualified = [score for score in scores if score[2] is not None and score[3] >= self.min_trades]
+        if not qualified and previous is not None:
+            return previous
+        candidates = qualified or scores
+        return max(candidates, key=lambda score: float("-inf") if score[2] is None else score[2])
+
+    async def run(self, price_data, symbol=""):
+        """
+        Runs the walk-forward optimization of one symbol.
+
+        Args:
+            price_data (pl.DataFrame): Candles (timestamp, open, high, low, close, volume) sorted by timestamp.
+            symbol (str): Name of the symbol.
+
+        Returns:
+            WalkForwardResult: The folds and the stitched out-of-sample backtest, or None when
+                the series is shorter than one fold.
+        """
+        windows = fold_windows(price_data.height, self.train_bars, self.test_bars, self.anchored)
+        if not windows:
+            logging.warning(f"{symbol}: {price_data.height} bars are not enough for walk-forward.")
+            return None
+
+        prepared = await self._prepare_all(price_data, symbol)
+        folds, test_results = [], []
+        choice = None
+        for train_start, train_end, test_end in windows:
+            choice = self._choose(symbol, prepared, train_start, train_end, choice)
+            combination, params, train_score, train_trades = choice
+            test_result = self._backtester(params).run_range(prepared[combination], symbol, train_end, test_end)
+            test_results.append(test_result)
+
+            timestamps = prepared[combination].timestamps
+            folds.append({
+                "train_start": int(timestamps[train_start]),
+                "train_end": int(timestamps[train_end - 1]),
+                "test_start": int(timestamps[train_end]),
+                "test_end": int(timestamps[test_end - 1]),
+                "params": params,
+                "train_score": train_score,
+                "train_trades": train_trades,
+                "test": test_result.stats,
+            })
+
+        out_of_sample = Backtester().chain(test_results, symbol)
+        return WalkForwardResult(symbol, folds, out_of_sample)
+
+
+async def main(args):
+    strategy_config = {
+        "rsi_window": 14,
+        "bollinger_window": 20,
+        "bollinger_std_dev": 2,
+        "mfi_window": 14,
+        "momentum_window": 14,
+    }
+    frames = load_frames(args.data_dir, args.symbols)
+    optimizer = WalkForwardOptimizer(
+        args.strategy, grid(SWEEP_GRIDS[args.strategy]), strategy_config, args.train_bars, args.test_bars, args.anchored, args.metric, args.min_trades,
+    )
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    summary = {}
+    for name, price_data in frames.items():
+        result = await optimizer.run(price_data, name)
+        if result is None:
+            continue
+        prefix = os.path.join(args.output_dir, f"{name}_{args.strategy}")
+        result.out_of_sample.equity.write_csv(f"{prefix}_oos_equity.csv")
+        result.out_of_sample.trades.write_csv(f"{prefix}_oos_trades.csv")
+        with open(f"{prefix}_folds.json", "w") as file:
+            json.dump(result.folds, file, indent=2)
+        summary[name] = result.out_of_sample.stats
+        logging.info(
+            f"{name} {args.strategy}: {len(result.folds)} folds, out-of-sample return "
+            f"{result.out_of_sample.stats['total_return']:.2%}, {result.out_of_sample.stats['trades']} trades"
+        )
+
+    with open(os.path.join(args.output_dir, f"summary_{args.strategy}.json"), "w") as file:
+        json.dump(summary, file, indent=2)
+    logging.info(f"Indicator cache: {optimizer.indicator_cache.stats()}")
+    logging.info(f"Walk-forward results saved to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of a strategy over the datasets.")
+    parser.add_argument("--strategy", choices=list(SWEEP_GRIDS), default="rsi_macd", help="Strategy to optimize")
+    parser.add_argument("--symbols", nargs="+", default=None, help="Dataset names, e.g. BTC_USDT ETH_USDT")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Datasets directory")
+    parser.add_argument("--output-dir", default=RESULTS_DIR, help="Directory of the results")
+    parser.add_argument("--train-bars", type=int, default=TRAIN_BARS, help="Training window length")
+    parser.add_argument("--test-bars", type=int, default=TEST_BARS, help="Test window length and step")
+    parser.add_argument("--anchored", action="store_true", help="Start every training window at the first bar")
+    parser.add_argument("--metric", default=OPTIMIZE_METRIC, help="Statistic maximized on the training window")
+    parser.add_argument("--min-trades", type=int, default=MIN_TRADES, help="Minimum trades in the training window")
+
+    asyncio.run(main(parser.parse_args()))
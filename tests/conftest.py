@@ -0,0 +1,95 @@
+import os
+import sys
+import numpy as np
+import polars as pl
+import pytest
+
+# Moduły w src/ importują się nawzajem bez pakietu (np. `from utils import ...`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+STUB_MODEL_VERSION = (1, "stub", 0.0)
+
+
+class StubModel:
+    """
+    Five outputs like the LSTM model: close, trend, volume, ATR and signal of the last row.
+    """
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, windows, verbose=0):
+        return self.predict_on_batch(windows)
+
+    def predict_on_batch(self, windows):
+        windows = np.asarray(windows)
+        if np.isnan(windows).any():
+            raise ValueError("NaN in the input")
+        self.batch_sizes.append(len(windows))
+        last = windows[:, -1, :]
+        return [last[:, [0]] * 2, last[:, [10]], last[:, [1]], last[:, [5]], 1 - last[:, [10]]]
+
+
+@pytest.fixture
+def stub_model():
+    return StubModel()
+
+
+@pytest.fixture
+def load_stub_model(stub_model):
+    """
+    Returns a function making a ModelLoader serve `stub_model` as if it had loaded it.
+    """
+    def load(model_loader):
+        model_loader.model = stub_model
+        model_loader.version = STUB_MODEL_VERSION
+        return stub_model
+    return load
+
+
+@pytest.fixture
+def predictor(load_stub_model, tmp_path, monkeypatch):
+    """
+    lstm_predictor with a new loader and prediction cache, predicting with `stub_model`.
+    """
+    import lstm_predictor
+
+    monkeypatch.setattr(lstm_predictor, "model_loader", lstm_predictor.ModelLoader(str(tmp_path / "model.h5")))
+    monkeypatch.setattr(lstm_predictor, "prediction_cache", lstm_predictor.PredictionCache())
+    return load_stub_model(lstm_predictor.model_loader)
+
+
+class StubDataFetcher:
+    """
+    The part of DataFetcher used by TradeExecutor: its read cache.
+    """
+
+    def __init__(self):
+        from request_cache import ReadThroughCache
+
+        self.read_cache = ReadThroughCache()
+
+
+@pytest.fixture
+def stub_data_fetcher():
+    return StubDataFetcher()
+
+
+@pytest.fixture
+def random_signals():
+    """
+    Returns a function building random candles with ATR and Signal columns for backtests.
+    """
+    def build(rows=400, seed=0):
+        rng = np.random.default_rng(seed)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, rows)))
+        return pl.DataFrame({
+            "timestamp": np.arange(rows, dtype=np.int64) * 86_400_000,
+            "open": np.concatenate([[close[0]], close[:-1]]),
+            "high": close * (1 + rng.random(rows) * 0.02),
+            "low": close * (1 - rng.random(rows) * 0.02),
+            "close": close,
+            "ATR": close * 0.02,
+            "Signal": rng.choice(["HOLD", "BUY", "SELL"], rows, p=[0.8, 0.1, 0.1]),
+        })
+    return build
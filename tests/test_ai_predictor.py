@@ -0,0 +1,202 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+import lstm_predictor
+from feature_scaler import FeatureScaler
+from lstm_predictor import REQUIRED_COLUMNS, PredictionCache
+
+
+def write_dataset(file_path, rows, seed=0):
+    frame = pd.DataFrame(np.random.default_rng(seed).random((rows, len(REQUIRED_COLUMNS))) + 1, columns=REQUIRED_COLUMNS)
+    frame.insert(0, "timestamp", pd.date_range("2024-01-01", periods=rows, freq="H").strftime("%Y-%m-%d %H:%M:%S"))
+    frame.to_csv(file_path, index=False)
+    return frame
+
+
+def test_cache_hit_and_invalidation():
+    cache = PredictionCache(max_entries=2)
+    cache.store("AAA", (1,), "t1", {"signal": "BUY"})
+    assert cache.lookup("AAA", (1,), "t1") == {"signal": "BUY"}
+    assert cache.lookup("AAA", (1,), "t2") is None  # Nowa świeca
+    assert cache.lookup("AAA", (2,), "t1") is None  # Nowy model
+    assert cache.lookup("AAA", None, "t1") is None  # Model jeszcze nie wczytany
+
+    cache.store("BBB", (1,), "t1", {})
+    cache.store("CCC", (1,), "t1", {})
+    assert cache.lookup("AAA", (1,), "t1") is None  # Usunięty jako najdawniej używany
+    assert cache.stats() == {"hits": 1, "misses": 4, "invalidations": 2, "hit_rate": 0.2, "entries": 2}
+
+
+def test_predict_batch_reuses_predictions_until_a_new_candle(predictor, tmp_path):
+    file_paths = [str(tmp_path / f"{symbol}_USDT.csv") for symbol in ("AAA", "BBB")]
+    for seed, file_path in enumerate(file_paths):
+        write_dataset(file_path, 150, seed)
+
+    first = lstm_predictor.predict_batch(file_paths)
+    assert predictor.batch_sizes == [2]
+    assert lstm_predictor.predict_batch(file_paths) == first
+    assert predictor.batch_sizes == [2]
+
+    # Nowa świeca w jednym pliku: ponownie liczony tylko ten plik
+    write_dataset(file_paths[1], 151, seed=1)
+    lstm_predictor.predict_batch(file_paths)
+    assert predictor.batch_sizes == [2, 1]
+    assert lstm_predictor.prediction_cache.stats()["invalidations"] == 1
+
+    # Nowy model unieważnia wszystkie predykcje
+    lstm_predictor.model_loader.version = (2, "stub", 0.0)
+    lstm_predictor.predict_batch(file_paths)
+    assert predictor.batch_sizes == [2, 1, 2]
+
+
+def full_read(file_path, rows=lstm_predictor.SEQUENCE_LENGTH):
+    df = pd.read_csv(file_path, parse_dates=["timestamp"], index_col="timestamp")
+    return df[REQUIRED_COLUMNS].fillna(method="bfill").fillna(method="ffill")[-rows:]
+
+
+@pytest.mark.parametrize("gaps", ["none", "inside", "trailing", "whole_tail"])
+def test_load_latest_data_matches_a_full_read(tmp_path, gaps):
+    file_path = str(tmp_path / "AAA_USDT.csv")
+    frame = write_dataset(file_path, 400)
+    if gaps == "inside":
+        frame.loc[[320, 321, 350], "RSI"] = np.nan
+    elif gaps == "trailing":
+        frame.loc[390:, "volume"] = np.nan  # Uzupełniane z wcześniejszych wierszy (ffill)
+    elif gaps == "whole_tail":
+        frame.loc[250:, "ATR"] = np.nan  # Więcej niż dwa okna: czytane dalej wstecz
+    frame.to_csv(file_path, index=False)
+
+    latest = lstm_predictor.load_latest_data(file_path)
+    pd.testing.assert_frame_equal(latest, full_read(file_path))
+    assert lstm_predictor.last_candle_timestamp(file_path) == frame["timestamp"].iloc[-1]
+
+
+def test_read_tail_with_small_blocks(tmp_path):
+    file_path = str(tmp_path / "AAA_USDT.csv")
+    frame = write_dataset(file_path, 30)
+    header, lines, whole_file = lstm_predictor.read_tail(file_path, 5, block_size=64)
+    assert header.startswith(b"timestamp,close") and not whole_file
+    assert [line.split(b",", 1)[0].decode() for line in lines] == frame["timestamp"].iloc[-5:].tolist()
+
+    _, lines, whole_file = lstm_predictor.read_tail(file_path, 100, block_size=64)
+    assert len(lines) == 30 and whole_file
+
+
+def test_a_failing_file_maps_to_none(predictor, tmp_path):
+    good, empty = str(tmp_path / "AAA_USDT.csv"), str(tmp_path / "BBB_USDT.csv")
+    write_dataset(good, 150)
+    write_dataset(empty, 150).iloc[:0].to_csv(empty, index=False)  # Sam nagłówek
+
+    predictions = lstm_predictor.predict_batch([good, empty])
+    assert predictions[empty] is None and predictions[good] is not None
+    assert lstm_predictor.make_prediction(empty) is None
+
+
+def test_a_broken_scaler_artifact_maps_to_none(predictor, tmp_path):
+    file_path = str(tmp_path / "AAA_USDT.csv")
+    write_dataset(file_path, 150)
+    # Artefakt bez kolumny "profit_signal"
+    columns = REQUIRED_COLUMNS[:-1]
+    FeatureScaler(columns, np.zeros(len(columns)), np.ones(len(columns))).save(str(tmp_path / "model_scaler.npz"))
+
+    assert lstm_predictor.make_prediction(file_path) is None
+    assert predictor.batch_sizes == []
+
+
+@pytest.mark.parametrize("with_artifact", [False, True])
+def test_micro_batches_match_single_file_predictions(predictor, tmp_path, with_artifact):
+    file_paths = [str(tmp_path / f"T{index}_USDT.csv") for index in range(5)]
+    for seed, file_path in enumerate(file_paths):
+        write_dataset(file_path, 120 + seed, seed)
+    if with_artifact:
+        training = np.random.default_rng(9).random((500, len(REQUIRED_COLUMNS))) * 3
+        FeatureScaler.fit(training, REQUIRED_COLUMNS).save(str(tmp_path / "model_scaler.npz"))
+
+    batched = lstm_predictor.predict_batch(file_paths, batch_size=2)
+    assert predictor.batch_sizes == [2, 2, 1]  # Jeden przebieg modelu na mikro-batch
+
+    lstm_predictor.prediction_cache.clear()
+    predictor.batch_sizes.clear()
+    for file_path in file_paths:
+        single = lstm_predictor.make_prediction(file_path)
+        assert single.keys() == batched[file_path].keys()
+        for name, value in single.items():
+            assert batched[file_path][name] == (pytest.approx(value, rel=1e-6) if isinstance(value, float) else value)
+    assert predictor.batch_sizes == [1] * 5
+
+
+@pytest.fixture
+def fake_tensorflow(tmp_path, monkeypatch, stub_model):
+    """
+    A `tensorflow` package whose `load_model` returns `stub_model`. Its calls are recorded
+    in the returned `fake_keras_calls` module, so the package itself is only imported by the loader.
+    """
+    packages = tmp_path / "fake_packages"
+    (packages / "tensorflow" / "keras").mkdir(parents=True)
+    (packages / "tensorflow" / "__init__.py").write_text("")
+    (packages / "tensorflow" / "keras" / "__init__.py").write_text("")
+    (packages / "tensorflow" / "keras" / "models.py").write_text(
+        "import time\n"
+        "import fake_keras_calls\n"
+        "def load_model(path):\n"
+        "    fake_keras_calls.CALLS.append(path)\n"
+        "    time.sleep(0.05)\n"
+        "    return fake_keras_calls.MODEL\n"
+    )
+    (packages / "fake_keras_calls.py").write_text("CALLS = []\nMODEL = None\n")
+    monkeypatch.syspath_prepend(str(packages))
+    (tmp_path / "model.h5").write_bytes(b"")
+    import fake_keras_calls
+
+    fake_keras_calls.MODEL = stub_model
+    yield fake_keras_calls
+    for name in [name for name in sys.modules if name.split(".")[0] in ("tensorflow", "fake_keras_calls")]:
+        del sys.modules[name]
+
+
+def test_trade_executor_does_not_load_the_model(fake_tensorflow, stub_data_fetcher, monkeypatch, tmp_path):
+    # Import w nowym interpreterze, z dostępnym (fałszywym) tensorflow
+    code = "import sys, trade_executor; print([name for name in sys.modules if name.startswith('tensorflow')])"
+    output = subprocess.run(
+        [sys.executable, "-c", code], env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert output.strip() == "[]"
+
+    import trade_executor
+
+    monkeypatch.setattr(trade_executor, "model_loader", lstm_predictor.ModelLoader(str(tmp_path / "model.h5")))
+    trade_executor.TradeExecutor({"exchange": {"name": "bybit"}}, data_fetcher=stub_data_fetcher)
+    assert fake_tensorflow.CALLS == []
+    assert not trade_executor.model_loader.loaded
+
+
+def test_concurrent_get_loads_once(fake_tensorflow, stub_model, tmp_path):
+    model_loader = lstm_predictor.ModelLoader(str(tmp_path / "model.h5"))
+    with ThreadPoolExecutor(8) as executor:
+        models = list(executor.map(lambda _: model_loader.get(), range(8)))
+
+    assert fake_tensorflow.CALLS == [str(tmp_path / "model.h5")]
+    assert all(model is stub_model for model in models)
+    assert model_loader.version[0] == 1
+
+
+def test_report_and_background_warm_up(fake_tensorflow, stub_model, tmp_path, caplog):
+    model_loader = lstm_predictor.ModelLoader(str(tmp_path / "model.h5"), startup_budget=0)
+    assert model_loader.report()["loaded"] is False
+
+    thread = model_loader.warm_up()
+    assert model_loader.warm_up() is thread  # Jedno rozgrzewanie naraz
+    thread.join(10)
+
+    report = model_loader.report()
+    assert report["loaded"] and model_loader.error is None
+    assert report["model_load"] >= 0.05
+    assert report["total"] == pytest.approx(report["tensorflow_import"] + report["model_load"] + report["warm_up"])
+    assert report["imported_packages"] == ["tensorflow"]
+    assert stub_model.batch_sizes == [1]  # Przebieg rozgrzewający
+    assert "budget" in caplog.text
@@ -0,0 +1,90 @@
+import numpy as np
+import polars as pl
+import pytest
+from backtester import Backtester
+
+DAY = 86_400_000
+
+
+def flat_signals(rows=10, buy_at=(), high=None, low=None, sell_at=()):
+    signals = ["HOLD"] * rows
+    for i in buy_at:
+        signals[i] = "BUY"
+    for i in sell_at:
+        signals[i] = "SELL"
+    return pl.DataFrame({
+        "timestamp": np.arange(rows, dtype=np.int64) * DAY,
+        "open": [100.0] * rows,
+        "high": high or [100.5] * rows,
+        "low": low or [99.5] * rows,
+        "close": [100.0] * rows,
+        "ATR": [1.0] * rows,
+        "Signal": signals,
+    })
+
+
+def test_take_profit_exit():
+    high = [100.5] * 10
+    high[5] = 103.0
+    result = Backtester(tp_sl_multiplier=2, fee_rate=0, slippage=0).run(flat_signals(buy_at=[2], high=high))
+
+    trade = result.trades.row(0, named=True)
+    assert (trade["entry_time"], trade["exit_time"]) == (3 * DAY, 5 * DAY)
+    assert (trade["entry_price"], trade["exit_price"], trade["exit_reason"]) == (100.0, 102.0, "take_profit")
+    assert result.stats["final_equity"] == pytest.approx(10_200.0)
+
+
+def test_stop_loss_exit_and_fees():
+    low = [99.5] * 10
+    low[4] = 97.0
+    result = Backtester(tp_sl_multiplier=2, fee_rate=0.001, slippage=0).run(flat_signals(buy_at=[1], low=low))
+
+    trade = result.trades.row(0, named=True)
+    assert trade["exit_reason"] == "stop_loss"
+    assert trade["exit_price"] == 98.0
+    assert trade["return"] < -0.02
+
+
+def test_sell_signal_exits_at_next_open():
+    result = Backtester(tp_sl_multiplier=2, fee_rate=0, slippage=0).run(flat_signals(buy_at=[1], sell_at=[4]))
+
+    trade = result.trades.row(0, named=True)
+    assert (trade["exit_time"], trade["exit_reason"]) == (5 * DAY, "signal")
+
+
+def test_no_signals_keep_capital():
+    result = Backtester().run(flat_signals())
+    assert result.stats["trades"] == 0
+    assert result.stats["final_equity"] == Backtester().initial_capital
+    assert result.equity.height == 10
+
+
+def test_run_range_equals_run_on_the_slice(random_signals):
+    signals = random_signals()
+    backtester = Backtester()
+    prepared = backtester.prepare(signals)
+    for start, end in [(0, 400), (50, 120), (199, 200), (300, 400), (10, 11)]:
+        expected = backtester.run(signals[start:end])
+        result = backtester.run_range(prepared, start=start, end=end)
+        assert result.trades.frame_equal(expected.trades)
+        assert result.stats.keys() == expected.stats.keys()
+        for key, value in expected.stats.items():
+            if isinstance(value, float):
+                assert result.stats[key] == pytest.approx(value)
+            else:
+                assert result.stats[key] == value
+
+
+def test_chain_reinvests_consecutive_ranges(random_signals):
+    signals = random_signals(seed=1)
+    backtester = Backtester()
+    prepared = backtester.prepare(signals)
+    parts = [backtester.run_range(prepared, start=start, end=start + 100) for start in (0, 100, 200, 300)]
+    chained = backtester.chain(parts)
+
+    expected_final = backtester.initial_capital
+    for part in parts:
+        expected_final *= part.stats["final_equity"] / backtester.initial_capital
+    assert chained.stats["final_equity"] == pytest.approx(expected_final)
+    assert chained.stats["trades"] == sum(part.stats["trades"] for part in parts)
+    assert chained.equity.height == 400
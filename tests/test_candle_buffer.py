@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from candle_buffer import CandleRingBuffer, CandleStore
+
+
+def candle(i):
+    return [i * 60_000, i + 1.0, i + 2.0, i + 0.5, i + 1.5, 10.0 * i]
+
+
+def test_buffer_keeps_newest_candles_in_order():
+    buffer = CandleRingBuffer(capacity=5)
+    for i in range(12):
+        assert buffer.append(candle(i))
+
+    assert len(buffer) == 5
+    assert buffer.timestamps().tolist() == [i * 60_000 for i in range(7, 12)]
+    assert buffer.column("close").tolist() == [i + 1.5 for i in range(7, 12)]
+    assert buffer.to_polars().columns == ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+def test_same_timestamp_replaces_newest_and_older_is_ignored():
+    buffer = CandleRingBuffer(capacity=3)
+    buffer.extend([candle(i) for i in range(3)])
+    version = buffer.version
+
+    updated = candle(2)
+    updated[4] = 99.0
+    assert not buffer.append(updated)
+    assert buffer.column("close")[-1] == 99.0
+    assert buffer.version > version
+
+    version = buffer.version
+    assert not buffer.append(candle(0))
+    assert buffer.version == version
+
+
+def test_views_are_read_only():
+    buffer = CandleRingBuffer(capacity=3)
+    buffer.extend([candle(i) for i in range(3)])
+    with pytest.raises(ValueError):
+        buffer.column("close")[0] = 1.0
+
+
+def test_extend_of_empty_buffer_keeps_the_newest_candles():
+    store = CandleStore(capacity=4)
+    assert store.update("BTC/USDT", [candle(i) for i in range(10)]) == 4
+    assert store.get("BTC/USDT").series("open").to_list() == [i + 1.0 for i in range(6, 10)]
+    assert np.array_equal(store.get("ETH/USDT").timestamps(), [])
@@ -0,0 +1,27 @@
+import asyncio
+import pytest
+from candle_stream import CandleSource, ReplayCandleSource
+
+
+def test_candle_source_without_stream_cannot_be_created():
+    class IncompleteSource(CandleSource):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteSource()
+
+
+def test_replay_source_yields_candles_in_milliseconds(tmp_path):
+    (tmp_path / "BTCUSDT_data.csv").write_text(
+        "timestamp,open,high,low,close,volume\n"
+        "2024-01-01,1,2,0.5,1.5,10\n"
+        "2024-01-02 00:00:00,1.5,2.5,1,2,20\n"
+    )
+
+    async def collect():
+        return [candle async for candle in ReplayCandleSource(str(tmp_path)).stream("BTC/USDT", "1d")]
+
+    assert asyncio.run(collect()) == [
+        [1704067200000, 1.0, 2.0, 0.5, 1.5, 10.0],
+        [1704153600000, 1.5, 2.5, 1.0, 2.0, 20.0],
+    ]
@@ -0,0 +1,125 @@
+import asyncio
+import pytest
+from data_fetcher import DataFetcher
+from ohlcv_cache import OHLCVCache
+from request_cache import ReadThroughCache
+
+DAY = 86_400_000
+
+
+class FakeExchange:
+    """
+    Serves daily candles up to `now`, recording the arguments of each request.
+    """
+
+    id = "fake"
+
+    def __init__(self, days):
+        self.now = days * DAY
+        self.requests = []
+
+    def parse_timeframe(self, timeframe):
+        return DAY // 1000
+
+    def milliseconds(self):
+        return self.now
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        self.requests.append((since, limit))
+        last = self.now // DAY
+        start = since // DAY if since is not None else last - limit + 1
+        # Ostatnia świeca otwarta: jej zamknięcie zależy od chwili pobrania
+        return [[day * DAY, 1.0, 2.0, 0.5, float(day) + (self.now % DAY) / DAY, 10.0]
+                for day in range(start, min(start + limit, last + 1))]
+
+
+def make_fetcher(tmp_path, days, **kwargs):
+    fetcher = DataFetcher(cache_dir=str(tmp_path), **kwargs)
+    fetcher.exchange = FakeExchange(days)
+    return fetcher
+
+
+def test_incremental_fetch_downloads_only_the_tail(tmp_path):
+    fetcher = make_fetcher(tmp_path, 200, use_read_cache=False)
+    first = asyncio.run(fetcher.fetch_ohlcv("BTC/USDT", limit=100))
+    assert fetcher.exchange.requests == [(None, 100)]
+    assert [candle[0] // DAY for candle in first] == list(range(101, 201))
+
+    # Dwa dni później: pobierane od ostatniej zapamiętanej (wtedy otwartej) świecy
+    fetcher.exchange.now += 2 * DAY + DAY // 2
+    second = asyncio.run(fetcher.fetch_ohlcv("BTC/USDT", limit=100))
+    assert fetcher.exchange.requests[-1] == (200 * DAY, 100)
+    assert [candle[0] // DAY for candle in second] == list(range(103, 203))
+    assert second[-3][4] == 200.5  # Świeca 200 zastąpiona zamkniętą wersją
+
+    # Nowa instancja czyta cache z dysku
+    reopened = make_fetcher(tmp_path, 202, use_read_cache=False)
+    reopened.exchange.now = fetcher.exchange.now
+    assert asyncio.run(reopened.fetch_ohlcv("BTC/USDT", limit=100)) == second
+    assert reopened.exchange.requests == [(202 * DAY, 100)]
+
+
+def test_gap_after_the_cache_starts_over(tmp_path):
+    fetcher = make_fetcher(tmp_path, 200, use_read_cache=False)
+    asyncio.run(fetcher.fetch_ohlcv("BTC/USDT", limit=50))
+    fetcher.exchange.now += 400 * DAY
+    candles = asyncio.run(fetcher.fetch_ohlcv("BTC/USDT", limit=50))
+    assert fetcher.exchange.requests[-1] == (None, 50)
+    assert OHLCVCache(str(tmp_path)).load("fake", "BTC/USDT", "1d") == candles
+
+
+def test_concurrent_reads_share_one_request(tmp_path):
+    fetcher = make_fetcher(tmp_path, 200, use_cache=False, read_cache=ReadThroughCache())
+
+    async def fetch_all():
+        return await asyncio.gather(*(fetcher.fetch_ohlcv("BTC/USDT", limit=30) for _ in range(5)))
+
+    results = asyncio.run(fetch_all())
+    assert len(fetcher.exchange.requests) == 1
+    assert all(result is results[0] for result in results)
+    assert fetcher.read_cache.stats() == {"hits": 0, "misses": 1, "coalesced": 4, "entries": 1}
+
+    asyncio.run(fetcher.fetch_ohlcv("BTC/USDT", limit=30))
+    assert len(fetcher.exchange.requests) == 1 and fetcher.read_cache.hits == 1
+    fetcher.read_cache.invalidate("ohlcv")
+    asyncio.run(fetcher.fetch_ohlcv("BTC/USDT", limit=30))
+    assert len(fetcher.exchange.requests) == 2
+
+
+def test_failed_read_is_not_cached():
+    cache = ReadThroughCache()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError("timeout")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache.get_sync("balance", ("key",), failing)
+    assert len(calls) == 2
+    assert cache.get_sync("balance", ("key",), lambda: {"USDT": 1}) == {"USDT": 1}
+    assert cache.get_sync("balance", ("key",), failing) == {"USDT": 1}
+
+
+def test_cancelled_leader_does_not_cancel_the_waiters():
+    cache = ReadThroughCache()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.05)
+        return [len(loads)]
+
+    async def run():
+        leader = asyncio.create_task(cache.get("ohlcv", ("BTC/USDT",), load))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get("ohlcv", ("BTC/USDT",), load)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(run()) == [[2], [2], [2]]
+    assert len(loads) == 2
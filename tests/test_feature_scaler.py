@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from feature_scaler import FeatureScaler, scaler_path
+
+COLUMNS = ["close", "volume", "ATR"]
+
+
+def test_fit_matches_minmax_scaler():
+    sklearn_preprocessing = pytest.importorskip("sklearn.preprocessing")
+    data = np.random.default_rng(0).random((50, 3)) * [100, 1e6, 5]
+    data[:, 2] = 3.0  # Stała kolumna
+    reference = sklearn_preprocessing.MinMaxScaler().fit(data)
+
+    scaler = FeatureScaler.fit(data, COLUMNS)
+    assert np.allclose(scaler.min_, reference.min_) and np.allclose(scaler.scale_, reference.scale_)
+    assert np.allclose(scaler.transform(data), reference.transform(data))
+    assert np.allclose(scaler.inverse_transform(scaler.transform(data)[:, 0], "close"), data[:, 0])
+
+
+def test_one_scaling_per_window():
+    windows = np.random.default_rng(1).random((4, 20, 3)) * np.arange(1, 5)[:, None, None]
+    scaler = FeatureScaler.fit(windows, COLUMNS)
+    scaled = scaler.transform(windows)
+
+    assert scaler.min_.shape == (4, 3)
+    assert np.allclose(scaled.min(axis=1), 0) and np.allclose(scaled.max(axis=1), 1)
+    for index, window in enumerate(windows):
+        assert np.allclose(scaled[index], FeatureScaler.fit(window, COLUMNS).transform(window))
+    # Odwrotne skalowanie: jedna wartość na okno
+    assert np.allclose(scaler.inverse_transform(scaled[:, -1, 1], "volume"), windows[:, -1, 1])
+
+
+def test_select_save_and_load(tmp_path):
+    assert scaler_path("model/lstm_best_model.h5") == "model/lstm_best_model_scaler.npz"
+    scaler = FeatureScaler.fit(np.random.default_rng(2).random((30, 3)), COLUMNS)
+    path = str(tmp_path / "scaler.npz")
+    scaler.save(path)
+
+    loaded = FeatureScaler.load(path).select(["ATR", "close"])
+    assert loaded.columns == ["ATR", "close"]
+    assert np.allclose(loaded.min_, scaler.min_[[2, 0]]) and np.allclose(loaded.scale_, scaler.scale_[[2, 0]])
+    assert loaded.feature_range == (0, 1)
@@ -0,0 +1,178 @@
+import multiprocessing
+import os
+import threading
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client
+import numpy as np
+import pandas as pd
+import pytest
+import lstm_predictor
+from inference_server import InferenceClient, InferenceServer, _block_size
+from lstm_predictor import NUM_FEATURES, REQUIRED_COLUMNS, SEQUENCE_LENGTH
+
+AUTHKEY = b"test-key"
+
+
+@pytest.fixture
+def server(load_stub_model):
+    inference_server = InferenceServer(("127.0.0.1", 0), AUTHKEY, batch_window=0.2)
+    model = load_stub_model(inference_server.model_loader)
+    ready_reader, ready_writer = multiprocessing.Pipe(duplex=False)
+    thread = threading.Thread(target=inference_server.serve_forever, args=(ready_writer,), daemon=True)
+    thread.start()
+    assert ready_reader.poll(10)
+    address = ready_reader.recv()
+    model.batch_sizes.clear()  # Bez przebiegu rozgrzewającego
+
+    yield inference_server, address, model
+
+    if thread.is_alive():
+        client = InferenceClient(address, AUTHKEY, slots=1)
+        client.shutdown_server()
+        client.close()
+        thread.join(10)
+
+
+def windows(count, seed=0, rows=SEQUENCE_LENGTH):
+    return np.random.default_rng(seed).random((count, rows, NUM_FEATURES)).astype(np.float32)
+
+
+def test_predictions_match_the_model(server):
+    inference_server, address, _ = server
+    client = InferenceClient(address, AUTHKEY, slots=4)
+    inputs = windows(10)
+    outputs = client.predict_sync(inputs)  # Więcej okien niż slotów: wysyłane częściami
+    client.close()
+
+    assert client.model_version == inference_server.model_loader.version
+    assert len(outputs) == 5
+    assert np.allclose(outputs[0], inputs[:, -1, [0]] * 2)
+    assert np.allclose(outputs[4], 1 - inputs[:, -1, [10]])
+
+    short = windows(2, rows=40)
+    client = InferenceClient(address, AUTHKEY, slots=4)
+    assert np.allclose(client.predict_sync(short)[2], short[:, -1, [1]])
+    client.close()
+
+
+def test_requests_of_different_clients_share_a_forward_pass(server):
+    inference_server, address, model = server
+    clients = [InferenceClient(address, AUTHKEY, slots=8) for _ in range(3)]
+    inputs = [windows(3, seed=i) for i in range(3)]
+    futures = [client.submit(x) for client, x in zip(clients, inputs)]
+    results = [future.result(10) for future in futures]
+    for client in clients:
+        client.close()
+
+    assert model.batch_sizes == [9]
+    for x, result in zip(inputs, results):
+        assert np.allclose(result[0], x[:, -1, [0]] * 2)
+    assert inference_server.stats["requests"] == 3
+
+
+def test_model_error_is_returned_to_the_client(server):
+    _, address, _ = server
+    client = InferenceClient(address, AUTHKEY, slots=4)
+    broken = windows(2)
+    broken[1, 5, 3] = np.nan
+    with pytest.raises(RuntimeError, match="NaN in the input"):
+        client.predict_sync(broken)
+
+    # Sloty zostały zwolnione, klient działa dalej
+    assert np.allclose(client.predict_sync(windows(4))[0], windows(4)[:, -1, [0]] * 2)
+    client.close()
+
+
+def _crash_after_submit(address):
+    client = InferenceClient(address, AUTHKEY, slots=2)
+    client.submit(windows(2))
+    os._exit(1)  # Proces klienta kończy się bez "close"
+
+
+def test_disconnected_client_does_not_affect_others(server):
+    inference_server, address, _ = server
+    staying = InferenceClient(address, AUTHKEY, slots=2)
+    leaving = multiprocessing.get_context("spawn").Process(target=_crash_after_submit, args=(address,))
+    leaving.start()
+    leaving.join(30)
+    assert leaving.exitcode == 1
+
+    assert np.allclose(staying.predict_sync(windows(2, seed=3))[0], windows(2, seed=3)[:, -1, [0]] * 2)
+    assert len(inference_server.clients) == 1
+    staying.close()
+
+
+def test_clients_need_the_key(server, monkeypatch):
+    _, address, _ = server
+    with pytest.raises(multiprocessing.AuthenticationError):
+        InferenceClient(address, b"wrong-key")
+
+    monkeypatch.delenv("TITANFLOW_INFERENCE_KEY", raising=False)
+    with pytest.raises(RuntimeError):
+        InferenceClient(address)
+
+
+def test_predict_batch_through_the_server(server, predictor, tmp_path):
+    _, address, _ = server
+    rng = np.random.default_rng(7)
+    file_paths = []
+    for symbol in ("AAA", "BBB"):
+        frame = pd.DataFrame(rng.random((150, len(REQUIRED_COLUMNS))) + 1, columns=REQUIRED_COLUMNS)
+        frame.insert(0, "timestamp", pd.date_range("2024-01-01", periods=150).strftime("%Y-%m-%d"))
+        file_paths.append(str(tmp_path / f"{symbol}_USDT.csv"))
+        frame.to_csv(file_paths[-1], index=False)
+
+    local = lstm_predictor.predict_batch(file_paths)
+
+    client = InferenceClient(address, AUTHKEY, slots=8)
+    lstm_predictor.prediction_cache.clear()
+    lstm_predictor.use_inference_server(client)
+    try:
+        remote = lstm_predictor.predict_batch(file_paths)
+    finally:
+        lstm_predictor.use_inference_server(None)
+        client.close()
+
+    for file_path in file_paths:
+        assert remote[file_path]["signal"] == local[file_path]["signal"]
+        assert remote[file_path]["price"] == pytest.approx(local[file_path]["price"], rel=1e-5)
+
+
+def test_trade_executor_closes_its_client(server, stub_data_fetcher, monkeypatch):
+    from trade_executor import TradeExecutor
+
+    _, address, _ = server
+    monkeypatch.setenv("TITANFLOW_INFERENCE_KEY", AUTHKEY.decode())
+    executor = TradeExecutor(
+        {"exchange": {"name": "bybit"}, "model": {"inference_server": list(address)}}, data_fetcher=stub_data_fetcher
+    )
+    assert lstm_predictor.inference_client is executor.inference_client
+
+    executor.close()
+    executor.close()
+    assert lstm_predictor.inference_client is None
+
+
+def test_invalid_requests_get_an_error_reply(server):
+    _, address, _ = server
+    memory = shared_memory.SharedMemory(create=True, size=_block_size(2))
+    connection = Client(address, authkey=AUTHKEY)
+    try:
+        connection.send(("attach", memory.name, 1000))  # Więcej slotów niż mieści blok
+        assert connection.recv()[0] == "error"
+        connection.send(("attach", memory.name, 2))
+        assert connection.recv()[0] == "attached"
+        for slots, rows in [([0, 2], 10), ([-1], 10), ([0], 0), ([0], SEQUENCE_LENGTH + 1), ("0", 10), ([], 10)]:
+            connection.send(("predict", 1, slots, rows))
+            assert connection.recv()[:2] == ("error", 1)
+        connection.send(("predict", 1))
+        assert connection.recv()[0] == "error"
+    finally:
+        connection.close()
+        memory.close()
+        memory.unlink()
+
+    # Serwer dalej obsługuje klientów
+    client = InferenceClient(address, AUTHKEY, slots=2)
+    assert np.allclose(client.predict_sync(windows(2))[0], windows(2)[:, -1, [0]] * 2)
+    client.close()
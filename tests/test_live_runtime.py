@@ -0,0 +1,80 @@
+import asyncio
+import numpy as np
+from live_runtime import LiveRuntime
+from strategy import TradingStrategy
+
+STRATEGY_CONFIG = {"rsi_window": 14, "bollinger_window": 20, "bollinger_std_dev": 2, "mfi_window": 14,
+                   "momentum_window": 14}
+DAY = 86_400_000
+
+
+def make_history(rows=60, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    return [[i * DAY, c, c + 1, c - 1, c, 10.0] for i, c in enumerate(close)]
+
+
+class StubDataFetcher:
+    def __init__(self, candles):
+        self.candles = candles  # Symbol -> świece zwracane przez strumień
+
+    async def stream_candles(self, symbol, timeframe="1d"):
+        for candle in self.candles.get(symbol, []):
+            await asyncio.sleep(0)
+            yield candle
+
+
+def run_runtime(history, streamed, emitted=None, strategy="rsi_macd"):
+    evaluated = []
+
+    async def collect(events):
+        emitted.append(events)
+
+    async def run():
+        runtime = LiveRuntime(
+            StubDataFetcher(streamed), STRATEGY_CONFIG, [{"name": strategy}], timeframe="1d",
+            capacity=100, sinks=[collect] if emitted is not None else [], batch_delay=0, report_interval=None,
+        )
+        evaluate = runtime.evaluate
+
+        async def record(pending):
+            evaluated.append(sorted(pending))
+            return await evaluate(pending)
+
+        runtime.evaluate = record
+        runtime.seed(history)
+        await runtime.run(list(history))
+        return runtime
+
+    return asyncio.run(run()), evaluated
+
+
+def test_closing_the_seeded_open_candle_triggers_an_evaluation():
+    history = {"BTC/USDT": make_history()}
+    closed = list(history["BTC/USDT"][-1])
+    closed[4] += 5  # Ta sama świeca, zamknięta po innej cenie
+    runtime, evaluated = run_runtime(history, {"BTC/USDT": [closed]})
+
+    assert evaluated == [["BTC/USDT"], ["BTC/USDT"]]
+    assert runtime.candle_store.get("BTC/USDT").column("close")[-1] == closed[4]
+
+
+def test_run_evaluates_only_symbols_with_new_candles():
+    history = {"BTC/USDT": make_history(seed=1), "ETH/USDT": make_history(seed=2)}
+    new_candle = list(history["ETH/USDT"][-1])
+    new_candle[0] += DAY
+    new_candle[4] -= 30  # Zamknięcie pod dolną wstęgą zmienia sygnał ETH
+    emitted = []
+    runtime, evaluated = run_runtime(history, {"ETH/USDT": [new_candle]}, emitted, "bollinger_breakout")
+
+    assert evaluated == [["BTC/USDT", "ETH/USDT"], ["ETH/USDT"]]
+    for symbol in history:
+        frame = runtime.candle_store.get(symbol).to_polars()
+        expected = asyncio.run(TradingStrategy({**STRATEGY_CONFIG, "name": "bollinger_breakout"}).generate_signals(frame))
+        assert runtime.last_signals[(symbol, "bollinger_breakout")] == expected["Signal"][-1]
+
+    # Drugi przebieg wysyła tylko zmieniony sygnał ETH
+    assert [event["symbol"] for event in emitted[0]] == ["BTC/USDT", "ETH/USDT"]
+    assert [(event["symbol"], event["timestamp"]) for event in emitted[1]] == [("ETH/USDT", new_candle[0])]
+    assert emitted[1][0]["signal"] != emitted[0][1]["signal"]
+    assert runtime.latency_report()["count"] == 1
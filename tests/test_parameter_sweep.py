@@ -0,0 +1,93 @@
+import asyncio
+import numpy as np
+import polars as pl
+import pytest
+from backtester import Backtester
+from parameter_sweep import (
+    PRICE_COLUMNS, ParameterSweep, SharedPrices, _column_arrays, grid, load_results, random_sample, rank_results,
+)
+from strategy import TradingStrategy
+
+DAY = 86_400_000
+PARAM_GRID = {"bollinger_window": [10, 20], "bollinger_std_dev": [1.5, 2], "tp_sl_multiplier": [2]}
+
+
+def price_frame(rows=250, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    return pl.DataFrame({
+        "timestamp": np.arange(rows, dtype=np.int64) * DAY,
+        "open": close + rng.normal(0, 0.3, rows),
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": rng.uniform(10, 20, rows),
+    })
+
+
+def test_grid_and_random_sample():
+    combinations = grid(PARAM_GRID)
+    assert len(combinations) == 4
+    assert combinations[0] == {"bollinger_std_dev": 1.5, "bollinger_window": 10, "tp_sl_multiplier": 2}
+
+    sample = random_sample(PARAM_GRID, 3, seed=1)
+    assert len(sample) == 3 and all(params in combinations for params in sample)
+    assert len({tuple(sorted(params.items())) for params in sample}) == 3
+    assert sample == random_sample(PARAM_GRID, 3, seed=1)
+    assert random_sample(PARAM_GRID, 10) == combinations
+
+
+def test_shared_prices_are_column_major():
+    frames = {"AAA": price_frame(30), "BBB": price_frame(20, seed=1)}
+    shared_prices = SharedPrices(frames)
+    try:
+        arrays = _column_arrays(shared_prices.memory, shared_prices.rows)
+        for column in PRICE_COLUMNS:
+            assert arrays[column].flags["C_CONTIGUOUS"]
+        start, rows = shared_prices.layout["BBB"]
+        assert (start, rows) == (30, 20)
+        assert arrays["timestamp"].dtype == np.int64
+        assert np.array_equal(arrays["close"][start:start + rows], frames["BBB"]["close"].to_numpy())
+    finally:
+        shared_prices.close()
+
+
+def test_sweep_matches_direct_backtests_and_resumes(tmp_path):
+    frames = {"AAA": price_frame(), "BBB": price_frame(seed=1)}
+    results_path = str(tmp_path / "sweep.jsonl")
+    combinations = grid(PARAM_GRID)
+
+    results = ParameterSweep("bollinger_breakout", frames, results_path, max_workers=2, chunk_size=1).run(
+        combinations[:2]
+    )
+    assert [result["params"] for result in results] == combinations[:2]
+    params = combinations[1]
+    strategy_config = {"name": "bollinger_breakout", "bollinger_window": params["bollinger_window"],
+                       "bollinger_std_dev": params["bollinger_std_dev"]}
+    for symbol, frame in frames.items():
+        signals = asyncio.run(TradingStrategy(strategy_config).generate_signals(frame))
+        expected = Backtester(tp_sl_multiplier=2).run(signals, symbol).stats
+        assert results[1]["symbols"][symbol]["trades"] == expected["trades"]
+        assert results[1]["symbols"][symbol]["total_return"] == pytest.approx(expected["total_return"])
+
+    # Wznowienie: liczone są tylko nowe kombinacje
+    results = ParameterSweep("bollinger_breakout", frames, results_path, max_workers=2, chunk_size=1).run(
+        combinations
+    )
+    assert [result["params"] for result in results] == combinations
+    with open(results_path) as file:
+        assert len(file.readlines()) == 4
+    assert len(load_results(results_path)) == 4
+
+
+def test_rank_results():
+    results = [
+        {"id": "a", "metrics": {"sharpe": 0.5, "trades": 3}},
+        {"id": "b", "metrics": {"sharpe": 1.5, "trades": 2}},
+        {"id": "c", "metrics": {"sharpe": None, "trades": 4}},
+        {"id": "d", "metrics": {"sharpe": 3.0, "trades": 0}},
+        {"id": "e", "metrics": {"sharpe": -1.0, "trades": 5}},
+    ]
+    assert [result["id"] for result in rank_results(results)] == ["b", "a", "e"]
+    assert [result["id"] for result in rank_results(results, top=1)] == ["b"]
+    assert [result["id"] for result in rank_results(results, min_trades=0)] == ["d", "b", "a", "e"]
@@ -0,0 +1,34 @@
+import asyncio
+import time
+import pytest
+from rate_limiter import TokenBucket
+
+
+def test_acquire_within_burst_does_not_wait():
+    bucket = TokenBucket(rate=1, capacity=3)
+
+    async def acquire_burst():
+        for _ in range(3):
+            await bucket.acquire()
+
+    started_at = time.monotonic()
+    asyncio.run(acquire_burst())
+    assert time.monotonic() - started_at < 0.5
+
+
+def test_acquire_waits_for_refill():
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    async def acquire_twice():
+        await bucket.acquire()
+        await bucket.acquire()
+
+    started_at = time.monotonic()
+    asyncio.run(acquire_twice())
+    assert time.monotonic() - started_at >= 0.04
+
+
+def test_acquire_more_than_capacity_raises():
+    bucket = TokenBucket(rate=1, capacity=2)
+    with pytest.raises(ValueError):
+        asyncio.run(bucket.acquire(3))
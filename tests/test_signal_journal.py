@@ -0,0 +1,42 @@
+import math
+from signal_journal import RECORD_DTYPE, SignalJournal, SignalJournalReader
+
+
+def event(i, symbol="BTC/USDT", strategy="rsi_macd", signal="BUY", tp=None):
+    return {"symbol": symbol, "strategy": strategy, "timestamp": i * 60_000, "signal": signal,
+            "close": 100.0 + i, "tp": tp, "sl": 95.0}
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "signals.journal")
+    journal = SignalJournal(path)
+    assert journal.append([event(0), event(1, "ETH/USDT", signal="SELL", tp=110.0)]) == 2
+    assert journal.append([]) == 0
+
+    reader = SignalJournalReader(path)
+    frame = reader.to_polars()
+    assert frame["symbol"].to_list() == ["BTC/USDT", "ETH/USDT"]
+    assert frame["signal"].to_list() == ["BUY", "SELL"]
+    assert frame["timestamp"].to_list() == [0, 60_000]
+    assert math.isnan(frame["tp"][0]) and frame["tp"][1] == 110.0
+
+    # Czytelnik widzi rekordy dopisane po jego utworzeniu
+    journal.append([event(2, "SOL/USDT", strategy="bollinger_breakout", signal="HOLD")])
+    journal.close()
+    assert len(reader) == 3
+    new = reader.to_polars(start=2)
+    assert new["symbol"].to_list() == ["SOL/USDT"] and new["strategy"].to_list() == ["bollinger_breakout"]
+
+
+def test_reopening_truncates_a_torn_record(tmp_path):
+    path = str(tmp_path / "signals.journal")
+    journal = SignalJournal(path)
+    journal.append([event(0), event(1)])
+    journal.close()
+    with open(path, "ab") as file:
+        file.write(b"\0" * (RECORD_DTYPE.itemsize // 2))
+
+    journal = SignalJournal(path)
+    journal.append([event(2)])
+    journal.close()
+    assert SignalJournalReader(path).to_polars()["timestamp"].to_list() == [0, 60_000, 120_000]
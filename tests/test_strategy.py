@@ -0,0 +1,71 @@
+import asyncio
+import numpy as np
+import polars as pl
+import pytest
+from strategy import STRATEGY_REGISTRY, IndicatorGraph, TradingStrategy
+from utils import TechnicalIndicators
+
+STRATEGY_CONFIG = {"rsi_window": 14, "bollinger_window": 20, "bollinger_std_dev": 2, "mfi_window": 14,
+                   "momentum_window": 14}
+STRATEGIES = ["rsi_macd", "bollinger_breakout", "money_flow_momentum"]
+
+
+def make_prices(rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, rows)))
+    return pl.DataFrame({
+        "timestamp": np.arange(rows, dtype=np.int64) * 86_400_000,
+        "open": close,
+        "high": close * (1 + rng.random(rows) * 0.02),
+        "low": close * (1 - rng.random(rows) * 0.02),
+        "close": close,
+        "volume": rng.random(rows) * 1000,
+    })
+
+
+def test_multi_strategy_signals_match_single_runs():
+    prices = make_prices()
+    multi = asyncio.run(TradingStrategy(STRATEGY_CONFIG).generate_signals_multi(
+        prices, [{"name": name} for name in STRATEGIES]
+    ))
+
+    for name in STRATEGIES:
+        single = asyncio.run(TradingStrategy({**STRATEGY_CONFIG, "name": name}).generate_signals(prices))
+        assert multi[f"Signal_{name}"].to_list() == single["Signal"].to_list()
+    assert set(multi["Signal_rsi_macd"].unique().to_list()) <= {"BUY", "SELL", "HOLD"}
+
+
+def test_same_strategy_with_different_params_needs_labels():
+    prices = make_prices()
+    strategy = TradingStrategy(STRATEGY_CONFIG)
+    with pytest.raises(ValueError):
+        asyncio.run(strategy.generate_signals_multi(prices, [{"name": "rsi_macd"}, {"name": "rsi_macd"}]))
+
+    signals = asyncio.run(strategy.generate_signals_multi(prices, [
+        {"name": "rsi_macd", "label": "fast", "rsi_window": 7},
+        {"name": "rsi_macd", "label": "slow", "rsi_window": 21},
+    ]))
+    assert {"Signal_fast", "Signal_slow"} <= set(signals.columns)
+
+
+def test_unknown_strategy_raises():
+    with pytest.raises(ValueError):
+        asyncio.run(TradingStrategy({**STRATEGY_CONFIG, "name": "unknown"}).generate_signals(make_prices()))
+
+
+def test_bollinger_bands_share_the_mean_and_deviation():
+    strategy_configs = [
+        {**STRATEGY_CONFIG, "name": "bollinger_breakout", "bollinger_std_dev": std_dev} for std_dev in (1.5, 2, 2.5)
+    ]
+    graph = IndicatorGraph([
+        indicator for config in strategy_configs for indicator in STRATEGY_REGISTRY["bollinger_breakout"](config)[0]
+    ])
+    stages = graph.stages()
+    assert [column for column, _, _ in stages[0]] == ["Bollinger_Middle", "Bollinger_Std"]
+    assert len(stages[1]) == 6  # Wstęgi górna i dolna dla każdej szerokości
+
+    prices = make_prices()
+    signals = asyncio.run(TradingStrategy(strategy_configs[1]).generate_signals(prices))
+    bands = asyncio.run(TechnicalIndicators.calculate_bollinger_bands(prices["close"], 20, 2))
+    assert np.allclose(signals["Bollinger_Upper"].to_numpy(), bands["Upper Band"].to_numpy(), equal_nan=True)
+    assert np.allclose(signals["Bollinger_Lower"].to_numpy(), bands["Lower Band"].to_numpy(), equal_nan=True)
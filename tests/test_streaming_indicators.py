@@ -0,0 +1,87 @@
+import asyncio
+import json
+import numpy as np
+import polars as pl
+import pytest
+from streaming_indicators import (
+    StreamingATR, StreamingBollingerBands, StreamingEMA, StreamingIndicator, StreamingIndicatorSet, StreamingMACD,
+    StreamingMFI, StreamingMomentum, StreamingRSI, StreamingSMA,
+)
+from utils import TechnicalIndicators
+
+ROWS = 3000
+
+
+@pytest.fixture(scope="module")
+def candles():
+    rng = np.random.default_rng(0)
+    close = 30_000 + np.cumsum(rng.normal(0, 50, ROWS))
+    high = close + rng.uniform(0, 40, ROWS)
+    low = close - rng.uniform(0, 40, ROWS)
+    volume = rng.uniform(1, 100, ROWS)
+    return {"high": pl.Series(high), "low": pl.Series(low), "close": pl.Series(close), "volume": pl.Series(volume)}
+
+
+def as_array(values):
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def assert_matches(streamed, batch):
+    np.testing.assert_allclose(as_array(streamed), as_array(batch.to_list()), rtol=1e-9, atol=1e-9)
+
+
+async def batch_mfi(candles):
+    # calculate_mfi zwraca wyrażenie (pl.when), więc wyliczamy je jawnie
+    expression = await TechnicalIndicators.calculate_mfi(
+        candles["high"], candles["low"], candles["close"], candles["volume"], 14
+    )
+    return pl.select(expression).to_series()
+
+
+def stream(indicator, candles, inputs):
+    return [indicator.update(*values) for values in zip(*(candles[name].to_list() for name in inputs))]
+
+
+@pytest.mark.parametrize("indicator, batch, inputs", [
+    (StreamingSMA(20), lambda c: TechnicalIndicators.calculate_sma(c["close"], 20), ["close"]),
+    (StreamingEMA(12), lambda c: TechnicalIndicators.calculate_ema(c["close"], 12), ["close"]),
+    (StreamingRSI(14), lambda c: TechnicalIndicators.calculate_rsi(c["close"], 14), ["close"]),
+    (StreamingATR(14), lambda c: TechnicalIndicators.calculate_atr(c["high"], c["low"], c["close"], 14),
+     ["high", "low", "close"]),
+    (StreamingMFI(14), batch_mfi, ["high", "low", "close", "volume"]),
+    (StreamingMomentum(10), lambda c: TechnicalIndicators.calculate_momentum(c["close"], 10), ["close"]),
+], ids=["SMA", "EMA", "RSI", "ATR", "MFI", "Momentum"])
+def test_single_value_indicators_match_the_batch_versions(candles, indicator, batch, inputs):
+    assert_matches(stream(indicator, candles, inputs), asyncio.run(batch(candles)))
+
+
+def test_macd_matches_the_batch_version(candles):
+    streamed = stream(StreamingMACD(), candles, ["close"])
+    batch = asyncio.run(TechnicalIndicators.calculate_macd(candles["close"]))
+    for name in ("MACD", "Signal"):
+        assert_matches([value[name] for value in streamed], batch[name])
+
+
+def test_bollinger_bands_match_the_batch_version(candles):
+    streamed = stream(StreamingBollingerBands(20, 2), candles, ["close"])
+    batch = asyncio.run(TechnicalIndicators.calculate_bollinger_bands(candles["close"], 20, 2))
+    for name in ("Upper Band", "Middle Band", "Lower Band"):
+        assert_matches([None if value is None else value[name] for value in streamed], batch[name])
+
+
+def test_snapshot_restore_continues_the_stream(candles):
+    rows = [[i, 0.0, high, low, close, volume] for i, (high, low, close, volume) in enumerate(zip(
+        candles["high"].to_list(), candles["low"].to_list(), candles["close"].to_list(), candles["volume"].to_list()
+    ))]
+    uninterrupted = StreamingIndicatorSet({"rsi_window": 10})
+    expected = [uninterrupted.update(row) for row in rows][-1]
+
+    interrupted = StreamingIndicatorSet({"rsi_window": 10})
+    for row in rows[:1500]:
+        interrupted.update(row)
+    # Stan przechodzi przez JSON, jak przy zapisie na dysk
+    restored = StreamingIndicator.restore(json.loads(json.dumps(interrupted.snapshot())))
+    assert isinstance(restored, StreamingIndicatorSet)
+    for row in rows[1500:]:
+        result = restored.update(row)
+    assert result == expected
@@ -0,0 +1,43 @@
+import trade_executor
+from trade_executor import TradeExecutor
+
+
+def make_executor(monkeypatch, data_fetcher):
+    executor = TradeExecutor({"exchange": {"name": "bybit"}, "risk_management": {}}, data_fetcher=data_fetcher)
+    orders = []
+    balances = []
+    monkeypatch.setattr(executor.exchange, "create_market_order", lambda *args: orders.append(args) or {"id": "1"})
+    monkeypatch.setattr(executor.exchange, "create_limit_order", lambda *args: orders.append(args) or {"id": "2"})
+    monkeypatch.setattr(executor.exchange, "fetch_balance", lambda: balances.append(1) or {"USDT": len(balances)})
+    return executor, orders, balances
+
+
+def test_execute_trade_places_orders(monkeypatch, stub_data_fetcher):
+    executor, orders, _ = make_executor(monkeypatch, stub_data_fetcher)
+    monkeypatch.setattr(trade_executor, "make_prediction", lambda symbol: {"price": 1.0})
+
+    assert executor.execute_trade("BTC/USDT", "buy", 0.001) == {"id": "1"}
+    assert executor.execute_trade("ETH/USDT", "sell", 0.5, price=2000.0) == {"id": "2"}
+    assert orders == [("BTC/USDT", "buy", 0.001), ("ETH/USDT", "sell", 0.5, 2000.0)]
+
+
+def test_balance_is_cached_until_a_trade(monkeypatch, stub_data_fetcher):
+    executor, _, balances = make_executor(monkeypatch, stub_data_fetcher)
+    monkeypatch.setattr(trade_executor, "make_prediction", lambda symbol: {"price": 1.0})
+
+    assert executor.fetch_balance() == {"USDT": 1}
+    assert executor.fetch_balance() == {"USDT": 1}
+    assert len(balances) == 1
+
+    # Zlecenie zmienia saldo: następny odczyt idzie do giełdy
+    executor.execute_trade("BTC/USDT", "buy", 0.001)
+    assert executor.fetch_balance() == {"USDT": 2}
+    assert len(balances) == 2
+
+
+def test_execute_trade_skips_without_prediction(monkeypatch, stub_data_fetcher):
+    executor, orders, _ = make_executor(monkeypatch, stub_data_fetcher)
+    monkeypatch.setattr(trade_executor, "make_prediction", lambda symbol: None)
+
+    assert executor.execute_trade("BTC/USDT", "buy", 0.001) == {}
+    assert orders == []
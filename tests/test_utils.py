@@ -0,0 +1,75 @@
+import asyncio
+import numpy as np
+import polars as pl
+from utils import IndicatorExpressions, TechnicalIndicators
+
+
+def make_prices(symbols=("BTC/USDT", "ETH/USDT"), rows=60, seed=0):
+    rng = np.random.default_rng(seed)
+    close = rng.random(len(symbols) * rows) + 1
+    return pl.DataFrame({
+        "symbol": np.repeat(symbols, rows),
+        "open": close,
+        "high": close + rng.random(len(close)),
+        "low": close - rng.random(len(close)),
+        "close": close,
+        "volume": rng.random(len(close)) * 100,
+    })
+
+
+def reference_atr(frame, window):
+    high, low, close = (frame[column].to_numpy() for column in ("high", "low", "close"))
+    previous_close = np.concatenate([[np.nan], close[:-1]])
+    true_range = np.nanmax([high - low, np.abs(high - previous_close), np.abs(low - previous_close)], axis=0)
+    return np.convolve(true_range, np.ones(window) / window, mode="full")[window - 1:len(true_range)]
+
+
+def test_atr_matches_true_range_definition():
+    frame = make_prices(symbols=("BTC/USDT",))
+    atr = frame.select(IndicatorExpressions.atr(pl.col("high"), pl.col("low"), pl.col("close"), 14))[:, 0]
+    assert np.allclose(atr.to_numpy()[13:], reference_atr(frame, 14))
+    assert atr[:13].null_count() == 13
+
+
+def test_batch_atr_is_per_symbol_and_quiet(capfd):
+    prices = make_prices()
+    batch = asyncio.run(TechnicalIndicators.calculate_batch(prices, ["ATR"], {"atr_window": 14}))
+
+    for symbol in ("BTC/USDT", "ETH/USDT"):
+        frame = prices.filter(pl.col("symbol") == symbol)
+        atr = batch.filter(pl.col("symbol") == symbol)["ATR"]
+        assert np.allclose(atr.to_numpy()[13:], reference_atr(frame, 14))
+    assert capfd.readouterr().out == ""
+
+
+def test_batch_cache_is_per_symbol():
+    from indicator_cache import IndicatorCache
+
+    prices = make_prices()
+    indicators = ["RSI", "ATR", "MACD_Signal"]
+    cache = IndicatorCache()
+    keys = {"BTC/USDT": ("BTC/USDT", 1), "ETH/USDT": ("ETH/USDT", 1)}
+    first = asyncio.run(TechnicalIndicators.calculate_batch(prices, indicators, indicator_cache=cache, series_key=keys))
+    assert first.frame_equal(asyncio.run(TechnicalIndicators.calculate_batch(prices, indicators)), null_equal=True)
+
+    # Nowa świeca ETH: kolumny BTC pochodzą z cache, ETH jest liczone od nowa
+    hits = cache.hits
+    changed = prices.with_columns([
+        pl.when(pl.col("symbol") == "ETH/USDT").then(pl.col("close") * 2).otherwise(pl.col("close")).alias("close")
+    ])
+    keys["ETH/USDT"] = ("ETH/USDT", 2)
+    second = asyncio.run(TechnicalIndicators.calculate_batch(changed, indicators, indicator_cache=cache, series_key=keys))
+    assert cache.hits - hits == 4  # RSI, ATR, MACD i MACD_Signal dla BTC
+    assert second.frame_equal(asyncio.run(TechnicalIndicators.calculate_batch(changed, indicators)), null_equal=True)
+
+
+def test_batch_cache_keeps_interleaved_row_order():
+    from indicator_cache import IndicatorCache
+
+    prices = make_prices()
+    interleaved = pl.concat([prices[i::60] for i in range(60)])
+    keys = {"BTC/USDT": ("BTC/USDT", 1), "ETH/USDT": ("ETH/USDT", 1)}
+    cached = asyncio.run(TechnicalIndicators.calculate_batch(
+        interleaved, ["RSI"], indicator_cache=IndicatorCache(), series_key=keys
+    ))
+    assert cached.frame_equal(asyncio.run(TechnicalIndicators.calculate_batch(interleaved, ["RSI"])), null_equal=True)
@@ -0,0 +1,23 @@
+import asyncio
+from walk_forward import WalkForwardOptimizer, fold_windows
+
+
+def test_fold_windows_cover_the_series_once():
+    assert fold_windows(100, train_bars=50, test_bars=20) == [(0, 50, 70), (20, 70, 90), (40, 90, 100)]
+    assert fold_windows(100, train_bars=50, test_bars=20, anchored=True)[-1] == (0, 90, 100)
+    assert fold_windows(50, train_bars=50, test_bars=20) == []
+
+
+def test_rerun_after_new_candles_only_scores_new_folds(random_signals):
+    prices = random_signals(rows=400).drop(["ATR", "Signal"])
+    optimizer = WalkForwardOptimizer(
+        "rsi_macd", [{"rsi_window": window} for window in (7, 14, 21)], train_bars=200, test_bars=50, min_trades=0,
+    )
+    first = asyncio.run(optimizer.run(prices[:350], "BTC/USDT"))
+    scored = len(optimizer._scores)
+    second = asyncio.run(optimizer.run(prices, "BTC/USDT"))
+
+    assert len(first.folds) == 3 and len(second.folds) == 4
+    assert len(optimizer._scores) == scored + 3  # Jedno nowe okno treningowe na kombinację
+    assert [fold["params"] for fold in second.folds[:3]] == [fold["params"] for fold in first.folds]
+    assert second.out_of_sample.equity.height == 200